@@ -8,19 +8,94 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 
 from .api.lovelace import async_setup_lovelace_api
-from .const import DOMAIN
+from .const import (
+    CONF_ADMISSION,
+    CONF_ANALYSIS,
+    CONF_BACKUPS,
+    CONF_CAPTURE,
+    CONF_FILE,
+    CONF_MAX_BYTES,
+    CONF_MAX_CARDS,
+    CONF_MAX_DEPTH,
+    CONF_MAX_DUPLICATES,
+    CONF_MAX_ENTITIES,
+    CONF_MAX_QUEUED_MUTATIONS,
+    CONF_MAX_VIEW_BYTES,
+    CONF_PAYLOADS,
+    CONF_READ_BURST,
+    CONF_READ_RATE,
+    CONF_STALL_THRESHOLD,
+    CONF_TRACING,
+    CONF_WRITE_BURST,
+    CONF_WRITE_RATE,
+    DEFAULT_ANALYSIS_THRESHOLDS,
+    DEFAULT_BACKUPS,
+    DEFAULT_CAPTURE_FILE,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_QUEUED_MUTATIONS,
+    DEFAULT_READ_BURST,
+    DEFAULT_READ_RATE,
+    DEFAULT_STALL_THRESHOLD,
+    DEFAULT_TRACE_FILE,
+    DEFAULT_WRITE_BURST,
+    DEFAULT_WRITE_RATE,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+TRACING_SCHEMA = vol.Schema({
+    vol.Optional(CONF_FILE, default=DEFAULT_TRACE_FILE): cv.string,
+    vol.Optional(CONF_MAX_BYTES, default=DEFAULT_MAX_BYTES): cv.positive_int,
+    vol.Optional(CONF_BACKUPS, default=DEFAULT_BACKUPS): cv.positive_int,
+})
+
+CAPTURE_SCHEMA = vol.Schema({
+    vol.Optional(CONF_FILE, default=DEFAULT_CAPTURE_FILE): cv.string,
+    vol.Optional(CONF_MAX_BYTES, default=DEFAULT_MAX_BYTES): cv.positive_int,
+    vol.Optional(CONF_BACKUPS, default=DEFAULT_BACKUPS): cv.positive_int,
+    # 记录完整的请求体，回放写请求时需要
+    vol.Optional(CONF_PAYLOADS, default=False): cv.boolean,
+})
+
+# 速率为 0 时不限制，max_queued_mutations 为 0 时不限制排队长度
+ADMISSION_SCHEMA = vol.Schema({
+    vol.Optional(CONF_READ_RATE, default=DEFAULT_READ_RATE): cv.positive_float,
+    vol.Optional(CONF_READ_BURST, default=DEFAULT_READ_BURST): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_WRITE_RATE, default=DEFAULT_WRITE_RATE): cv.positive_float,
+    vol.Optional(CONF_WRITE_BURST, default=DEFAULT_WRITE_BURST): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_MAX_QUEUED_MUTATIONS, default=DEFAULT_MAX_QUEUED_MUTATIONS): cv.positive_int,
+})
+
+# 阈值为 0 时不检查该项
+ANALYSIS_SCHEMA = vol.Schema({
+    vol.Optional(name, default=DEFAULT_ANALYSIS_THRESHOLDS[name]): cv.positive_int
+    for name in (
+        CONF_MAX_CARDS,
+        CONF_MAX_DEPTH,
+        CONF_MAX_VIEW_BYTES,
+        CONF_MAX_ENTITIES,
+        CONF_MAX_DUPLICATES,
+    )
+})
+
 CONFIG_SCHEMA = vol.Schema(
-    {DOMAIN: vol.Schema({})}, 
+    {DOMAIN: vol.Schema({
+        vol.Optional(CONF_TRACING): TRACING_SCHEMA,
+        vol.Optional(CONF_CAPTURE): CAPTURE_SCHEMA,
+        # 0 关闭事件循环阻塞检测
+        vol.Optional(CONF_STALL_THRESHOLD, default=DEFAULT_STALL_THRESHOLD): cv.positive_int,
+        # 未配置时不启用准入控制
+        vol.Optional(CONF_ADMISSION): ADMISSION_SCHEMA,
+        vol.Optional(CONF_ANALYSIS, default={}): ANALYSIS_SCHEMA,
+    })}, 
     extra=vol.ALLOW_EXTRA
 )
 
 async def async_setup(hass: HomeAssistant, config: Dict) -> bool:
     """Set up the Home Assistant REST API component."""
     # Initialize API endpoints
-    await async_setup_lovelace_api(hass)
+    await async_setup_lovelace_api(hass, config.get(DOMAIN, {}))
     
     _LOGGER.info("Home Assistant REST API initialized")
     return True
@@ -0,0 +1,168 @@
+"""Per-client rate limits and bounded per-dashboard mutation queues.
+
+Every client (refresh token, or remote address for requests without one)
+has a token bucket for reads and a separate, smaller one for writes, so a
+client flooding writes never uses up its read budget. Mutations of one
+dashboard are serialized by its lock; the number of mutations waiting for
+or holding a lock is bounded, and further mutations are rejected at once
+instead of queueing behind the others. Reads never enter these queues.
+"""
+import math
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS_REFRESH_TOKEN_ID
+from homeassistant.exceptions import HomeAssistantError
+
+from .metrics import Metrics
+
+# 超过该数量后清理已回满的令牌桶，避免按 IP 计数时无限增长
+MAX_BUCKETS = 1000
+# 平均持锁时间的指数平滑系数
+HOLD_TIME_ALPHA = 0.2
+
+
+class Overloaded(HomeAssistantError):
+    """Raised when a request or mutation is rejected by admission control."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        """Initialize the error; ``retry_after`` is in seconds."""
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Too many requests ({reason}), retry after {self.retry_after} s")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Return the response headers."""
+        return {"Retry-After": str(self.retry_after)}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the error as a response body."""
+        return {
+            "success": False,
+            "error": str(self),
+            "reason": self.reason,
+            "retry_after": self.retry_after,
+        }
+
+
+class TokenBucket:
+    """Allow ``rate`` operations per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success, else the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        """Return True if the bucket has refilled completely."""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+def client_id(request: web.Request) -> str:
+    """Return the identity a request is rate limited by."""
+    token_id = request.get(KEY_HASS_REFRESH_TOKEN_ID)
+    if token_id:
+        return f"token:{token_id}"
+    return f"ip:{request.remote}"
+
+
+class AdmissionControl:
+    """Token buckets per client and bounded mutation queues per dashboard.
+
+    A rate or limit of 0 disables that check.
+    """
+
+    def __init__(
+        self,
+        read_rate: float,
+        read_burst: int,
+        write_rate: float,
+        write_burst: int,
+        max_queued_mutations: int,
+        metrics: Metrics,
+    ) -> None:
+        """Initialize admission control."""
+        self.metrics = metrics
+        self.limits = {"read": (read_rate, read_burst), "write": (write_rate, write_burst)}
+        self.max_queued_mutations = max_queued_mutations
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._queued: Dict[str, int] = {}
+        self._hold_time: Dict[str, float] = {}
+
+    def _reject(self, reason: str, kind: str, retry_after: float) -> Overloaded:
+        self.metrics.rejections.inc(reason, kind)
+        return Overloaded(reason, retry_after)
+
+    def check_request(self, request: web.Request) -> Optional[Overloaded]:
+        """Take a token for a request; returns the rejection if the client is over its limit."""
+        kind = "read" if request.method in ("GET", "HEAD") else "write"
+        rate, burst = self.limits[kind]
+        if not rate:
+            return None
+        now = time.monotonic()
+        key = (client_id(request), kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+        wait = bucket.take(now)
+        return self._reject("rate_limited", kind, wait) if wait else None
+
+    def _prune(self, now: float) -> None:
+        """Forget clients whose buckets have refilled; they start full anyway."""
+        for key in [key for key, bucket in self._buckets.items() if bucket.is_full(now)]:
+            del self._buckets[key]
+
+    def enter_mutation(self, keys: Iterable[str]) -> None:
+        """Reserve a place in the mutation queue of each dashboard.
+
+        Raises Overloaded without reserving anything if any queue is full.
+        """
+        keys = list(keys)
+        if self.max_queued_mutations:
+            for key in keys:
+                queued = self._queued.get(key, 0)
+                if queued >= self.max_queued_mutations:
+                    # 预计排在前面的修改全部完成所需的时间
+                    raise self._reject(
+                        "queue_full", "write", queued * self._hold_time.get(key, 1.0)
+                    )
+        for key in keys:
+            self._queued[key] = self._queued.get(key, 0) + 1
+
+    def exit_mutation(self, keys: Iterable[str], hold_time: Optional[float] = None) -> None:
+        """Release the queue places and record how long the locks were held."""
+        for key in keys:
+            queued = self._queued.get(key, 0) - 1
+            if queued > 0:
+                self._queued[key] = queued
+            else:
+                self._queued.pop(key, None)
+            if hold_time is not None:
+                previous = self._hold_time.get(key)
+                self._hold_time[key] = (
+                    hold_time if previous is None
+                    else previous + HOLD_TIME_ALPHA * (hold_time - previous)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the tracked clients and current queue depths."""
+        return {
+            "clients": len({client for client, _ in self._buckets}),
+            "queued_mutations": dict(self._queued),
+        }
@@ -0,0 +1,180 @@
+"""Estimate the frontend render cost of Lovelace dashboards.
+
+Each view is walked once to count its cards, measure how deeply they are
+nested, its serialized size, the distinct entities it references and the
+card subtrees it repeats. Results are memoized per view content, so after
+an edit only the changed views are walked again, and per dashboard
+version, so analyzing an unchanged dashboard again costs nothing.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..const import (
+    CONF_MAX_CARDS,
+    CONF_MAX_DEPTH,
+    CONF_MAX_DUPLICATES,
+    CONF_MAX_ENTITIES,
+    CONF_MAX_VIEW_BYTES,
+)
+from .entities import referenced_entities
+from .storage import dumps_json
+
+# 每组重复卡片在报告中最多列出的数量
+MAX_DUPLICATE_GROUPS = 5
+
+# 阈值名称与分析结果字段的对应关系
+THRESHOLD_FIELDS = {
+    CONF_MAX_CARDS: "cards",
+    CONF_MAX_DEPTH: "depth",
+    CONF_MAX_VIEW_BYTES: "bytes",
+    CONF_MAX_ENTITIES: "entities",
+    CONF_MAX_DUPLICATES: "duplicated_cards",
+}
+
+
+def _child_cards(card: Dict) -> Iterator[Any]:
+    """Yield the cards nested directly in a card (stacks, grids, conditionals)."""
+    cards = card.get("cards")
+    if isinstance(cards, list):
+        yield from cards
+    if isinstance(card.get("card"), dict):
+        yield card["card"]
+
+
+def analyze_cards(cards: List[Any]) -> Dict[str, Any]:
+    """Return card count, nesting depth and duplicated subtrees of a card list.
+
+    A card whose subtree was already seen counts as a duplicate and is not
+    descended into, so nested copies are not counted twice.
+    """
+    count = 0
+    depth = 0
+    groups: Dict[str, Dict[str, Any]] = {}
+    duplicated = 0
+    stack: List[Tuple[Any, int]] = [(card, 1) for card in reversed(cards)]
+    while stack:
+        card, level = stack.pop()
+        if not isinstance(card, dict):
+            continue
+        count += 1
+        depth = max(depth, level)
+        canonical = json.dumps(card, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.blake2b(canonical, digest_size=16).hexdigest()
+        group = groups.get(digest)
+        if group is not None:
+            group["occurrences"] += 1
+            duplicated += 1
+            # 重复子树中的卡片同样需要渲染
+            count += _count_nested(card)
+            continue
+        groups[digest] = {"type": card.get("type"), "occurrences": 1, "bytes": len(canonical)}
+        stack.extend((child, level + 1) for child in reversed(list(_child_cards(card))))
+
+    repeated = sorted(
+        (group for group in groups.values() if group["occurrences"] > 1),
+        key=lambda group: group["bytes"] * (group["occurrences"] - 1),
+        reverse=True,
+    )
+    return {
+        "cards": count,
+        "depth": depth,
+        "duplicated_cards": duplicated,
+        "duplicates": repeated[:MAX_DUPLICATE_GROUPS],
+    }
+
+
+def _count_nested(card: Dict) -> int:
+    """Return the number of cards nested below a card."""
+    total = 0
+    for child in _child_cards(card):
+        if isinstance(child, dict):
+            total += 1 + _count_nested(child)
+    return total
+
+
+def _view_cards(view: Dict) -> List[Any]:
+    """Return the top-level cards of a view, including those of its sections."""
+    cards = list(view.get("cards") or [])
+    for section in view.get("sections") or []:
+        if isinstance(section, dict):
+            cards.extend(section.get("cards") or [])
+    return cards
+
+
+def analyze_view(view: Dict, size: int) -> Dict[str, Any]:
+    """Return the analysis of one view; ``size`` is its serialized size."""
+    result = analyze_cards(_view_cards(view))
+    result["bytes"] = size
+    result["entities"] = len(referenced_entities(view))
+    sections = view.get("sections")
+    if isinstance(sections, list):
+        result["sections"] = []
+        for index, section in enumerate(sections):
+            if not isinstance(section, dict):
+                continue
+            section_result = analyze_cards(section.get("cards") or [])
+            section_result["index"] = index
+            section_result["bytes"] = len(dumps_json(section))
+            section_result["entities"] = len(referenced_entities(section))
+            result["sections"].append(section_result)
+    return result
+
+
+def flag(result: Dict[str, Any], thresholds: Dict[str, int]) -> List[str]:
+    """Return the thresholds a view or section exceeds; a threshold of 0 is ignored."""
+    return [
+        f"{field} {result[field]} > {thresholds[name]}"
+        for name, field in THRESHOLD_FIELDS.items()
+        if thresholds.get(name) and result[field] > thresholds[name]
+    ]
+
+
+class DashboardAnalyzer:
+    """Analyze dashboards, memoized per view content and per dashboard version.
+
+    ``analyze`` runs in the executor.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the analyzer."""
+        self._lock = threading.Lock()
+        self._results: Dict[str, Tuple[int, List[Dict[str, Any]]]] = {}
+        self._views: Dict[str, Dict[bytes, Dict[str, Any]]] = {}
+
+    def cached(self, key: str, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the analysis of a dashboard version if it is memoized."""
+        result = self._results.get(key)
+        return result[1] if result is not None and result[0] == version else None
+
+    def analyze(self, key: str, version: int, views: List[Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """Return the per-view analysis of a dashboard and how many views were walked."""
+        with self._lock:
+            result = self.cached(key, version)
+            if result is not None:
+                return result, 0
+            previous = self._views.get(key, {})
+            current: Dict[bytes, Dict[str, Any]] = {}
+            result = []
+            walked = 0
+            for index, view in enumerate(views):
+                if not isinstance(view, dict):
+                    continue
+                body = dumps_json(view)
+                digest = hashlib.blake2b(body, digest_size=16).digest()
+                analysis = current.get(digest) or previous.get(digest)
+                if analysis is None:
+                    analysis = analyze_view(view, len(body))
+                    walked += 1
+                current[digest] = analysis
+                result.append({
+                    "index": index,
+                    "path": view.get("path"),
+                    "title": view.get("title"),
+                    **analysis,
+                })
+            # 只保留当前版本中仍然存在的视图
+            self._views[key] = current
+            self._results[key] = (version, result)
+            return result, walked
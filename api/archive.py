@@ -0,0 +1,256 @@
+"""Streaming tar archives of all Lovelace dashboards.
+
+Archives are written and read one member at a time, so memory use is
+bounded by the largest dashboard instead of the size of the archive. An
+archive holds a manifest, the storage file of every dashboard under
+``.storage/`` (so it can also be unpacked straight into a configuration
+directory) and the list of resources. Archives may be gzip compressed.
+"""
+import json
+import os
+import re
+import tarfile
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .schema import validate_config
+
+ARCHIVE_FORMAT = 1
+MANIFEST_MEMBER = "manifest.json"
+RESOURCES_MEMBER = "resources.json"
+STORAGE_PREFIX = ".storage/"
+# 单个成员的大小上限，防止导入时读入过大的文件
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+STORAGE_KEY = re.compile(r"^lovelace(\.[A-Za-z0-9_-]+)?$")
+GZIP_MAGIC = b"\x1f\x8b"
+
+Reader = Callable[[int], Awaitable[bytes]]
+
+
+class ArchiveError(Exception):
+    """Raised when an archive is malformed or a member cannot be read."""
+
+
+class TarWriter:
+    """Produce a tar archive piece by piece, optionally gzip compressed.
+
+    Every method returns the bytes to send next, which may be empty while
+    the compressor buffers its input.
+    """
+
+    def __init__(self, compress: bool = False) -> None:
+        """Initialize the writer."""
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        self._written = 0
+
+    def _out(self, data: bytes) -> bytes:
+        self._written += len(data)
+        return self._compressor.compress(data) if self._compressor else data
+
+    def header(self, name: str, size: int, mtime: float) -> bytes:
+        """Start a member; its ``size`` bytes of data must follow."""
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        return self._out(info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+
+    def write(self, data: bytes) -> bytes:
+        """Add data to the current member."""
+        return self._out(data)
+
+    def pad(self, size: int) -> bytes:
+        """End a member of ``size`` bytes."""
+        return self._out(b"\0" * (-size % tarfile.BLOCKSIZE))
+
+    def member(self, name: str, data: bytes, mtime: float) -> bytes:
+        """Add a complete member."""
+        return self.header(name, len(data), mtime) + self.write(data) + self.pad(len(data))
+
+    def close(self) -> bytes:
+        """End the archive with two zero blocks, padded to a full record."""
+        end = 2 * tarfile.BLOCKSIZE
+        end += -(self._written + end) % tarfile.RECORDSIZE
+        data = self._out(b"\0" * end)
+        if self._compressor is not None:
+            data += self._compressor.flush()
+        return data
+
+
+def open_storage_file(path: str) -> Optional[Tuple[Any, int, float]]:
+    """Open a storage file; returns the file, its size and mtime, or None if it is gone.
+
+    Runs in the executor. Storage files are replaced atomically, so the
+    open file stays consistent even if the dashboard is saved meanwhile.
+    """
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    stat = os.fstat(file.fileno())
+    return file, stat.st_size, stat.st_mtime
+
+
+def bytes_reader(data: bytes) -> Reader:
+    """Return a reader over a body that was already read into memory."""
+    view = memoryview(data)
+    position = 0
+
+    async def read(size: int) -> bytes:
+        nonlocal position
+        chunk = bytes(view[position:position + size])
+        position += len(chunk)
+        return chunk
+
+    return read
+
+
+class TarReader:
+    """Read a tar archive, plain or gzip compressed, from an async byte stream.
+
+    Only the member being read is held in memory; members that are not
+    read are skipped without buffering them.
+    """
+
+    def __init__(self, read: Reader) -> None:
+        """Initialize the reader; ``read(n)`` returns up to n bytes, b"" at the end."""
+        self._read = read
+        self._buffer = bytearray()
+        self._decompressor = None
+        self._started = False
+        self._eof = False
+        # 当前成员尚未读取的数据及填充
+        self._remaining = 0
+
+    async def _fill(self) -> bool:
+        """Append more data to the buffer; returns False at the end of the stream."""
+        while not self._eof:
+            if self._decompressor is not None and self._decompressor.unconsumed_tail:
+                chunk = self._decompressor.unconsumed_tail
+            else:
+                chunk = await self._read(CHUNK_SIZE)
+                if not chunk:
+                    self._eof = True
+                    break
+            if not self._started:
+                self._started = True
+                if chunk[:2] == GZIP_MAGIC:
+                    self._decompressor = zlib.decompressobj(31)
+            if self._decompressor is not None:
+                if self._decompressor.eof:
+                    continue
+                try:
+                    # 限制每次解压的输出，防止压缩炸弹一次性占满内存
+                    chunk = self._decompressor.decompress(chunk, CHUNK_SIZE)
+                except zlib.error as e:
+                    raise ArchiveError(f"Invalid gzip data: {e}") from None
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    async def _read_exactly(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            if not await self._fill():
+                raise ArchiveError("Archive is truncated")
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    async def _skip(self, size: int) -> None:
+        while size:
+            if not self._buffer and not await self._fill():
+                raise ArchiveError("Archive is truncated")
+            step = min(size, len(self._buffer))
+            del self._buffer[:step]
+            size -= step
+
+    async def next(self) -> Optional[tarfile.TarInfo]:
+        """Return the header of the next member, or None at the end of the archive."""
+        await self._skip(self._remaining)
+        self._remaining = 0
+        pax: Dict[str, str] = {}
+        long_name = None
+        while True:
+            if not self._buffer and not await self._fill():
+                return None
+            block = await self._read_exactly(tarfile.BLOCKSIZE)
+            if block == tarfile.NUL * tarfile.BLOCKSIZE:
+                return None
+            try:
+                info = tarfile.TarInfo.frombuf(block, "utf-8", "surrogateescape")
+            except tarfile.HeaderError as e:
+                raise ArchiveError(f"Invalid tar header: {e}") from None
+            if info.type in (tarfile.XHDTYPE, tarfile.XGLTYPE, tarfile.GNUTYPE_LONGNAME):
+                data = await self._read_member_data(info.size, tarfile.BLOCKSIZE * 64)
+                if info.type == tarfile.XHDTYPE:
+                    pax = _parse_pax(data)
+                elif info.type == tarfile.GNUTYPE_LONGNAME:
+                    long_name = data.rstrip(b"\0").decode("utf-8", "surrogateescape")
+                continue
+            if long_name is not None:
+                info.name = long_name
+            if "path" in pax:
+                info.name = pax["path"]
+            if "size" in pax:
+                try:
+                    info.size = int(pax["size"])
+                except ValueError:
+                    raise ArchiveError("Invalid pax header") from None
+            # 与 tarfile 相同：普通文件和未知类型的成员后面跟着数据
+            if info.isfile() or info.type not in tarfile.SUPPORTED_TYPES:
+                self._remaining = info.size + (-info.size % tarfile.BLOCKSIZE)
+            return info
+
+    async def _read_member_data(self, size: int, limit: int) -> bytes:
+        if size > limit:
+            raise ArchiveError(f"Member of {size} bytes exceeds the limit of {limit} bytes")
+        data = await self._read_exactly(size)
+        await self._skip(-size % tarfile.BLOCKSIZE)
+        return data
+
+    async def read(self, info: tarfile.TarInfo, limit: int = MAX_MEMBER_BYTES) -> bytes:
+        """Return the data of the member just returned by ``next``."""
+        data = await self._read_member_data(info.size, limit)
+        self._remaining = 0
+        return data
+
+
+def _parse_pax(data: bytes) -> Dict[str, str]:
+    """Parse the records of a pax extended header."""
+    records = {}
+    position = 0
+    while position < len(data):
+        space = data.find(b" ", position)
+        try:
+            length = int(data[position:space]) if space > position else 0
+        except ValueError:
+            length = 0
+        if length <= space - position:
+            raise ArchiveError("Invalid pax header")
+        key, _, value = data[space + 1:position + length - 1].partition(b"=")
+        records[key.decode("utf-8")] = value.decode("utf-8", "surrogateescape")
+        position += length
+    return records
+
+
+def storage_key(name: str) -> Optional[str]:
+    """Return the dashboard storage key of a member name, or None."""
+    if not name.startswith(STORAGE_PREFIX):
+        return None
+    key = name[len(STORAGE_PREFIX):]
+    return key if STORAGE_KEY.match(key) else None
+
+
+def parse_dashboard(raw: bytes) -> Dict:
+    """Parse and validate the storage file of a dashboard; returns its config.
+
+    Runs in the executor. Raises ValueError or LovelaceValidationError.
+    """
+    stored_data = json.loads(raw)
+    config = stored_data.get("data", {}).get("config") if isinstance(stored_data, dict) else None
+    if not isinstance(config, dict):
+        raise ValueError("Not a Lovelace storage file: data.config is missing")
+    validate_config(config)
+    return config
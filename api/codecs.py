@@ -0,0 +1,143 @@
+"""Content negotiation between JSON, MessagePack and CBOR.
+
+MessagePack and CBOR are smaller and much cheaper to parse than JSON on
+low-power clients. They are optional: ``msgpack`` and ``cbor2`` are only
+imported when a client asks for them, and a media type whose library is
+not installed is never selected for a response.
+"""
+import json
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+
+from homeassistant.helpers.json import JSONEncoder
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# 客户端常用的别名
+ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+_codecs: Dict[str, Optional[Dict[str, Callable]]] = {}
+
+
+def _default(value: Any) -> Any:
+    """Convert values JSON cannot hold natively (datetimes, sets, ...) like the JSON API."""
+    return JSONEncoder().default(value)
+
+
+def _load(media_type: str) -> Optional[Dict[str, Callable]]:
+    """Return the dumps/loads functions of a binary media type, or None if unavailable."""
+    if media_type in _codecs:
+        return _codecs[media_type]
+    codec = None
+    try:
+        if media_type == MSGPACK:
+            import msgpack
+
+            codec = {
+                "dumps": lambda value: msgpack.packb(value, use_bin_type=True, default=_default),
+                "loads": lambda body: msgpack.unpackb(body, raw=False),
+            }
+        elif media_type == CBOR:
+            import cbor2
+
+            codec = {
+                "dumps": lambda value: cbor2.dumps(
+                    value, default=lambda encoder, item: encoder.encode(_default(item))
+                ),
+                "loads": cbor2.loads,
+            }
+    except ImportError:
+        codec = None
+    _codecs[media_type] = codec
+    return codec
+
+
+def normalize(content_type: Optional[str]) -> Optional[str]:
+    """Return the media type of a Content-Type or Accept entry without parameters."""
+    if not content_type:
+        return None
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return ALIASES.get(media_type, media_type)
+
+
+def is_binary(media_type: Optional[str]) -> bool:
+    """Return True for the binary media types this module knows."""
+    return media_type in (MSGPACK, CBOR)
+
+
+def available(media_type: str) -> bool:
+    """Return True if bodies of a media type can be encoded and decoded."""
+    return media_type == JSON or (is_binary(media_type) and _load(media_type) is not None)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Return the media type of the response for an ``Accept`` header.
+
+    The binary type the client prefers most is chosen if its library is
+    installed; anything else, including ``*/*``, gets JSON.
+    """
+    if not accept or ("msgpack" not in accept and "cbor" not in accept):
+        return JSON
+    best, best_q = JSON, 0.0
+    for entry in accept.split(","):
+        media_type = normalize(entry)
+        quality = 1.0
+        for param in entry.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type == JSON and quality > best_q:
+            best, best_q = JSON, quality
+        elif is_binary(media_type) and quality > best_q and available(media_type):
+            best, best_q = media_type, quality
+    return best
+
+
+def dumps(media_type: str, value: Any) -> bytes:
+    """Serialize a value; JSON output is the same compact form as ``dumps_json``."""
+    if media_type == JSON:
+        return json.dumps(
+            value, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    return _load(media_type)["dumps"](value)
+
+
+def loads(media_type: str, body: bytes) -> Any:
+    """Parse a body of a media type."""
+    if media_type == JSON:
+        return json.loads(body)
+    return _load(media_type)["loads"](body)
+
+
+def prepend_field(media_type: str, name: str, value: bytes, rest: Dict[str, Any]) -> bytes:
+    """Encode ``{name: ..., **rest}`` where the value of ``name`` is already encoded.
+
+    Lets a cached body be embedded in a larger response without decoding
+    and encoding it again. ``rest`` must hold fewer than 15 fields.
+    """
+    tail = dumps(media_type, rest)
+    if media_type == JSON:
+        return b"{" + dumps(JSON, name) + b":" + value + (b"," + tail[1:] if rest else b"}")
+    # MessagePack (fixmap) 和 CBOR 的短映射头部的低位是条目数，加一即可
+    return bytes([tail[0] + 1]) + dumps(media_type, name) + value + tail[1:]
+
+
+async def read_body(request: web.Request) -> Any:
+    """Parse a request body according to its Content-Type.
+
+    Bodies that are not MessagePack or CBOR are parsed as JSON whatever
+    their Content-Type, as before content negotiation was added.
+    """
+    media_type = normalize(request.headers.get("Content-Type"))
+    if is_binary(media_type):
+        return loads(media_type, await request.read())
+    return await request.json()
@@ -0,0 +1,83 @@
+"""Drain in-flight mutations before Home Assistant restarts.
+
+Every mutating request and service call is counted while it runs,
+including the Lovelace reload it triggers. Draining stops admitting new
+mutations and waits until the running ones have finished, so a restart
+issued right after a write never cuts that write off. Reads are neither
+counted nor rejected.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from homeassistant.exceptions import HomeAssistantError
+
+# 排空期间被拒绝的请求建议的重试间隔，重启通常在这段时间内完成
+RETRY_AFTER = 30
+
+
+class Draining(HomeAssistantError):
+    """Raised when a mutation arrives while in-flight mutations are drained."""
+
+    def __init__(self) -> None:
+        """Initialize the error."""
+        super().__init__("Home Assistant is restarting, mutations are not accepted")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Return the response headers."""
+        return {"Retry-After": str(RETRY_AFTER)}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the error as a response body."""
+        return {"success": False, "error": str(self), "retry_after": RETRY_AFTER}
+
+
+class DrainGate:
+    """Count in-flight mutations and wait for them to finish."""
+
+    def __init__(self) -> None:
+        """Initialize the gate; mutations are admitted."""
+        self.draining = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a mutation while it runs; raises Draining if mutations are not admitted."""
+        if self.draining:
+            raise Draining()
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> Dict[str, Any]:
+        """Stop admitting mutations and wait up to ``timeout`` seconds for the running ones.
+
+        Mutations stay rejected afterwards until ``resume`` is called, even
+        if the timeout expired.
+        """
+        self.draining = True
+        start = time.perf_counter()
+        waited_for = self.in_flight
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return {
+            "drained": not self.in_flight,
+            "in_flight": waited_for,
+            "remaining": self.in_flight,
+            "drain_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def resume(self) -> None:
+        """Admit mutations again."""
+        self.draining = False
@@ -0,0 +1,50 @@
+"""Entity references of Lovelace views and compact entity states."""
+import re
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from homeassistant.core import State
+
+# 这些键的字符串值（或字符串列表）是实体 ID，例如 entity、entities、
+# 徽章列表以及动作中的 target.entity_id
+ENTITY_KEYS = frozenset({
+    "entity",
+    "entity_id",
+    "entities",
+    "badges",
+    "camera_image",
+    "image_entity",
+})
+ENTITY_ID = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$")
+
+
+def referenced_entities(view: Any) -> List[str]:
+    """Return the entity IDs referenced by a view, in order of first use."""
+    found: Dict[str, None] = {}
+
+    def walk(value: Any, entity_key: bool) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(item, key in ENTITY_KEYS)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item, entity_key)
+        elif entity_key and isinstance(value, str) and ENTITY_ID.match(value):
+            found[value] = None
+
+    walk(view, False)
+    return list(found)
+
+
+def compact_state(state: "State") -> Dict[str, Any]:
+    """Return a state in the compressed format of the WebSocket API.
+
+    ``s`` is the state, ``a`` the attributes and ``lc``/``lu`` the last
+    changed/updated timestamps; ``lu`` is omitted if equal to ``lc``.
+    """
+    last_changed = state.last_changed.timestamp()
+    last_updated = state.last_updated.timestamp()
+    compact = {"s": state.state, "a": dict(state.attributes), "lc": last_changed}
+    if last_updated != last_changed:
+        compact["lu"] = last_updated
+    return compact
@@ -0,0 +1,144 @@
+"""Request and service call instrumentation shared by all views."""
+import functools
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS_USER
+from homeassistant.core import ServiceCall
+from homeassistant.exceptions import Unauthorized
+
+from ..const import PROFILE_HEADER, PROFILE_QUERY_PARAM
+from .codecs import available, is_binary, normalize
+from .drain import Draining
+
+
+def instrument_view(handler: Callable[..., Awaitable[web.StreamResponse]]):
+    """Record metrics, a trace, a capture and loop stalls for a HomeAssistantView handler.
+
+    Requests over the client's rate limit are answered with 429, bodies in
+    a binary media type whose library is missing with 415, and mutations
+    arriving while a restart drains the running ones with 503, without
+    running the handler. Other requests that are not GET or HEAD count as
+    in-flight mutations unless the view sets ``drain = False``. Views that
+    stream their body set ``capture_body = False`` so the capture does not
+    read it into memory first. The view
+    must have a ``lovelace_api`` attribute; the view name without its
+    ``api:ha_rest_api:`` prefix is used as label.
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(view, request: web.Request, *args: Any, **kwargs: Any):
+        metrics = view.lovelace_api.metrics
+        name = view.name.rsplit(":", 1)[-1]
+        start = time.perf_counter()
+        status = 500
+        label = f"{request.method} {name}"
+        capture = view.lovelace_api.capture
+        if capture is not None:
+            received = time.time()
+            if getattr(view, "capture_body", True):
+                body = await capture.async_read_body(request)
+            else:
+                body = capture.stream_body(request)
+        admission = view.lovelace_api.admission
+        gate = view.lovelace_api.drain_gate
+        mutation = request.method not in ("GET", "HEAD") and getattr(view, "drain", True)
+        watchdog = view.lovelace_api.watchdog
+        if watchdog is not None:
+            watchdog.enter(label)
+        with view.lovelace_api.tracer.span(
+            label, request_bytes=request.content_length
+        ) as span:
+            response = None
+            try:
+                rejection = admission.check_request(request) if admission is not None else None
+                media_type = normalize(request.headers.get("Content-Type"))
+                if rejection is not None:
+                    response = view.json(
+                        rejection.as_dict(), status_code=429, headers=rejection.headers
+                    )
+                elif is_binary(media_type) and not available(media_type):
+                    response = view.json(
+                        {"success": False, "error": f"Unsupported media type {media_type}"},
+                        status_code=415,
+                    )
+                elif mutation and gate.draining:
+                    draining = Draining()
+                    response = view.json(
+                        draining.as_dict(), status_code=503, headers=draining.headers
+                    )
+                else:
+                    with gate.track() if mutation else nullcontext():
+                        if PROFILE_QUERY_PARAM in request.query or PROFILE_HEADER in request.headers:
+                            response = await _async_profile(
+                                view, name, handler, request, args, kwargs
+                            )
+                        else:
+                            response = await handler(view, request, *args, **kwargs)
+                status = response.status
+                span.set(status=status, response_bytes=response.content_length)
+                return response
+            finally:
+                duration = time.perf_counter() - start
+                if watchdog is not None:
+                    watchdog.exit(label)
+                metrics.http_latency.observe(duration, name, request.method)
+                metrics.http_requests.inc(name, request.method, str(status))
+                if capture is not None:
+                    capture.record(
+                        name, request, body, received, duration, status,
+                        response.content_length if response is not None else None,
+                    )
+
+    return wrapper
+
+
+async def _async_profile(
+    view, name: str, handler, request: web.Request, args: tuple, kwargs: dict
+) -> web.StreamResponse:
+    """Run a handler under the profiler; only administrators may ask for it."""
+    user = request.get(KEY_HASS_USER)
+    if user is None or not user.is_admin:
+        raise Unauthorized()
+
+    profile_store = view.lovelace_api.get_profile_store()
+    response, profile_id = await profile_store.async_profile(
+        name, request.method, lambda: handler(view, request, *args, **kwargs)
+    )
+    response.headers[PROFILE_HEADER] = profile_id or "busy"
+    return response
+
+
+def instrument_service(service: str, mutation: bool = True):
+    """Record metrics, a trace and loop stalls for a service handler of LovelaceAPI.
+
+    Calls of a ``mutation`` service count as in-flight mutations and raise
+    Draining while a restart drains the running ones.
+    """
+
+    def decorator(handler: Callable[..., Awaitable[None]]):
+        @functools.wraps(handler)
+        async def wrapper(api, call: ServiceCall) -> None:
+            start = time.perf_counter()
+            result = "error"
+            label = f"service {service}"
+            if api.watchdog is not None:
+                api.watchdog.enter(label)
+            with api.tracer.span(label) as span:
+                try:
+                    with api.drain_gate.track() if mutation else nullcontext():
+                        await handler(api, call)
+                    result = "ok"
+                finally:
+                    if api.watchdog is not None:
+                        api.watchdog.exit(label)
+                    span.set(result=result)
+                    api.metrics.service_latency.observe(time.perf_counter() - start, service)
+                    api.metrics.service_calls.inc(service, result)
+
+        return wrapper
+
+    return decorator
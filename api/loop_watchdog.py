@@ -0,0 +1,166 @@
+"""Detect event loop stalls while ha_rest_api handlers are running.
+
+While at least one handler is active, a heartbeat callback runs on the
+event loop and measures how late it fires. A helper thread samples the
+stack of the loop thread whenever the heartbeat is overdue, so a stall is
+attributed to the function that was actually blocking the loop, not just
+to the handlers that happened to be running.
+"""
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 请求包装器不是阻塞的来源，归因时跳过
+WRAPPER_FILE = os.path.join(PACKAGE_DIR, "api", "instrumentation.py")
+MAX_STALLS = 50
+STACK_DEPTH = 20
+
+
+def _describe(frame: Any) -> Dict[str, Any]:
+    code = frame.f_code
+    return {
+        "function": getattr(code, "co_qualname", code.co_name),
+        "file": code.co_filename,
+        "line": frame.f_lineno,
+    }
+
+
+def _capture_stack(frame: Any) -> List[Dict[str, Any]]:
+    """Return the stack from the innermost frame outwards."""
+    stack = []
+    while frame is not None and len(stack) < STACK_DEPTH:
+        stack.append(_describe(frame))
+        frame = frame.f_back
+    return stack
+
+
+class LoopWatchdog:
+    """Measure event loop lag and record stalls above a threshold."""
+
+    def __init__(self, hass: HomeAssistant, threshold: float) -> None:
+        """Initialize the watchdog; ``threshold`` is in seconds."""
+        self.hass = hass
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self.stalls: Deque[Dict[str, Any]] = collections.deque(maxlen=MAX_STALLS)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._handlers: Dict[str, int] = {}
+        self._beating = False
+        self._expected = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._sample: Optional[List[Dict[str, Any]]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopped = False
+
+    @callback
+    def enter(self, handler: str) -> None:
+        """Mark a handler as running; starts the heartbeat if needed."""
+        self._handlers[handler] = self._handlers.get(handler, 0) + 1
+        if self._stopped or self._beating:
+            return
+        if self._thread is None:
+            self._loop_thread_id = threading.get_ident()
+            self._thread = threading.Thread(
+                target=self._sampler, name="ha_rest_api loop watchdog", daemon=True
+            )
+            self._thread.start()
+        self._beating = True
+        self._expected = time.perf_counter() + self.interval
+        self.hass.loop.call_later(self.interval, self._beat)
+        self._wake.set()
+
+    @callback
+    def exit(self, handler: str) -> None:
+        """Mark a handler as finished."""
+        count = self._handlers.get(handler, 0) - 1
+        if count > 0:
+            self._handlers[handler] = count
+        else:
+            self._handlers.pop(handler, None)
+
+    @callback
+    def _beat(self) -> None:
+        """Measure how late the heartbeat fired and reschedule it."""
+        now = time.perf_counter()
+        lag = now - self._expected
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag >= self.threshold:
+            self._record(lag)
+        self._sample = None
+
+        if self._handlers and not self._stopped:
+            self._expected = now + self.interval
+            self.hass.loop.call_later(self.interval, self._beat)
+        else:
+            self._beating = False
+            self._wake.clear()
+
+    def _record(self, lag: float) -> None:
+        """Store a stall and log it."""
+        stack = self._sample or []
+        ours = [
+            frame for frame in stack
+            if frame["file"].startswith(PACKAGE_DIR) and frame["file"] != WRAPPER_FILE
+        ]
+        stall = {
+            "time": time.time(),
+            "duration_ms": round(lag * 1000, 1),
+            "handlers": sorted(self._handlers),
+            # 最内层的集成代码即阻塞事件循环的阶段，最外层为处理函数
+            "stage": ours[0]["function"] if ours else None,
+            "handler": ours[-1]["function"] if ours else None,
+            "stack": stack,
+        }
+        self.stalls.append(stall)
+        self.stall_count += 1
+
+        if ours:
+            location = f"in {stall['stage']} ({ours[0]['file']}:{ours[0]['line']})"
+        elif stack:
+            location = f"outside ha_rest_api in {stack[0]['function']} ({stack[0]['file']}:{stack[0]['line']})"
+        else:
+            location = "(no stack sample)"
+        _LOGGER.warning(
+            "Event loop blocked for %.1f ms %s while handling %s",
+            lag * 1000, location, ", ".join(stall["handlers"]) or "no request",
+        )
+
+    def _sampler(self) -> None:
+        """Sample the loop thread's stack while the heartbeat is overdue."""
+        while not self._stopped:
+            self._wake.wait()
+            time.sleep(self.threshold / 4)
+            if not self._beating or self._sample is not None:
+                continue
+            # 心跳明显超时说明事件循环此刻正被阻塞
+            if time.perf_counter() - self._expected >= self.threshold / 4:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._sample = _capture_stack(frame)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the heartbeat and the sampling thread."""
+        self._stopped = True
+        self._wake.set()
+
+    def diagnostics(self) -> Dict[str, Any]:
+        """Return the recorded stalls, newest first."""
+        return {
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "stall_count": self.stall_count,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": list(reversed(self.stalls)),
+        }
@@ -1,21 +1,24 @@
 """Lovelace API implementation for Home Assistant REST API."""
+import asyncio
+import copy
+import functools
+import json
 import logging
 import os
-import json
-from typing import Dict, Any
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Set
 
 import voluptuous as vol
 from aiohttp import web
 
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.components.http.decorators import require_admin
+from homeassistant.core import CoreState, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
-from homeassistant.components.websocket_api.connection import ActiveConnection
-from homeassistant.components.websocket_api.const import TYPE_RESULT
-from homeassistant.components.lovelace import dashboard
-from homeassistant.components.lovelace.resources import ResourceStorageCollection
-from homeassistant.components.frontend import async_remove_panel, async_register_built_in_panel
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP
 
 from ..const import (
     DOMAIN,
@@ -27,12 +30,91 @@ from ..const import (
     SERVICE_SET_LOVELACE_SECTION,
     SERVICE_RESTART_HASS,
     SERVICE_GET_LOVELACE_LIST,
+    SERVICE_SAVE_LOVELACE_TEMPLATE,
+    SERVICE_DELETE_LOVELACE_TEMPLATE,
+    SERVICE_INSTANTIATE_LOVELACE_TEMPLATE,
+    SERVICE_COPY_LOVELACE_VIEW,
+    SERVICE_MOVE_LOVELACE_VIEW,
+    SERVICE_REORDER_LOVELACE_VIEWS,
+    SERVICE_GET_LOVELACE_RESOURCES,
+    SERVICE_CREATE_LOVELACE_RESOURCE,
+    SERVICE_UPDATE_LOVELACE_RESOURCE,
+    SERVICE_DELETE_LOVELACE_RESOURCE,
+    SERVICE_SYNC_LOVELACE_RESOURCES,
     LOVELACE_API_PATH,
     LOVELACE_SECTION_API_PATH,
     LOVELACE_SECTION_DELETE_API_PATH,
+    LOVELACE_SECTION_COPY_API_PATH,
+    LOVELACE_SECTION_MOVE_API_PATH,
+    LOVELACE_SECTION_REORDER_API_PATH,
     LOVELACE_LIST_API_PATH,
+    LOVELACE_BUNDLE_API_PATH,
+    LOVELACE_ANALYSIS_API_PATH,
+    LOVELACE_RESOURCES_API_PATH,
+    LOVELACE_RESOURCES_UPDATE_API_PATH,
+    LOVELACE_RESOURCES_DELETE_API_PATH,
+    LOVELACE_RESOURCES_SYNC_API_PATH,
+    LOVELACE_ARCHIVE_API_PATH,
     RESTART_HASS_API_PATH,
+    LOVELACE_TEMPLATE_API_PATH,
+    LOVELACE_TEMPLATE_DELETE_API_PATH,
+    LOVELACE_TEMPLATE_INSTANTIATE_API_PATH,
+    STATS_API_PATH,
+    METRICS_API_PATH,
+    PROFILES_API_PATH,
+    PROFILE_API_PATH,
+    PROFILE_DIRECTORY,
+    MAX_PROFILES,
+    TEMPLATE_STORAGE_KEY,
+    CONF_TRACING,
+    CONF_CAPTURE,
+    CONF_PAYLOADS,
+    CONF_FILE,
+    CONF_MAX_BYTES,
+    CONF_BACKUPS,
+    CONF_STALL_THRESHOLD,
+    CONF_MAX_QUEUED_MUTATIONS,
+    CONF_READ_BURST,
+    CONF_READ_RATE,
+    CONF_WRITE_BURST,
+    CONF_WRITE_RATE,
+    CONF_ADMISSION,
+    CONF_ANALYSIS,
+    DEFAULT_ANALYSIS_THRESHOLDS,
+    DEFAULT_DRAIN_TIMEOUT,
+    DEFAULT_STALL_THRESHOLD,
+    LOOP_DIAGNOSTICS_API_PATH,
 )
+from .schema import LovelaceValidationError, validate_config, validate_view
+from .storage import (
+    CachedDashboard,
+    DashboardCache,
+    EncodedBody,
+    dumps_json,
+    etag_matches,
+    file_signature,
+    is_dashboard_file,
+    read_json_file,
+    write_json_file,
+)
+from .admission import AdmissionControl, Overloaded
+from .capture import RequestCapture, body_reader
+from .codecs import CBOR, JSON, MSGPACK, available, dumps, negotiate, prepend_field, read_body
+from .drain import DrainGate
+from .entities import compact_state
+from .resources import RESOURCE_TYPES, ResourceError, plan_sync, validate_resource
+from .instrumentation import instrument_service, instrument_view
+from .loop_watchdog import LoopWatchdog
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics
+from .single_flight import SingleFlight
+from .tracing import Tracer
+
+if TYPE_CHECKING:
+    # 以下模块只在首次使用时导入，不拖慢集成的启动
+    from .analysis import DashboardAnalyzer
+    from .profiling import ProfileStore
+    from .storage_watcher import LovelaceStorageWatcher
+    from .view_template import CompiledViewTemplate
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +125,9 @@ SERVICE_GET_CONFIG_SCHEMA = vol.Schema({
 SERVICE_SAVE_CONFIG_SCHEMA = vol.Schema({
     vol.Optional("dashboard_id", default="lovelace"): cv.string,
     vol.Required("config"): dict,
+    # 编辑的基础版本，提供时与期间的其他修改合并
+    vol.Exclusive("base_etag", "base"): cv.string,
+    vol.Exclusive("base", "base"): dict,
 })
 
 SERVICE_SECTION_ADD_SCHEMA = vol.Schema({
@@ -56,13 +141,132 @@ SERVICE_SECTION_DELETE_SCHEMA = vol.Schema({
     vol.Required("path"): cv.string,
 })
 
+SERVICE_VIEW_TRANSFER_SCHEMA = vol.Schema({
+    vol.Optional("dashboard_id", default="lovelace"): cv.string,
+    vol.Required("path"): cv.string,
+    vol.Optional("target_dashboard_id"): cv.string,
+    vol.Optional("new_path"): cv.string,
+    vol.Optional("position"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional("section_index"): vol.Coerce(int),
+    vol.Optional("target_path"): cv.string,
+})
+
+SERVICE_VIEW_REORDER_SCHEMA = vol.Schema({
+    vol.Optional("dashboard_id", default="lovelace"): cv.string,
+    vol.Exclusive("paths", "reorder"): [cv.string],
+    vol.Exclusive("path", "reorder"): cv.string,
+    vol.Optional("order"): [vol.Coerce(int)],
+})
+
+SERVICE_TEMPLATE_SAVE_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Required("template"): dict,
+})
+
+SERVICE_TEMPLATE_DELETE_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+})
+
+SERVICE_TEMPLATE_INSTANTIATE_SCHEMA = vol.Schema({
+    vol.Optional("dashboard_id", default="lovelace"): cv.string,
+    vol.Required("name"): cv.string,
+    vol.Required("parameters"): [dict],
+})
+
+SERVICE_RESTART_SCHEMA = vol.Schema({
+    vol.Optional("timeout", default=DEFAULT_DRAIN_TIMEOUT): cv.positive_float,
+    vol.Optional("force", default=False): cv.boolean,
+})
+
+SERVICE_RESOURCE_CREATE_SCHEMA = vol.Schema({
+    vol.Required("url"): cv.string,
+    vol.Optional("type", default="module"): vol.In(RESOURCE_TYPES),
+})
+
+SERVICE_RESOURCE_UPDATE_SCHEMA = vol.Schema({
+    vol.Required("resource_id"): cv.string,
+    vol.Optional("url"): cv.string,
+    vol.Optional("type"): vol.In(RESOURCE_TYPES),
+})
+
+SERVICE_RESOURCE_DELETE_SCHEMA = vol.Schema({
+    vol.Required("resource_id"): cv.string,
+})
+
+SERVICE_RESOURCE_SYNC_SCHEMA = vol.Schema({
+    vol.Required("resources"): [dict],
+    vol.Optional("prune", default=False): cv.boolean,
+    vol.Optional("dry_run", default=False): cv.boolean,
+})
+
 class LovelaceAPI:
     """Class to handle Lovelace API functionality."""
     
-    def __init__(self, hass: HomeAssistant) -> None:
-        """Initialize the Lovelace API."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        tracing: Optional[Dict] = None,
+        stall_threshold: int = DEFAULT_STALL_THRESHOLD,
+        capture: Optional[Dict] = None,
+        admission: Optional[Dict] = None,
+        analysis: Optional[Dict] = None,
+    ) -> None:
+        """Initialize the Lovelace API; ``stall_threshold`` is in milliseconds."""
         self.hass = hass
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._cache = DashboardCache()
+        self._writing: Set[str] = set()
+        self._single_flight = SingleFlight()
+        self.warmup: Optional[Dict] = None
+        self._watcher: Optional["LovelaceStorageWatcher"] = None
+        self._templates: Optional[Dict[str, Dict]] = None
+        self._compiled_templates: Dict[str, "CompiledViewTemplate"] = {}
+        # 读取可变副本的时间，用于统计读-改-写中"修改"阶段的耗时
+        self._mutation_started: Dict[str, float] = {}
+        self._profile_store: Optional["ProfileStore"] = None
+        # 资源列表的编码缓存，资源集合变化时失效
+        self._resources_bodies: Dict[str, EncodedBody] = {}
+        self._resources_lock = asyncio.Lock()
+        self._resources_unsub: Optional[Callable[[], None]] = None
+        self._analyzer: Optional["DashboardAnalyzer"] = None
+        self.analysis_thresholds = {**DEFAULT_ANALYSIS_THRESHOLDS, **(analysis or {})}
+        # 重启前排空进行中的修改
+        self.drain_gate = DrainGate()
+        self.metrics = Metrics()
+        self.metrics.add_collector(self._collect_metrics)
+        if tracing is not None:
+            self.tracer = Tracer(
+                hass,
+                hass.config.path(tracing[CONF_FILE]),
+                tracing[CONF_MAX_BYTES],
+                tracing[CONF_BACKUPS],
+            )
+        else:
+            self.tracer = Tracer(hass)
+        self.capture: Optional[RequestCapture] = None
+        if capture is not None:
+            self.capture = RequestCapture(
+                hass,
+                hass.config.path(capture[CONF_FILE]),
+                capture[CONF_MAX_BYTES],
+                capture[CONF_BACKUPS],
+                capture[CONF_PAYLOADS],
+            )
+        self.watchdog: Optional[LoopWatchdog] = None
+        if stall_threshold:
+            self.watchdog = LoopWatchdog(hass, stall_threshold / 1000)
+        self.admission: Optional[AdmissionControl] = None
+        if admission is not None:
+            self.admission = AdmissionControl(
+                admission[CONF_READ_RATE],
+                admission[CONF_READ_BURST],
+                admission[CONF_WRITE_RATE],
+                admission[CONF_WRITE_BURST],
+                admission[CONF_MAX_QUEUED_MUTATIONS],
+                self.metrics,
+            )
         
+    @instrument_service(SERVICE_GET_LOVELACE_CONFIG, mutation=False)
     async def handle_get_config_service(self, call: ServiceCall) -> None:
         """Handle the get_config service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -72,21 +276,30 @@ class LovelaceAPI:
         self.hass.data.setdefault(DOMAIN, {})
         self.hass.data[DOMAIN]["last_lovelace_config"] = config
         
+    @instrument_service(SERVICE_SAVE_LOVELACE_CONFIG)
     async def handle_save_config_service(self, call: ServiceCall) -> None:
         """Handle the save_config service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
         config = call.data.get("config", {})
         
-        success = await self.save_lovelace_config(dashboard_id, config)
+        self.hass.data.setdefault(DOMAIN, {})
+        if "base_etag" in call.data or "base" in call.data:
+            result = await self.merge_lovelace_config(
+                dashboard_id, config, call.data.get("base_etag"), call.data.get("base")
+            )
+            self.hass.data[DOMAIN]["last_lovelace_merge_result"] = result
+            success = result["success"]
+        else:
+            success = await self.save_lovelace_config(dashboard_id, config)
         
         # Store the result as service data
-        self.hass.data.setdefault(DOMAIN, {})
         self.hass.data[DOMAIN]["last_lovelace_save_result"] = success
         
         # 如果保存成功，重新加载Lovelace配置
         if success:
             await self.reload_lovelace_resources(dashboard_id)
         
+    @instrument_service(SERVICE_UPSERT_LOVELACE_VIEW)
     async def handle_upsert_view_service(self, call: ServiceCall) -> None:
         """Handle the upsert_view service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -103,6 +316,7 @@ class LovelaceAPI:
         if success:
             await self.reload_lovelace_resources(dashboard_id)
         
+    @instrument_service(SERVICE_DELETE_LOVELACE_VIEW)
     async def handle_delete_view_service(self, call: ServiceCall) -> None:
         """Handle the delete_view service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -118,141 +332,720 @@ class LovelaceAPI:
         if success:
             await self.reload_lovelace_resources(dashboard_id)
         
+    def _storage_file(self, dashboard_id: str) -> str:
+        """Return the storage file of a dashboard."""
+        # 默认面板存储在 .storage/lovelace，其他面板存储在 .storage/lovelace.<id>
+        if dashboard_id in (None, "", "lovelace"):
+            return self.hass.config.path(".storage/lovelace")
+        return self.hass.config.path(f".storage/lovelace.{dashboard_id}")
+
+    @staticmethod
+    def _storage_key(dashboard_id: str) -> str:
+        """Return the storage key of a dashboard."""
+        if dashboard_id in (None, "", "lovelace"):
+            return "lovelace"
+        return f"lovelace.{dashboard_id}"
+
+    def _get_lock(self, dashboard_id: str) -> asyncio.Lock:
+        """Return the lock serializing read-modify-write cycles of a dashboard."""
+        key = self._storage_key(dashboard_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def _lock_dashboards(self, *dashboard_ids: str):
+        """Hold the locks of several dashboards, acquired in a stable order.
+
+        Raises Overloaded if admission control rejects the mutation because
+        too many are already queued for one of the dashboards.
+        """
+        by_key = {self._storage_key(d): d for d in dashboard_ids}
+        if self.admission is not None:
+            self.admission.enter_mutation(by_key)
+        acquired = None
+        try:
+            async with AsyncExitStack() as stack:
+                with self.tracer.span("lock_wait", dashboards=list(dashboard_ids)):
+                    for key in sorted(by_key):
+                        await stack.enter_async_context(self._get_lock(by_key[key]))
+                acquired = time.perf_counter()
+                yield
+        finally:
+            if self.admission is not None:
+                # 记录持锁时间，用于估算排队请求的 Retry-After
+                self.admission.exit_mutation(
+                    by_key, time.perf_counter() - acquired if acquired is not None else None
+                )
+
+    @contextmanager
+    def _stage(self, name: str, **args: Any) -> Iterator[Any]:
+        """Time an internal stage for both metrics and tracing."""
+        with self.metrics.stage(name), self.tracer.span(name, **args) as span:
+            yield span
+
+    @staticmethod
+    def _dashboard_id(key: str) -> str:
+        """Return the dashboard ID of a storage key."""
+        return "lovelace" if key == "lovelace" else key[len("lovelace."):]
+
+    async def _load_dashboard(self, dashboard_id: str) -> Optional[CachedDashboard]:
+        """Return the cached dashboard, reading it from storage on a cache miss.
+
+        Concurrent misses for the same dashboard (for example requests that
+        arrive during startup warm-up) share one read. The returned entry is
+        shared and must not be modified.
+        """
+        key = self._storage_key(dashboard_id)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self.metrics.cache_lookups.inc("dashboard", "hit")
+            return entry
+        
+        self.metrics.cache_lookups.inc("dashboard", "miss")
+        return await self._single_flight.run(
+            ("load", key, self._cache.version(key)),
+            lambda: self._async_read_dashboard(dashboard_id),
+        )
+
+    async def _async_read_dashboard(self, dashboard_id: str) -> Optional[CachedDashboard]:
+        """Read a dashboard from storage into the cache."""
+        key = self._storage_key(dashboard_id)
+        storage_file = self._storage_file(dashboard_id)
+        _LOGGER.debug("Reading Lovelace config from: %s", storage_file)
+        version = self._cache.version(key)
+        timings: Dict[str, float] = {}
+        
+        try:
+            with self.tracer.span("file_read", dashboard=dashboard_id) as span:
+                result = await self.hass.async_add_executor_job(
+                    read_json_file, storage_file, timings
+                )
+                span.set(bytes=len(result[0]) if result else 0)
+                span.set_timings(timings)
+        except Exception as e:
+            _LOGGER.error("Error reading Lovelace config from storage: %s", str(e))
+            return None
+        
+        if result is None:
+            return None
+        
+        raw, stored_data, signature = result
+        self.metrics.observe_stages(timings)
+        self.metrics.bytes_read.inc(amount=len(raw))
+        if self._cache.version(key) != version:
+            # 读取期间文件被外部修改，不缓存可能过期的内容
+            return CachedDashboard(stored_data, raw, signature, version)
+        return self._cache.store(key, stored_data, raw, signature, changed=False)
+
+    def _list_dashboard_keys(self) -> list:
+        """Return the storage keys of all dashboards on disk."""
+        try:
+            return sorted(
+                name for name in os.listdir(self.hass.config.path(".storage"))
+                if is_dashboard_file(name)
+            )
+        except FileNotFoundError:
+            return []
+
+    async def async_prewarm(self) -> Dict:
+        """Load, index and serialize every dashboard ahead of the first request."""
+        start = time.perf_counter()
+        keys = await self.hass.async_add_executor_job(self._list_dashboard_keys)
+        
+        entries = await asyncio.gather(
+            *(self._load_dashboard(self._dashboard_id(key)) for key in keys)
+        )
+        for entry in entries:
+            if entry is not None:
+                await self.hass.async_add_executor_job(entry.prepare)
+        
+        duration = time.perf_counter() - start
+        self.warmup = {
+            "dashboards": sum(entry is not None for entry in entries),
+            "duration_ms": round(duration * 1000, 1),
+        }
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["lovelace_warmup"] = self.warmup
+        
+        _LOGGER.info(
+            "Prewarmed %d Lovelace dashboards in %.1f ms",
+            self.warmup["dashboards"], self.warmup["duration_ms"]
+        )
+        return self.warmup
+
+    def stats(self) -> Dict:
+        """Return runtime statistics of the Lovelace API."""
+        return {
+            "single_flight": self._single_flight.stats(),
+            "warmup": self.warmup,
+            "admission": self.admission.stats() if self.admission is not None else None,
+            "mutations": {
+                "in_flight": self.drain_gate.in_flight,
+                "draining": self.drain_gate.draining,
+            },
+        }
+
+    def get_profile_store(self) -> "ProfileStore":
+        """Return the store of request profiles, creating it on first use."""
+        if self._profile_store is None:
+            from .profiling import ProfileStore
+            
+            self._profile_store = ProfileStore(
+                self.hass, self.hass.config.path(PROFILE_DIRECTORY), MAX_PROFILES
+            )
+        return self._profile_store
+
+    def get_analyzer(self) -> "DashboardAnalyzer":
+        """Return the dashboard analyzer, creating it on first use."""
+        if self._analyzer is None:
+            from .analysis import DashboardAnalyzer
+            
+            self._analyzer = DashboardAnalyzer()
+        return self._analyzer
+
+    def _collect_metrics(self):
+        """Yield gauges derived from the single-flight group and warm-up."""
+        stats = self._single_flight.stats()
+        yield (
+            "ha_rest_api_single_flight_requests_total", "counter",
+            "Reads that went through request coalescing.", stats["requests"],
+        )
+        yield (
+            "ha_rest_api_single_flight_joined_total", "counter",
+            "Reads that joined an in-flight computation.", stats["joined"],
+        )
+        yield (
+            "ha_rest_api_single_flight_coalescing_ratio", "gauge",
+            "Share of reads that joined an in-flight computation.",
+            stats["coalescing_ratio"],
+        )
+        yield (
+            "ha_rest_api_mutations_in_flight", "gauge",
+            "Mutating requests and service calls currently running.",
+            self.drain_gate.in_flight,
+        )
+        if self.watchdog is not None:
+            yield (
+                "ha_rest_api_loop_stalls_total", "counter",
+                "Event loop stalls above the threshold while handlers were running.",
+                self.watchdog.stall_count,
+            )
+            yield (
+                "ha_rest_api_loop_max_lag_seconds", "gauge",
+                "Largest event loop lag measured while handlers were running.",
+                self.watchdog.max_lag,
+            )
+        if self.warmup is not None:
+            yield (
+                "ha_rest_api_warmup_duration_seconds", "gauge",
+                "Duration of the startup cache warm-up.",
+                self.warmup["duration_ms"] / 1000,
+            )
+
+    async def _async_startup(self) -> None:
+        """Start the storage watcher, then prewarm the dashboards."""
+        await self.async_start_watcher()
+        
+        # 监听启动前缓存的面板可能已被修改
+        await asyncio.gather(*(self._async_check_storage(key) for key in self._cache.keys()))
+        
+        await self.async_prewarm()
+
+    @callback
+    def async_on_started(self, *_) -> None:
+        """Run the deferred startup work in the background."""
+        self.hass.async_create_background_task(
+            self._async_startup(), "ha_rest_api lovelace startup"
+        )
+
+    async def _read_lovelace_config(self, dashboard_id: str) -> Optional[Dict]:
+        """Read a private, mutable copy of a dashboard configuration.
+
+        Returns None if the dashboard is unavailable.
+        """
+        with self.tracer.span("get_lovelace_config", dashboard=dashboard_id):
+            entry = await self._load_dashboard(dashboard_id)
+            if entry is None:
+                return None
+            with self._stage("copy", bytes=len(entry.raw)):
+                config = await self.hass.async_add_executor_job(entry.copy_config)
+        self._mutation_started[dashboard_id] = time.perf_counter()
+        return config
+
     async def get_lovelace_config(self, dashboard_id: str) -> Dict:
         """Get Lovelace configuration."""
-        storage_file = self.hass.config.path(f".storage/lovelace")
-        _LOGGER.debug("Reading Lovelace config from: %s", storage_file)
+        entry = await self._load_dashboard(dashboard_id)
+        if entry is None:
+            _LOGGER.error("Lovelace config not found: %s", self._storage_file(dashboard_id))
+            return {"success": False, "error": "Could not retrieve Lovelace configuration"}
+        # 返回副本，调用方修改结果不会影响缓存
+        with self._stage("copy", bytes=len(entry.raw)):
+            return await self.hass.async_add_executor_job(entry.copy_config)
+
+    async def _async_get_encoded(
+        self,
+        operation: str,
+        dashboard_id: str,
+        params: tuple,
+        build: Callable[[CachedDashboard], Any],
+        media_type: str = JSON,
+    ) -> Optional[EncodedBody]:
+        """Return a response body derived from a dashboard, encoded as ``media_type``.
+
+        Bodies are memoized on the cache entry, so they live exactly as long
+        as the dashboard version they were built from. Concurrent identical
+        requests share one load and one encode.
+        """
+        key = self._storage_key(dashboard_id)
+        memo_key = (operation, params, media_type)
+        entry = self._cache.get(key)
+        if entry is not None:
+            body = entry.get_encoded(memo_key)
+            if body is not None:
+                self.metrics.cache_lookups.inc("response", "hit")
+                return body
+        self.metrics.cache_lookups.inc("response", "miss")
         
-        if os.path.exists(storage_file):
-            try:
-                with open(storage_file, "r", encoding="utf-8") as file:
-                    stored_data = json.load(file)
-                    _LOGGER.debug("Raw stored data: %s", json.dumps(stored_data, indent=2))
-                    config = stored_data.get("data", {}).get("config", {})
-                    _LOGGER.debug("Extracted config: %s", json.dumps(config, indent=2))
-                    return config
-            except Exception as e:
-                _LOGGER.error("Error reading Lovelace config from storage: %s", str(e))
-        else:
-            _LOGGER.error("Lovelace config file not found: %s", storage_file)
+        async def compute() -> Optional[EncodedBody]:
+            entry = await self._load_dashboard(dashboard_id)
+            if entry is None:
+                return None
+            # 大配置的序列化放到执行器中，避免阻塞事件循环
+            with self._stage("encode", operation=operation, media_type=media_type) as span:
+                body = await self.hass.async_add_executor_job(
+                    entry.encode,
+                    memo_key,
+                    build,
+                    dumps_json if media_type == JSON else functools.partial(dumps, media_type),
+                )
+                span.set(bytes=len(body))
+            return body
         
-        return {"success": False, "error": "Could not retrieve Lovelace configuration"}
+        return await self._single_flight.run(
+            (operation, key, params, media_type, self._cache.version(key)), compute
+        )
 
-    async def save_lovelace_config(self, dashboard_id: str, config: Dict) -> bool:
-        """Save Lovelace configuration."""
-        storage_file = self.hass.config.path(f".storage/lovelace")
+    async def get_lovelace_config_json(
+        self, dashboard_id: str, media_type: str = JSON
+    ) -> Optional[EncodedBody]:
+        """Get Lovelace configuration serialized as JSON (or ``media_type``)."""
+        return await self._async_get_encoded(
+            "config", dashboard_id, (), lambda entry: entry.config, media_type
+        )
+
+    async def get_lovelace_list_json(
+        self, dashboard_id: str, media_type: str = JSON
+    ) -> Optional[EncodedBody]:
+        """Get the Lovelace view list serialized as JSON (or ``media_type``)."""
+        return await self._async_get_encoded(
+            "list", dashboard_id, (), lambda entry: entry.view_list, media_type
+        )
+
+    async def get_lovelace_section_json(
+        self, dashboard_id: str, path: str, media_type: str = JSON
+    ) -> Optional[EncodedBody]:
+        """Get a Lovelace view serialized as JSON (or ``media_type``)."""
+        def build(entry: CachedDashboard) -> Dict:
+            view = entry.get_view(path)
+            if view is None:
+                return {"success": False, "error": f"View with path '{path}' not found"}
+            return view
         
-        try:
-            # 读取现有文件以保留元数据
-            existing_data = {
-                "version": 1,
-                "minor_version": 1,
-                "key": "lovelace",
-                "data": {
-                    "config": {}
-                }
+        return await self._async_get_encoded("section", dashboard_id, (path,), build, media_type)
+
+    async def get_lovelace_bundle(
+        self,
+        dashboard_id: str,
+        path: str,
+        since: Optional[float] = None,
+        view_etag: Optional[str] = None,
+        media_type: str = JSON,
+    ) -> Optional[bytes]:
+        """Get a view together with the states of the entities it references.
+
+        Only states updated after ``since`` (a timestamp from a previous
+        bundle) are included. The view is omitted if ``view_etag`` matches
+        the current one.
+        """
+        entry = await self._load_dashboard(dashboard_id)
+        if entry is None:
+            return None
+        view_body = await self.get_lovelace_section_json(dashboard_id, path, media_type)
+        entities = entry.view_entities(path)
+        if view_body is None or entities is None:
+            # 视图不存在时返回与 lovelace_section 相同的错误
+            return view_body
+        
+        with self.tracer.span("states", entities=len(entities)) as span:
+            states = {}
+            missing = []
+            for entity_id in entities:
+                state = self.hass.states.get(entity_id)
+                if state is None:
+                    missing.append(entity_id)
+                elif since is None or state.last_updated.timestamp() > since:
+                    states[entity_id] = compact_state(state)
+            rest = {
+                "view_etag": view_body.etag,
+                "states": states,
+                "missing": missing,
+                "timestamp": time.time(),
             }
+            span.set(states=len(states))
+        
+        # 视图部分直接复用已缓存的编码结果
+        view = dumps(media_type, None) if view_etag == view_body.etag else view_body
+        return prepend_field(media_type, "view", view, rest)
+
+    def _build_analysis(
+        self, entry: CachedDashboard, dashboard_id: str, thresholds: Dict[str, int]
+    ) -> Dict:
+        """Build the analysis report of a dashboard version; runs in the executor."""
+        from .analysis import flag
+        
+        views, walked = self.get_analyzer().analyze(
+            self._storage_key(dashboard_id), entry.version, entry.views
+        )
+        # 缓存的分析结果是共享的，标记写入新的字典
+        report = []
+        for view in views:
+            item = {**view, "flags": flag(view, thresholds)}
+            if "sections" in view:
+                item["sections"] = [
+                    {**section, "flags": flag(section, thresholds)} for section in view["sections"]
+                ]
+            report.append(item)
+        
+        return {
+            "dashboard_id": dashboard_id,
+            "version": entry.version,
+            "thresholds": thresholds,
+            "totals": {
+                "views": len(report),
+                "cards": sum(view["cards"] for view in report),
+                "bytes": sum(view["bytes"] for view in report),
+                "duplicated_cards": sum(view["duplicated_cards"] for view in report),
+            },
+            "flagged": [view["path"] for view in report if view["flags"]],
+            "views": report,
+            "walked_views": walked,
+        }
+
+    async def get_lovelace_analysis_json(
+        self,
+        dashboard_id: str,
+        thresholds: Optional[Dict[str, int]] = None,
+        media_type: str = JSON,
+    ) -> Optional[EncodedBody]:
+        """Get the render cost report of every view and section of a dashboard.
+
+        ``thresholds`` override the configured ones for this report. Views
+        are only walked again if their content changed, and the report is
+        memoized with the dashboard version like other response bodies.
+        """
+        thresholds = {**self.analysis_thresholds, **(thresholds or {})}
+        return await self._async_get_encoded(
+            "analysis",
+            dashboard_id,
+            tuple(sorted(thresholds.items())),
+            lambda entry: self._build_analysis(entry, dashboard_id, thresholds),
+            media_type,
+        )
+
+    async def save_lovelace_config(self, dashboard_id: str, config: Dict) -> bool:
+        """Save Lovelace configuration.
+
+        Raises LovelaceValidationError before any I/O if the configuration is
+        structurally invalid; only views changed since the cached version are checked.
+        """
+        entry = self._cache.get(self._storage_key(dashboard_id))
+        with self._stage("validate"):
+            validate_config(config, entry.views_by_path() if entry else None)
+        
+        async with self._lock_dashboards(dashboard_id):
+            return await self._write_lovelace_config(dashboard_id, config)
+
+    def _find_base(self, key: str, etag: str) -> Optional[Dict]:
+        """Return the config of a kept version of a dashboard by its ETag; runs in the executor."""
+        encoders: Dict[str, Callable[[Any], bytes]] = {JSON: dumps_json}
+        for media_type in (MSGPACK, CBOR):
+            if available(media_type):
+                encoders[media_type] = functools.partial(dumps, media_type)
+        for revision in self._cache.revisions(key):
+            if revision.matches(etag, encoders):
+                return revision.config()
+        return None
+
+    async def merge_lovelace_config(
+        self,
+        dashboard_id: str,
+        config: Dict,
+        base_etag: Optional[str] = None,
+        base: Optional[Dict] = None,
+    ) -> Dict:
+        """Save a config edited from a base version, keeping changes made since then.
+
+        The base is either the ETag of the config the writer started from
+        (as returned by ``GET /lovelace``) or that config itself. If the
+        dashboard changed since, the changes of both sides are merged
+        three-way and saved only if they do not overlap; otherwise nothing
+        is written and the result lists the conflicts. A base ETag that is
+        no longer kept fails with reason ``unknown_base``.
+
+        Raises LovelaceValidationError like ``save_lovelace_config``.
+        """
+        key = self._storage_key(dashboard_id)
+        entry = self._cache.get(key)
+        with self._stage("validate"):
+            validate_config(config, entry.views_by_path() if entry else None)
+        if base_etag is not None:
+            # 接受弱 ETag 和不带引号的值
+            base_etag = base_etag.strip().removeprefix("W/")
+            if not base_etag.startswith('"'):
+                base_etag = f'"{base_etag}"'
+        
+        async with self._lock_dashboards(dashboard_id):
+            entry = await self._load_dashboard(dashboard_id)
+            if entry is None:
+                return {"success": False, "error": "Could not retrieve Lovelace configuration"}
+            # 与 GET /lovelace 使用相同的缓存键，ETag 一致且只计算一次
+            current = await self.hass.async_add_executor_job(
+                entry.encode, ("config", (), JSON), lambda entry: entry.config
+            )
+            
+            merged, counts = config, None
+            if base is not None or base_etag != current.etag:
+                if base is None:
+                    base = await self.hass.async_add_executor_job(self._find_base, key, base_etag)
+                    if base is None:
+                        return {
+                            "success": False,
+                            "reason": "unknown_base",
+                            "error": f"Base version {base_etag} is no longer available, "
+                                     "send the base config instead",
+                            "etag": current.etag,
+                        }
+                
+                from .merge import merge_config
+                
+                with self._stage("merge", views=len(entry.views)) as span:
+                    merged, conflicts, counts = await self.hass.async_add_executor_job(
+                        merge_config, base, config, entry.config
+                    )
+                    span.set(conflicts=len(conflicts), **counts)
+                if conflicts:
+                    return {
+                        "success": False,
+                        "reason": "conflict",
+                        "error": f"Changes conflict with the current version in {len(conflicts)} places",
+                        "etag": current.etag,
+                        "conflicts": conflicts,
+                    }
+                with self._stage("validate"):
+                    validate_config(merged, entry.views_by_path())
             
-            if os.path.exists(storage_file):
-                with open(storage_file, "r", encoding="utf-8") as file:
-                    existing_data = json.load(file)
+            if not await self._write_lovelace_config(dashboard_id, merged):
+                return {"success": False, "error": "Could not save Lovelace configuration"}
+        
+        body = await self.get_lovelace_config_json(dashboard_id)
+        return {
+            "success": True,
+            "merged": counts is not None,
+            "etag": body.etag if body is not None else None,
+            "views": counts,
+        }
+
+    async def _write_lovelace_config(self, dashboard_id: str, config: Dict) -> bool:
+        """Write Lovelace configuration; the caller must hold the dashboard lock.
+
+        The written config is owned by the cache afterwards and must not be
+        modified by the caller.
+        """
+        key = self._storage_key(dashboard_id)
+        storage_file = self._storage_file(dashboard_id)
+        started = self._mutation_started.pop(dashboard_id, None)
+        if started is not None:
+            now = time.perf_counter()
+            self.metrics.stage_latency.observe(now - started, "mutate")
+            self.tracer.record("mutate", started, now, dashboard=dashboard_id)
+        timings: Dict[str, float] = {}
+        
+        with self.tracer.span("save_lovelace_config", dashboard=dashboard_id) as span:
+            try:
+                # 保留现有文件的元数据
+                entry = await self._load_dashboard(dashboard_id)
+                if entry is not None:
+                    stored_data = dict(entry.stored_data)
+                else:
+                    stored_data = {
+                        "version": 1,
+                        "minor_version": 1,
+                        "key": key,
+                    }
             
-            # 更新配置部分
-            existing_data["data"]["config"] = config
+                # 更新配置部分
+                stored_data["data"] = {**stored_data.get("data", {}), "config": config}
             
-            # 写回文件
-            with open(storage_file, "w", encoding="utf-8") as file:
-                json.dump(existing_data, file, indent=2)
+                # 写回文件；写入期间忽略该文件的变更通知
+                self._writing.add(key)
+                try:
+                    raw, signature = await self.hass.async_add_executor_job(
+                        write_json_file, storage_file, stored_data, timings
+                    )
+                finally:
+                    self._writing.discard(key)
             
-            return True
-        except Exception as e:
-            _LOGGER.error("Error saving Lovelace config to storage: %s", str(e))
-            return False
+                self.metrics.observe_stages(timings)
+                self.metrics.bytes_written.inc(amount=len(raw))
+                span.set(bytes=len(raw))
+                span.set_timings(timings)
+                self._cache.store(key, stored_data, raw, signature, changed=True)
+                return True
+            except Exception as e:
+                _LOGGER.error("Error saving Lovelace config to storage: %s", str(e))
+                return False
+
+    @callback
+    def _async_storage_changed(self, key: str) -> None:
+        """Handle a change of a dashboard storage file reported by the watcher."""
+        if key in self._writing:
+            return
+        self.hass.async_create_task(self._async_check_storage(key))
+
+    async def _async_check_storage(self, key: str) -> None:
+        """Invalidate a dashboard if its storage file differs from the cached one."""
+        if self._cache.get(key) is not None:
+            signature = await self.hass.async_add_executor_job(
+                file_signature, self.hass.config.path(".storage", key)
+            )
+            entry = self._cache.get(key)
+            if key in self._writing or (entry is not None and entry.signature == signature):
+                # 自己写入的文件
+                return
+        
+        version = self._cache.invalidate(key)
+        dashboard_id = self._dashboard_id(key)
+        self.metrics.external_changes.inc(dashboard_id)
+        _LOGGER.info(
+            f"Lovelace dashboard '{dashboard_id}' changed outside ha_rest_api, "
+            f"now at version {version}"
+        )
+        self._async_notify_changed(dashboard_id)
+
+    async def async_start_watcher(self) -> None:
+        """Start watching the dashboard storage files for external writes."""
+        from .storage_watcher import LovelaceStorageWatcher
+        
+        if self._watcher is None:
+            self._watcher = LovelaceStorageWatcher(
+                self.hass, self.hass.config.path(".storage"), self._async_storage_changed
+            )
+        await self._watcher.async_start()
+
+    @callback
+    def async_stop_watcher(self, *_) -> None:
+        """Stop watching the dashboard storage files."""
+        if self._watcher is not None:
+            self._watcher.async_stop()
+
+    @callback
+    def async_stop(self, *_) -> None:
+        """Stop the storage watcher, the loop watchdog and watching the resources."""
+        self.async_stop_watcher()
+        if self._resources_unsub is not None:
+            self._resources_unsub()
+            self._resources_unsub = None
+        if self.watchdog is not None:
+            self.watchdog.async_stop()
     
     async def upsert_lovelace_view(self, dashboard_id: str, title: str, path: str) -> bool:
         """Add a new view or update an existing view in Lovelace configuration."""
-        try:
-            # 获取当前配置
-            current_config = await self.get_lovelace_config(dashboard_id)
-            if not isinstance(current_config, dict):
-                _LOGGER.error("Invalid Lovelace configuration")
-                return False
+        async with self._lock_dashboards(dashboard_id):
+            try:
+                # 获取当前配置
+                current_config = await self._read_lovelace_config(dashboard_id)
+                if not isinstance(current_config, dict):
+                    _LOGGER.error("Invalid Lovelace configuration")
+                    return False
             
-            # 确保config有views字段
-            if "views" not in current_config:
-                current_config["views"] = []
-            
-            # 查找是否已存在相同path的视图
-            found = False
-            for i, view in enumerate(current_config["views"]):
-                if view.get("path") == path:
-                    # 更新已存在的视图
-                    _LOGGER.info(f"Updating existing view with path '{path}'")
-                    current_config["views"][i]["title"] = title
-                    found = True
-                    break
-            
-            # 如果没找到，添加新视图
-            if not found:
-                _LOGGER.info(f"Adding new view with path '{path}'")
-                new_view = {
-                    "type": "sections",
-                    "max_columns": 4,
-                    "title": title,
-                    "path": path,
-                    "sections": [
-                        {
-                            "type": "grid",
-                            "cards": [
-                                {
-                                    "type": "heading",
-                                    "heading": "新建部件"
-                                }
-                            ]
-                        }
-                    ]
-                }
-                current_config["views"].append(new_view)
+                # 确保config有views字段
+                if "views" not in current_config:
+                    current_config["views"] = []
             
-            # 保存更新后的配置
-            success = await self.save_lovelace_config(dashboard_id, current_config)
-            return success
+                # 查找是否已存在相同path的视图
+                found = False
+                for i, view in enumerate(current_config["views"]):
+                    if view.get("path") == path:
+                        # 更新已存在的视图
+                        _LOGGER.info(f"Updating existing view with path '{path}'")
+                        current_config["views"][i]["title"] = title
+                        found = True
+                        break
             
-        except Exception as e:
-            _LOGGER.error(f"Error upserting Lovelace view: {str(e)}")
-            return False
+                # 如果没找到，添加新视图
+                if not found:
+                    _LOGGER.info(f"Adding new view with path '{path}'")
+                    new_view = {
+                        "type": "sections",
+                        "max_columns": 4,
+                        "title": title,
+                        "path": path,
+                        "sections": [
+                            {
+                                "type": "grid",
+                                "cards": [
+                                    {
+                                        "type": "heading",
+                                        "heading": "新建部件"
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                    current_config["views"].append(new_view)
+            
+                # 保存更新后的配置
+                success = await self._write_lovelace_config(dashboard_id, current_config)
+                return success
+            
+            except Exception as e:
+                _LOGGER.error(f"Error upserting Lovelace view: {str(e)}")
+                return False
     
     async def delete_lovelace_view(self, dashboard_id: str, path: str) -> bool:
         """Delete a view from Lovelace configuration by its path."""
-        try:
-            # 获取当前配置
-            current_config = await self.get_lovelace_config(dashboard_id)
-            if not isinstance(current_config, dict):
-                _LOGGER.error("Invalid Lovelace configuration")
-                return False
+        async with self._lock_dashboards(dashboard_id):
+            try:
+                # 获取当前配置
+                current_config = await self._read_lovelace_config(dashboard_id)
+                if not isinstance(current_config, dict):
+                    _LOGGER.error("Invalid Lovelace configuration")
+                    return False
             
-            # 确保config有views字段
-            if "views" not in current_config:
-                _LOGGER.warning("No views found in the configuration")
-                return False
+                # 确保config有views字段
+                if "views" not in current_config:
+                    _LOGGER.warning("No views found in the configuration")
+                    return False
             
-            # 寻找匹配path的视图
-            original_count = len(current_config["views"])
-            current_config["views"] = [view for view in current_config["views"] if view.get("path") != path]
+                # 寻找匹配path的视图
+                original_count = len(current_config["views"])
+                current_config["views"] = [view for view in current_config["views"] if view.get("path") != path]
             
-            # 检查是否有删除操作
-            if len(current_config["views"]) < original_count:
-                _LOGGER.info(f"Deleted view with path '{path}'")
-                # 保存更新后的配置
-                success = await self.save_lovelace_config(dashboard_id, current_config)
-                return success
-            else:
-                _LOGGER.warning(f"No view found with path '{path}'")
-                return False
+                # 检查是否有删除操作
+                if len(current_config["views"]) < original_count:
+                    _LOGGER.info(f"Deleted view with path '{path}'")
+                    # 保存更新后的配置
+                    success = await self._write_lovelace_config(dashboard_id, current_config)
+                    return success
+                else:
+                    _LOGGER.warning(f"No view found with path '{path}'")
+                    return False
             
-        except Exception as e:
-            _LOGGER.error(f"Error deleting Lovelace view: {str(e)}")
-            return False
+            except Exception as e:
+                _LOGGER.error(f"Error deleting Lovelace view: {str(e)}")
+                return False
     
     async def reload_lovelace_resources(self, dashboard_id: str = "lovelace") -> None:
         """Reload Lovelace resources to make changes take effect."""
@@ -260,15 +1053,22 @@ class LovelaceAPI:
             _LOGGER.info(f"Reloading Lovelace dashboard '{dashboard_id}'")
             
             # 使用 services.call 重新加载
-            await self.hass.services.async_call("lovelace", "reload", {"force": True})
+            self.metrics.reloads.inc(dashboard_id)
+            with self._stage("reload_lovelace_resources", dashboard=dashboard_id):
+                await self.hass.services.async_call("lovelace", "reload", {"force": True})
             
-            # 发布自定义事件，用于前端监听和刷新
-            self.hass.bus.async_fire("lovelace_updated", {"dashboard_id": dashboard_id})
+            self._async_notify_changed(dashboard_id)
             
             _LOGGER.info(f"Lovelace dashboard '{dashboard_id}' reload request sent")
             
         except Exception as e:
             _LOGGER.error(f"Error reloading Lovelace resources: {str(e)}")
+
+    @callback
+    def _async_notify_changed(self, dashboard_id: str) -> None:
+        """Notify listeners that a dashboard changed."""
+        # 发布自定义事件，用于前端监听和刷新
+        self.hass.bus.async_fire("lovelace_updated", {"dashboard_id": dashboard_id})
     
     async def _call_websocket_api_raw(self, data: Dict) -> None:
         """Call WebSocket API with raw data."""
@@ -311,15 +1111,15 @@ class LovelaceAPI:
         """Get a specific view from Lovelace configuration."""
         try:
             # 获取当前配置
-            current_config = await self.get_lovelace_config(dashboard_id)
-            if not isinstance(current_config, dict):
+            entry = await self._load_dashboard(dashboard_id)
+            if entry is None:
                 _LOGGER.error("Invalid Lovelace configuration")
                 return {"success": False, "error": "Invalid configuration"}
             
-            # 查找指定path的视图
-            for view in current_config.get("views", []):
-                if view.get("path") == path:
-                    return view
+            # 通过 path 索引查找视图
+            view = entry.get_view(path)
+            if view is not None:
+                return copy.deepcopy(view)
             
             return {"success": False, "error": f"View with path '{path}' not found"}
             
@@ -328,46 +1128,108 @@ class LovelaceAPI:
             return {"success": False, "error": str(e)}
     
     async def set_lovelace_section(self, dashboard_id: str, path: str, view_config: Dict) -> bool:
-        """Set content for a specific view in Lovelace configuration."""
-        try:
-            # 获取当前配置
-            current_config = await self.get_lovelace_config(dashboard_id)
-            if not isinstance(current_config, dict):
-                _LOGGER.error("Invalid Lovelace configuration")
-                return False
+        """Set content for a specific view in Lovelace configuration.
+
+        Raises LovelaceValidationError before any I/O if the view is invalid.
+        """
+        with self._stage("validate"):
+            validate_view(view_config)
+        
+        async with self._lock_dashboards(dashboard_id):
+            try:
+                # 获取当前配置
+                current_config = await self._read_lovelace_config(dashboard_id)
+                if not isinstance(current_config, dict):
+                    _LOGGER.error("Invalid Lovelace configuration")
+                    return False
             
-            # 确保config有views字段
-            if "views" not in current_config:
-                current_config["views"] = []
+                # 确保config有views字段
+                if "views" not in current_config:
+                    current_config["views"] = []
             
-            # 查找并更新指定path的视图
-            found = False
-            for i, view in enumerate(current_config["views"]):
-                if view.get("path") == path:
-                    # 保持原有path
-                    view_config["path"] = path
-                    current_config["views"][i] = view_config
-                    found = True
-                    break
+                # 查找并更新指定path的视图
+                found = False
+                with self.tracer.span("scan", views=len(current_config["views"])):
+                    for i, view in enumerate(current_config["views"]):
+                        if view.get("path") == path:
+                            # 保持原有path
+                            view_config["path"] = path
+                            current_config["views"][i] = view_config
+                            found = True
+                            break
             
-            if not found:
-                _LOGGER.warning(f"View with path '{path}' not found, creating new")
-                view_config["path"] = path
-                current_config["views"].append(view_config)
+                if not found:
+                    _LOGGER.warning(f"View with path '{path}' not found, creating new")
+                    view_config["path"] = path
+                    current_config["views"].append(view_config)
             
-            # 保存更新后的配置
-            success = await self.save_lovelace_config(dashboard_id, current_config)
+                # 保存更新后的配置
+                success = await self._write_lovelace_config(dashboard_id, current_config)
             
-            # 如果保存成功，重新加载Lovelace配置
-            if success:
-                await self.reload_lovelace_resources(dashboard_id)
+                # 如果保存成功，重新加载Lovelace配置
+                if success:
+                    await self.reload_lovelace_resources(dashboard_id)
             
-            return success
+                return success
             
-        except Exception as e:
-            _LOGGER.error(f"Error setting Lovelace section: {str(e)}")
-            return False
+            except Exception as e:
+                _LOGGER.error(f"Error setting Lovelace section: {str(e)}")
+                return False
     
+    async def async_restart(
+        self, timeout: float = DEFAULT_DRAIN_TIMEOUT, force: bool = False
+    ) -> Dict:
+        """Drain in-flight mutations, flush queued writes, then restart Home Assistant.
+
+        New mutations are rejected from the start of the drain. If some are
+        still running after ``timeout`` seconds, Home Assistant is only
+        restarted with ``force``; otherwise mutations are admitted again and
+        the failure is returned.
+        """
+        _LOGGER.info(
+            "Draining %d in-flight mutations before restarting Home Assistant",
+            self.drain_gate.in_flight,
+        )
+        with self._stage("drain"):
+            result = await self.drain_gate.drain(timeout)
+        if not result["drained"] and not force:
+            self.drain_gate.resume()
+            _LOGGER.warning(
+                "Not restarting Home Assistant: %d mutations still running after %s s",
+                result["remaining"], timeout,
+            )
+            return {
+                "success": False,
+                "error": f"{result['remaining']} mutations still running after {timeout} s",
+                **result,
+            }
+        
+        # 面板和模板在请求完成前已经写入；这里只需写出轨迹和请求录制中排队的行
+        await self.tracer.async_flush()
+        if self.capture is not None:
+            await self.capture.async_flush()
+        
+        try:
+            await self.hass.services.async_call("homeassistant", "restart")
+        except Exception:
+            self.drain_gate.resume()
+            raise
+        _LOGGER.info(
+            "Restarting Home Assistant after draining %d mutations in %.1f ms",
+            result["in_flight"], result["drain_ms"],
+        )
+        return {"success": True, **result}
+
+    @instrument_service(SERVICE_RESTART_HASS, mutation=False)
+    async def handle_restart_service(self, call: ServiceCall) -> None:
+        """Handle the restart_hass service call."""
+        result = await self.async_restart(call.data.get("timeout"), call.data.get("force"))
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_restart_result"] = result
+
+    @instrument_service(SERVICE_GET_LOVELACE_SECTION, mutation=False)
     async def handle_get_section_service(self, call: ServiceCall) -> None:
         """Handle the get_section service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -379,6 +1241,7 @@ class LovelaceAPI:
         self.hass.data.setdefault(DOMAIN, {})
         self.hass.data[DOMAIN]["last_section_get_result"] = view
         
+    @instrument_service(SERVICE_SET_LOVELACE_SECTION)
     async def handle_set_section_service(self, call: ServiceCall) -> None:
         """Handle the set_section service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -399,26 +1262,19 @@ class LovelaceAPI:
         """Get a simplified list of Lovelace views with just title and path."""
         try:
             # Get current config
-            current_config = await self.get_lovelace_config(dashboard_id)
-            if not isinstance(current_config, dict):
+            entry = await self._load_dashboard(dashboard_id)
+            if entry is None:
                 _LOGGER.error("Invalid Lovelace configuration")
                 return []
             
-            # Extract title and path from each view
-            view_list = []
-            for view in current_config.get("views", []):
-                if "path" in view and "title" in view:
-                    view_list.append({
-                        "title": view["title"],
-                        "path": view["path"]
-                    })
-            
-            return view_list
+            # Title and path of each view, cached with the dashboard
+            return [dict(item) for item in entry.view_list]
             
         except Exception as e:
             _LOGGER.error(f"Error getting Lovelace view list: {str(e)}")
             return []
     
+    @instrument_service(SERVICE_GET_LOVELACE_LIST, mutation=False)
     async def handle_get_list_service(self, call: ServiceCall) -> None:
         """Handle the get_list service call."""
         dashboard_id = call.data.get("dashboard_id", "lovelace")
@@ -429,223 +1285,1848 @@ class LovelaceAPI:
         self.hass.data.setdefault(DOMAIN, {})
         self.hass.data[DOMAIN]["last_list_get_result"] = view_list
 
+    @staticmethod
+    def _find_view(config: Dict, path: str) -> int:
+        """Return the index of the view with the given path, or -1."""
+        for i, view in enumerate(config.get("views", [])):
+            if view.get("path") == path:
+                return i
+        return -1
 
-class LovelaceAPIView(HomeAssistantView):
-    """View to handle Lovelace API requests."""
+    @staticmethod
+    def _check_position(position: Any, length: int) -> Optional[Dict]:
+        """Return an error if a position is not an index from 0 to ``length``."""
+        if position is None or (
+            isinstance(position, int) and not isinstance(position, bool) and 0 <= position <= length
+        ):
+            return None
+        return {"success": False, "error": f"position must be an integer from 0 to {length}"}
 
-    url = LOVELACE_API_PATH
-    name = "api:ha_rest_api:lovelace"
+    async def _dashboard_registered(self, dashboard_id: str) -> bool:
+        """Return True if a dashboard ID belongs to a storage mode dashboard of Home Assistant."""
+        if self._storage_key(dashboard_id) == "lovelace":
+            return True
+        result = await self.hass.async_add_executor_job(
+            read_json_file, self.hass.config.path(".storage", "lovelace_dashboards")
+        )
+        data = result[1] if result is not None and isinstance(result[1], dict) else {}
+        items = (data.get("data") or {}).get("items") or []
+        return any(
+            isinstance(item, dict)
+            and item.get("id") == dashboard_id
+            and item.get("mode", "storage") == "storage"
+            for item in items
+        )
 
-    def __init__(self, lovelace_api: LovelaceAPI) -> None:
-        """Initialize the Lovelace API view."""
-        self.lovelace_api = lovelace_api
-        self.hass = lovelace_api.hass
+    @staticmethod
+    def _insert(items: list, item: Any, position: Optional[int]) -> None:
+        """Insert an item at a position, appending when no position is given."""
+        if position is None:
+            items.append(item)
+        else:
+            items.insert(position, item)
 
-    async def get(self, request: web.Request) -> web.Response:
-        """Handle GET request for Lovelace configuration."""
-        try:
-            dashboard_id = request.query.get("dashboard_id", "lovelace")
-            config = await self.lovelace_api.get_lovelace_config(dashboard_id)
-            return self.json(config)
-        except Exception as e:
-            _LOGGER.error("Error getting Lovelace config: %s", str(e))
-            return self.json({"success": False, "error": str(e)}, status_code=500)
+    async def _write_transfer(
+        self,
+        source_dashboard_id: str,
+        source_config: Dict,
+        target_dashboard_id: str,
+        target_config: Dict,
+        write_source: bool,
+    ) -> Dict:
+        """Write the dashboards of a copy or move; the caller must hold both locks.
 
-    async def post(self, request: web.Request) -> web.Response:
-        """Handle POST request to update Lovelace configuration."""
-        try:
-            data = await request.json()
-            dashboard_id = data.get("dashboard_id", "lovelace")
-            config = data.get("config")
-            
-            if not config:
-                return self.json(
-                    {"success": False, "error": "No config provided"}, 
-                    status_code=400
+        The target is written first, so a failure never loses the view or
+        section. If the source cannot be written afterwards, the target is
+        restored to its previous version. ``dashboards`` lists the dashboards
+        written, which the caller reloads even on failure.
+        """
+        previous = await self._load_dashboard(target_dashboard_id) if write_source else None
+        if not await self._write_lovelace_config(target_dashboard_id, target_config):
+            return {"success": False, "error": "Could not save target dashboard"}
+        dashboards = [target_dashboard_id]
+        
+        if write_source:
+            if not await self._write_lovelace_config(source_dashboard_id, source_config):
+                # 恢复目标面板，避免视图同时存在于两个面板中
+                restored = previous is not None and await self._write_lovelace_config(
+                    target_dashboard_id,
+                    await self.hass.async_add_executor_job(previous.copy_config),
                 )
+                error = "Could not save source dashboard"
+                if not restored:
+                    _LOGGER.error(
+                        f"Could not restore dashboard '{target_dashboard_id}' after a failed move"
+                    )
+                    error += f", the copy in '{target_dashboard_id}' was kept"
+                return {"success": False, "error": error, "dashboards": dashboards}
+            dashboards.append(source_dashboard_id)
+        return {"success": True, "dashboards": dashboards}
+
+    async def _transfer_view(
+        self,
+        source_dashboard_id: str,
+        path: str,
+        target_dashboard_id: str,
+        new_path: Optional[str],
+        position: Optional[int],
+        move: bool,
+    ) -> Dict:
+        """Copy or move a view, writing each affected dashboard once."""
+        target_path = new_path or path
+        same_dashboard = (
+            self._storage_key(source_dashboard_id) == self._storage_key(target_dashboard_id)
+        )
+        if same_dashboard and not move and target_path == path:
+            return {"success": False, "error": "new_path is required when copying within a dashboard"}
+        
+        async with self._lock_dashboards(source_dashboard_id, target_dashboard_id):
+            source_config = await self._read_lovelace_config(source_dashboard_id)
+            if not isinstance(source_config, dict):
+                return {"success": False, "error": f"Dashboard '{source_dashboard_id}' not found"}
             
-            success = await self.lovelace_api.save_lovelace_config(dashboard_id, config)
+            index = self._find_view(source_config, path)
+            if index < 0:
+                return {"success": False, "error": f"View with path '{path}' not found"}
             
-            # 如果保存成功，重新加载Lovelace配置
-            if success:
-                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
-                
-            return self.json({"success": success})
+            if same_dashboard:
+                target_config = source_config
+            else:
+                target_config = await self._read_lovelace_config(target_dashboard_id)
+                if target_config is None and await self._dashboard_registered(target_dashboard_id):
+                    # 已注册但尚未保存过的面板从空配置开始
+                    target_config = {}
+                if not isinstance(target_config, dict):
+                    return {"success": False, "error": f"Dashboard '{target_dashboard_id}' not found"}
+            target_config.setdefault("views", [])
+            
+            existing = self._find_view(target_config, target_path)
+            if existing >= 0 and not (same_dashboard and move and existing == index):
+                return {"success": False, "error": f"View with path '{target_path}' already exists"}
+            
+            # 同一面板内移动时，插入位置按移除该视图后的列表计算
+            error = self._check_position(
+                position, len(target_config["views"]) - (same_dashboard and move)
+            )
+            if error is not None:
+                return error
+            
+            if move:
+                view = source_config["views"].pop(index)
+            else:
+                view = copy.deepcopy(source_config["views"][index])
+            view["path"] = target_path
+            self._insert(target_config["views"], view, position)
+            
+            result = await self._write_transfer(
+                source_dashboard_id, source_config, target_dashboard_id, target_config,
+                move and not same_dashboard,
+            )
+            if not result["success"]:
+                return result
+        
+        _LOGGER.info(
+            f"{'Moved' if move else 'Copied'} view '{path}' from '{source_dashboard_id}' "
+            f"to '{target_dashboard_id}' as '{target_path}'"
+        )
+        return result
+
+    async def _transfer_section(
+        self,
+        source_dashboard_id: str,
+        path: str,
+        section_index: int,
+        target_dashboard_id: str,
+        target_path: str,
+        position: Optional[int],
+        move: bool,
+    ) -> Dict:
+        """Copy or move a section between views, writing each affected dashboard once."""
+        same_dashboard = (
+            self._storage_key(source_dashboard_id) == self._storage_key(target_dashboard_id)
+        )
+        
+        async with self._lock_dashboards(source_dashboard_id, target_dashboard_id):
+            source_config = await self._read_lovelace_config(source_dashboard_id)
+            if not isinstance(source_config, dict):
+                return {"success": False, "error": f"Dashboard '{source_dashboard_id}' not found"}
+            
+            source_index = self._find_view(source_config, path)
+            if source_index < 0:
+                return {"success": False, "error": f"View with path '{path}' not found"}
+            source_sections = source_config["views"][source_index].get("sections", [])
+            if not 0 <= section_index < len(source_sections):
+                return {"success": False, "error": f"Section {section_index} not found in view '{path}'"}
+            
+            if same_dashboard:
+                target_config = source_config
+            else:
+                target_config = await self._read_lovelace_config(target_dashboard_id)
+                if not isinstance(target_config, dict):
+                    return {"success": False, "error": f"Dashboard '{target_dashboard_id}' not found"}
+            
+            target_index = self._find_view(target_config, target_path)
+            if target_index < 0:
+                return {"success": False, "error": f"View with path '{target_path}' not found"}
+            target_sections = target_config["views"][target_index].setdefault("sections", [])
+            
+            same_view = same_dashboard and target_index == source_index
+            error = self._check_position(position, len(target_sections) - (same_view and move))
+            if error is not None:
+                return error
+            
+            if move:
+                section = source_sections.pop(section_index)
+            else:
+                section = copy.deepcopy(source_sections[section_index])
+            self._insert(target_sections, section, position)
+            
+            result = await self._write_transfer(
+                source_dashboard_id, source_config, target_dashboard_id, target_config,
+                move and not same_dashboard,
+            )
+            if not result["success"]:
+                return result
+        
+        _LOGGER.info(
+            f"{'Moved' if move else 'Copied'} section {section_index} of view '{path}' "
+            f"to view '{target_path}' of '{target_dashboard_id}'"
+        )
+        return result
+
+    async def copy_lovelace_view(
+        self,
+        dashboard_id: str,
+        path: str,
+        target_dashboard_id: Optional[str] = None,
+        new_path: Optional[str] = None,
+        position: Optional[int] = None,
+        section_index: Optional[int] = None,
+        target_path: Optional[str] = None,
+    ) -> Dict:
+        """Copy a view, or one of its sections when section_index is given."""
+        try:
+            target_dashboard_id = target_dashboard_id or dashboard_id
+            if section_index is not None:
+                return await self._transfer_section(
+                    dashboard_id, path, section_index,
+                    target_dashboard_id, target_path or path, position, move=False
+                )
+            return await self._transfer_view(
+                dashboard_id, path, target_dashboard_id, new_path, position, move=False
+            )
+        except Overloaded:
+            raise
         except Exception as e:
-            _LOGGER.error("Error updating Lovelace config: %s", str(e))
-            return self.json({"success": False, "error": str(e)}, status_code=500)
+            _LOGGER.error(f"Error copying Lovelace view: {str(e)}")
+            return {"success": False, "error": str(e)}
 
+    async def move_lovelace_view(
+        self,
+        dashboard_id: str,
+        path: str,
+        target_dashboard_id: Optional[str] = None,
+        new_path: Optional[str] = None,
+        position: Optional[int] = None,
+        section_index: Optional[int] = None,
+        target_path: Optional[str] = None,
+    ) -> Dict:
+        """Move a view, or one of its sections when section_index is given."""
+        try:
+            target_dashboard_id = target_dashboard_id or dashboard_id
+            if section_index is not None:
+                return await self._transfer_section(
+                    dashboard_id, path, section_index,
+                    target_dashboard_id, target_path or path, position, move=True
+                )
+            return await self._transfer_view(
+                dashboard_id, path, target_dashboard_id, new_path, position, move=True
+            )
+        except Overloaded:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Error moving Lovelace view: {str(e)}")
+            return {"success": False, "error": str(e)}
 
-class LovelateSectionAPIView(HomeAssistantView):
-    """View to handle Lovelace section API requests."""
+    async def reorder_lovelace_views(
+        self,
+        dashboard_id: str,
+        paths: Optional[list] = None,
+        path: Optional[str] = None,
+        order: Optional[list] = None,
+    ) -> Dict:
+        """Reorder the views of a dashboard, or the sections of one view.
 
-    url = LOVELACE_SECTION_API_PATH
+        Views listed in ``paths`` are placed first in the given order and the
+        remaining views keep their relative order. For sections, ``order`` must
+        be a permutation of the section indexes of the view at ``path``.
+        """
+        try:
+            async with self._lock_dashboards(dashboard_id):
+                current_config = await self._read_lovelace_config(dashboard_id)
+                if not isinstance(current_config, dict):
+                    return {"success": False, "error": "Invalid configuration"}
+                views = current_config.get("views", [])
+                
+                if path is not None:
+                    index = self._find_view(current_config, path)
+                    if index < 0:
+                        return {"success": False, "error": f"View with path '{path}' not found"}
+                    sections = views[index].get("sections", [])
+                    if sorted(order or []) != list(range(len(sections))):
+                        return {"success": False, "error": "order must be a permutation of the section indexes"}
+                    views[index]["sections"] = [sections[i] for i in order]
+                elif paths:
+                    by_path = {view.get("path"): view for view in views}
+                    missing = [p for p in paths or [] if p not in by_path]
+                    if missing:
+                        return {"success": False, "error": f"Views not found: {', '.join(missing)}"}
+                    listed = set(paths)
+                    current_config["views"] = [by_path[p] for p in dict.fromkeys(paths)] + [
+                        view for view in views if view.get("path") not in listed
+                    ]
+                else:
+                    return {"success": False, "error": "paths or path and order are required"}
+                
+                if not await self._write_lovelace_config(dashboard_id, current_config):
+                    return {"success": False, "error": "Could not save Lovelace configuration"}
+            
+            return {"success": True, "dashboards": [dashboard_id]}
+        except Overloaded:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Error reordering Lovelace views: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    async def _handle_transfer_service(self, call: ServiceCall, move: bool) -> None:
+        """Handle the copy_view and move_view service calls."""
+        dashboard_id = call.data.get("dashboard_id", "lovelace")
+        method = self.move_lovelace_view if move else self.copy_lovelace_view
+        
+        result = await method(
+            dashboard_id,
+            call.data.get("path"),
+            target_dashboard_id=call.data.get("target_dashboard_id"),
+            new_path=call.data.get("new_path"),
+            position=call.data.get("position"),
+            section_index=call.data.get("section_index"),
+            target_path=call.data.get("target_path"),
+        )
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN][f"last_view_{'move' if move else 'copy'}_result"] = result
+        
+        # 每个受影响的面板重新加载一次
+        for affected in result.get("dashboards", []):
+            await self.reload_lovelace_resources(affected)
+
+    @instrument_service(SERVICE_COPY_LOVELACE_VIEW)
+    async def handle_copy_view_service(self, call: ServiceCall) -> None:
+        """Handle the copy_view service call."""
+        await self._handle_transfer_service(call, move=False)
+
+    @instrument_service(SERVICE_MOVE_LOVELACE_VIEW)
+    async def handle_move_view_service(self, call: ServiceCall) -> None:
+        """Handle the move_view service call."""
+        await self._handle_transfer_service(call, move=True)
+
+    @instrument_service(SERVICE_REORDER_LOVELACE_VIEWS)
+    async def handle_reorder_views_service(self, call: ServiceCall) -> None:
+        """Handle the reorder_views service call."""
+        dashboard_id = call.data.get("dashboard_id", "lovelace")
+        
+        result = await self.reorder_lovelace_views(
+            dashboard_id,
+            paths=call.data.get("paths"),
+            path=call.data.get("path"),
+            order=call.data.get("order"),
+        )
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_view_reorder_result"] = result
+        
+        if result.get("success"):
+            await self.reload_lovelace_resources(dashboard_id)
+
+    async def _load_templates(self) -> Dict[str, Dict]:
+        """Load the view template registry from storage."""
+        if self._templates is not None:
+            return self._templates
+        
+        storage_file = self.hass.config.path(f".storage/{TEMPLATE_STORAGE_KEY}")
+        templates = {}
+        try:
+            result = await self.hass.async_add_executor_job(read_json_file, storage_file)
+            if result is not None:
+                self.metrics.bytes_read.inc(amount=len(result[0]))
+                templates = result[1].get("data", {}).get("templates", {})
+        except Exception as e:
+            _LOGGER.error("Error reading view templates from storage: %s", str(e))
+        
+        if self._templates is None:
+            self._templates = templates
+        return self._templates
+
+    async def _save_templates(self) -> bool:
+        """Write the view template registry back to storage."""
+        storage_file = self.hass.config.path(f".storage/{TEMPLATE_STORAGE_KEY}")
+        
+        try:
+            raw, _ = await self.hass.async_add_executor_job(write_json_file, storage_file, {
+                "version": 1,
+                "minor_version": 1,
+                "key": TEMPLATE_STORAGE_KEY,
+                "data": {
+                    "templates": dict(self._templates)
+                }
+            })
+            self.metrics.bytes_written.inc(amount=len(raw))
+            return True
+        except Exception as e:
+            _LOGGER.error("Error saving view templates to storage: %s", str(e))
+            return False
+
+    async def _get_compiled_template(self, name: str) -> Optional["CompiledViewTemplate"]:
+        """Get a compiled view template, compiling it on first use."""
+        from .view_template import compile_view_template
+        
+        compiled = self._compiled_templates.get(name)
+        if compiled is None:
+            template = (await self._load_templates()).get(name)
+            if template is None:
+                return None
+            compiled = compile_view_template(template)
+            self._compiled_templates[name] = compiled
+        return compiled
+
+    async def get_lovelace_templates(self) -> Dict[str, Dict]:
+        """Get all registered view templates."""
+        return await self._load_templates()
+
+    async def save_lovelace_template(self, name: str, template: Dict) -> bool:
+        """Add or replace a view template in the registry."""
+        templates = await self._load_templates()
+        previous = templates.get(name)
+        templates[name] = template
+        self._compiled_templates.pop(name, None)
+        
+        success = await self._save_templates()
+        if not success:
+            # 保存失败时恢复内存中的注册表
+            if previous is None:
+                templates.pop(name, None)
+            else:
+                templates[name] = previous
+        return success
+
+    async def delete_lovelace_template(self, name: str) -> bool:
+        """Delete a view template from the registry."""
+        templates = await self._load_templates()
+        if name not in templates:
+            _LOGGER.warning(f"No view template found with name '{name}'")
+            return False
+        
+        template = templates.pop(name)
+        self._compiled_templates.pop(name, None)
+        
+        success = await self._save_templates()
+        if not success:
+            templates[name] = template
+        return success
+
+    async def instantiate_lovelace_template(
+        self, dashboard_id: str, name: str, parameter_sets: list
+    ) -> Dict:
+        """Render a view template for every parameter set and upsert the views.
+
+        All rendered views are committed with a single write; the caller is
+        responsible for the (single) reload afterwards.
+        """
+        from .view_template import TemplateRenderError
+        
+        async with self._lock_dashboards(dashboard_id):
+            try:
+                compiled = await self._get_compiled_template(name)
+                if compiled is None:
+                    return {"success": False, "error": f"View template '{name}' not found"}
+            
+                rendered_views = []
+                for index, params in enumerate(parameter_sets):
+                    try:
+                        view = compiled.render(params)
+                    except TemplateRenderError as e:
+                        return {"success": False, "error": f"Parameter set {index}: {e}"}
+                    if not isinstance(view, dict) or not view.get("path"):
+                        return {
+                            "success": False,
+                            "error": f"Parameter set {index}: rendered view has no path",
+                        }
+                    try:
+                        validate_view(view, ["parameters", index])
+                    except LovelaceValidationError as e:
+                        return e.as_dict()
+                    rendered_views.append(view)
+            
+                # 获取当前配置
+                current_config = await self._read_lovelace_config(dashboard_id)
+                if not isinstance(current_config, dict):
+                    _LOGGER.error("Invalid Lovelace configuration")
+                    return {"success": False, "error": "Invalid configuration"}
+            
+                if "views" not in current_config:
+                    current_config["views"] = []
+                views = current_config["views"]
+            
+                # 建立 path 索引，避免每个视图都扫描一次列表
+                index_by_path = {view.get("path"): i for i, view in enumerate(views)}
+                created = []
+                updated = []
+                for view in rendered_views:
+                    path = view["path"]
+                    if path in index_by_path:
+                        views[index_by_path[path]] = view
+                        if path not in created and path not in updated:
+                            updated.append(path)
+                    else:
+                        index_by_path[path] = len(views)
+                        views.append(view)
+                        created.append(path)
+            
+                _LOGGER.info(
+                    f"Instantiated view template '{name}': "
+                    f"{len(created)} created, {len(updated)} updated"
+                )
+            
+                # 所有视图一次性保存
+                success = await self._write_lovelace_config(dashboard_id, current_config)
+                result = {"success": success, "created": created, "updated": updated}
+                if not success:
+                    result["error"] = "Could not save Lovelace configuration"
+                return result
+            
+            except Exception as e:
+                _LOGGER.error(f"Error instantiating view template: {str(e)}")
+                return {"success": False, "error": str(e)}
+
+    @instrument_service(SERVICE_SAVE_LOVELACE_TEMPLATE)
+    async def handle_save_template_service(self, call: ServiceCall) -> None:
+        """Handle the save_template service call."""
+        name = call.data.get("name")
+        template = call.data.get("template")
+        
+        success = await self.save_lovelace_template(name, template)
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_template_save_result"] = success
+
+    @instrument_service(SERVICE_DELETE_LOVELACE_TEMPLATE)
+    async def handle_delete_template_service(self, call: ServiceCall) -> None:
+        """Handle the delete_template service call."""
+        name = call.data.get("name")
+        
+        success = await self.delete_lovelace_template(name)
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_template_delete_result"] = success
+
+    @instrument_service(SERVICE_INSTANTIATE_LOVELACE_TEMPLATE)
+    async def handle_instantiate_template_service(self, call: ServiceCall) -> None:
+        """Handle the instantiate_template service call."""
+        dashboard_id = call.data.get("dashboard_id", "lovelace")
+        name = call.data.get("name")
+        parameter_sets = call.data.get("parameters", [])
+        
+        result = await self.instantiate_lovelace_template(dashboard_id, name, parameter_sets)
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_template_instantiate_result"] = result
+        
+        # 如果保存成功，重新加载Lovelace配置
+        if result.get("success"):
+            await self.reload_lovelace_resources(dashboard_id)
+
+    def _resource_collection(self) -> Any:
+        """Return the resource collection of the Lovelace integration."""
+        data = self.hass.data.get("lovelace")
+        if isinstance(data, dict):
+            resources = data.get("resources")
+        else:
+            resources = getattr(data, "resources", None)
+        if resources is None:
+            raise ResourceError("Lovelace resources are not available", status=503)
+        return resources
+
+    async def _load_resources(self) -> Any:
+        """Load the resource collection and watch it for changes."""
+        resources = self._resource_collection()
+        if not getattr(resources, "loaded", True):
+            await resources.async_load()
+            resources.loaded = True
+        if self._resources_unsub is None and hasattr(resources, "async_add_listener"):
+            self._resources_unsub = resources.async_add_listener(self._async_resources_changed)
+        return resources
+
+    async def _async_resources_changed(self, change_type: str, item_id: str, item: Dict) -> None:
+        """Drop the cached listing when the resource collection changes."""
+        self._resources_bodies.clear()
+
+    async def _load_mutable_resources(self) -> Any:
+        """Load the resource collection; fails if it is managed in YAML."""
+        resources = await self._load_resources()
+        if not hasattr(resources, "async_create_item"):
+            raise ResourceError("Lovelace resources are managed in YAML mode")
+        return resources
+
+    async def get_lovelace_resources_json(self, media_type: str = JSON) -> EncodedBody:
+        """Get the encoded list of resources, cached until the collection changes."""
+        body = self._resources_bodies.get(media_type)
+        if body is not None:
+            self.metrics.cache_lookups.inc("resources", "hit")
+            return body
+        self.metrics.cache_lookups.inc("resources", "miss")
+        resources = await self._load_resources()
+        body = EncodedBody(dumps(media_type, list(resources.async_items())))
+        self._resources_bodies[media_type] = body
+        return body
+
+    async def get_lovelace_resources(self) -> list:
+        """Get the list of resources."""
+        return json.loads(await self.get_lovelace_resources_json())
+
+    async def create_lovelace_resource(self, resource: Dict) -> Dict:
+        """Add a resource; returns the created item."""
+        resource = validate_resource(resource)
+        async with self._resources_lock:
+            resources = await self._load_mutable_resources()
+            item = await resources.async_create_item(
+                {"res_type": resource["type"], "url": resource["url"]}
+            )
+            self._resources_bodies.clear()
+        _LOGGER.info("Created Lovelace resource %s", resource["url"])
+        return {"success": True, "resource": item}
+
+    async def update_lovelace_resource(self, resource_id: str, resource: Dict) -> Dict:
+        """Change the URL and/or type of a resource; returns the updated item."""
+        async with self._resources_lock:
+            resources = await self._load_mutable_resources()
+            current = self._find_resource(resources, resource_id)
+            resource = validate_resource({
+                "url": resource.get("url", current["url"]),
+                "type": resource.get("type", current.get("type")),
+            })
+            item = await resources.async_update_item(
+                resource_id, {"res_type": resource["type"], "url": resource["url"]}
+            )
+            self._resources_bodies.clear()
+        _LOGGER.info("Updated Lovelace resource %s", resource_id)
+        return {"success": True, "resource": item}
+
+    async def delete_lovelace_resource(self, resource_id: str) -> Dict:
+        """Delete a resource."""
+        async with self._resources_lock:
+            resources = await self._load_mutable_resources()
+            self._find_resource(resources, resource_id)
+            await resources.async_delete_item(resource_id)
+            self._resources_bodies.clear()
+        _LOGGER.info("Deleted Lovelace resource %s", resource_id)
+        return {"success": True}
+
+    @staticmethod
+    def _find_resource(resources: Any, resource_id: str) -> Dict:
+        """Return a resource by ID; raises a 404 ResourceError if there is none."""
+        for item in resources.async_items():
+            if item["id"] == resource_id:
+                return item
+        raise ResourceError(f"Resource '{resource_id}' not found", status=404)
+
+    async def sync_lovelace_resources(
+        self, desired: list, prune: bool = False, dry_run: bool = False
+    ) -> Dict:
+        """Bring the resources in line with a desired list, applying only the differences."""
+        async with self._resources_lock:
+            resources = await self._load_mutable_resources()
+            plan = plan_sync(list(resources.async_items()), desired, prune)
+            result = {
+                "success": True,
+                "dry_run": dry_run,
+                "created": plan["create"],
+                "updated": plan["update"],
+                "deleted": plan["delete"],
+                "unchanged": len(plan["unchanged"]),
+            }
+            if dry_run or not (plan["create"] or plan["update"] or plan["delete"]):
+                return result
+
+            # 先删除再更新和创建，避免短时间内同一资源加载两次
+            try:
+                for item in plan["delete"]:
+                    await resources.async_delete_item(item["id"])
+                for update in plan["update"]:
+                    await resources.async_update_item(
+                        update["id"], {"res_type": update["type"], "url": update["url"]}
+                    )
+                result["created"] = [
+                    await resources.async_create_item(
+                        {"res_type": resource["type"], "url": resource["url"]}
+                    )
+                    for resource in plan["create"]
+                ]
+            finally:
+                self._resources_bodies.clear()
+        _LOGGER.info(
+            "Synced Lovelace resources: %d created, %d updated, %d deleted, %d unchanged",
+            len(plan["create"]), len(plan["update"]), len(plan["delete"]), len(plan["unchanged"]),
+        )
+        return result
+
+    async def _handle_resource_service(self, key: str, operation: Awaitable[Dict]) -> None:
+        """Store the result of a resource service call."""
+        try:
+            result = await operation
+        except ResourceError as e:
+            _LOGGER.error("Error managing Lovelace resources: %s", str(e))
+            result = e.as_dict()
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN][key] = result
+
+    @instrument_service(SERVICE_GET_LOVELACE_RESOURCES, mutation=False)
+    async def handle_get_resources_service(self, call: ServiceCall) -> None:
+        """Handle the get_resources service call."""
+        resources = await self.get_lovelace_resources()
+        
+        # Store the result as service data
+        self.hass.data.setdefault(DOMAIN, {})
+        self.hass.data[DOMAIN]["last_resources_get_result"] = resources
+
+    @instrument_service(SERVICE_CREATE_LOVELACE_RESOURCE)
+    async def handle_create_resource_service(self, call: ServiceCall) -> None:
+        """Handle the create_resource service call."""
+        await self._handle_resource_service(
+            "last_resource_create_result",
+            self.create_lovelace_resource({"url": call.data["url"], "type": call.data["type"]}),
+        )
+
+    @instrument_service(SERVICE_UPDATE_LOVELACE_RESOURCE)
+    async def handle_update_resource_service(self, call: ServiceCall) -> None:
+        """Handle the update_resource service call."""
+        changes = {key: call.data[key] for key in ("url", "type") if key in call.data}
+        await self._handle_resource_service(
+            "last_resource_update_result",
+            self.update_lovelace_resource(call.data["resource_id"], changes),
+        )
+
+    @instrument_service(SERVICE_DELETE_LOVELACE_RESOURCE)
+    async def handle_delete_resource_service(self, call: ServiceCall) -> None:
+        """Handle the delete_resource service call."""
+        await self._handle_resource_service(
+            "last_resource_delete_result",
+            self.delete_lovelace_resource(call.data["resource_id"]),
+        )
+
+    @instrument_service(SERVICE_SYNC_LOVELACE_RESOURCES)
+    async def handle_sync_resources_service(self, call: ServiceCall) -> None:
+        """Handle the sync_resources service call."""
+        await self._handle_resource_service(
+            "last_resources_sync_result",
+            self.sync_lovelace_resources(
+                call.data["resources"], call.data["prune"], call.data["dry_run"]
+            ),
+        )
+
+    async def iter_lovelace_archive(self, compress: bool = False) -> AsyncIterator[bytes]:
+        """Yield a tar archive of all dashboards and the resources, piece by piece.
+
+        Only one chunk of one storage file is held in memory at a time.
+        """
+        from .archive import (
+            ARCHIVE_FORMAT,
+            CHUNK_SIZE,
+            MANIFEST_MEMBER,
+            RESOURCES_MEMBER,
+            STORAGE_PREFIX,
+            ArchiveError,
+            TarWriter,
+            open_storage_file,
+        )
+
+        writer = TarWriter(compress)
+        keys = await self.hass.async_add_executor_job(self._list_dashboard_keys)
+        now = time.time()
+        manifest = {"format": ARCHIVE_FORMAT, "created": now, "dashboards": keys}
+        yield writer.member(MANIFEST_MEMBER, dumps_json(manifest), now)
+        
+        with self.tracer.span("export_archive", dashboards=len(keys)) as span:
+            total = 0
+            for key in keys:
+                opened = await self.hass.async_add_executor_job(
+                    open_storage_file, self.hass.config.path(".storage", key)
+                )
+                if opened is None:
+                    # 列出文件后面板被删除
+                    continue
+                file, size, mtime = opened
+                try:
+                    yield writer.header(STORAGE_PREFIX + key, size, mtime)
+                    remaining = size
+                    while remaining:
+                        chunk = await self.hass.async_add_executor_job(
+                            file.read, min(CHUNK_SIZE, remaining)
+                        )
+                        if not chunk:
+                            raise ArchiveError(f"Storage file '{key}' was truncated while exporting")
+                        remaining -= len(chunk)
+                        yield writer.write(chunk)
+                    yield writer.pad(size)
+                finally:
+                    await self.hass.async_add_executor_job(file.close)
+                total += size
+                self.metrics.bytes_read.inc(amount=size)
+            span.set(bytes=total)
+        
+        try:
+            resources = await self.get_lovelace_resources_json()
+        except ResourceError:
+            resources = None
+        if resources is not None:
+            yield writer.member(RESOURCES_MEMBER, resources, now)
+        yield writer.close()
+
+    async def import_lovelace_archive(
+        self,
+        read: Callable[[int], Awaitable[bytes]],
+        prune_resources: bool = False,
+        dry_run: bool = False,
+    ) -> Dict:
+        """Import a dashboard archive streamed in through ``read``.
+
+        Every dashboard is validated and written atomically on its own, so
+        an invalid member does not prevent the others from being imported.
+        Lovelace is reloaded once at the end.
+        """
+        from .archive import (
+            ARCHIVE_FORMAT,
+            MANIFEST_MEMBER,
+            RESOURCES_MEMBER,
+            ArchiveError,
+            TarReader,
+            parse_dashboard,
+            storage_key,
+        )
+
+        reader = TarReader(read)
+        imported = []
+        skipped = []
+        errors = []
+        resources = None
+        
+        try:
+            with self.tracer.span("import_archive", dry_run=dry_run) as span:
+                try:
+                    while True:
+                        info = await reader.next()
+                        if info is None:
+                            break
+                        name = info.name
+                        key = storage_key(name)
+                        if not info.isfile() or (
+                            key is None and name not in (MANIFEST_MEMBER, RESOURCES_MEMBER)
+                        ):
+                            skipped.append(name)
+                            continue
+                        
+                        raw = await reader.read(info)
+                        try:
+                            if name == MANIFEST_MEMBER:
+                                manifest = json.loads(raw)
+                                archive_format = manifest.get("format") if isinstance(manifest, dict) else None
+                                if archive_format != ARCHIVE_FORMAT:
+                                    raise ArchiveError(f"Unsupported archive format {archive_format}")
+                            elif name == RESOURCES_MEMBER:
+                                resources = await self.sync_lovelace_resources(
+                                    json.loads(raw), prune=prune_resources, dry_run=dry_run
+                                )
+                            else:
+                                config = await self.hass.async_add_executor_job(parse_dashboard, raw)
+                                dashboard_id = self._dashboard_id(key)
+                                if not dry_run:
+                                    async with self._lock_dashboards(dashboard_id):
+                                        if not await self._write_lovelace_config(dashboard_id, config):
+                                            raise ValueError("Could not write the dashboard")
+                                imported.append(dashboard_id)
+                        except ArchiveError:
+                            raise
+                        except (ValueError, HomeAssistantError) as e:
+                            # 包括修改队列已满（Overloaded），该面板未写入
+                            errors.append({"member": name, "error": str(e)})
+                except ArchiveError as e:
+                    # 归档损坏时停止读取，已导入的面板保留
+                    errors.append({"member": None, "error": str(e)})
+                span.set(dashboards=len(imported), errors=len(errors))
+        finally:
+            # 导入中途出错时也要重新加载已写入的面板
+            if imported and not dry_run:
+                await self.reload_lovelace_resources(imported[0])
+                for dashboard_id in imported[1:]:
+                    self._async_notify_changed(dashboard_id)
+        
+        _LOGGER.info(
+            "Imported Lovelace archive: %d dashboards, %d errors%s",
+            len(imported), len(errors), " (dry run)" if dry_run else "",
+        )
+        return {
+            "success": not errors,
+            "dry_run": dry_run,
+            "imported": imported,
+            "resources": resources,
+            "skipped": skipped,
+            "errors": errors,
+        }
+
+
+def _encoded_response(
+    request: web.Request, body: EncodedBody, media_type: str = JSON
+) -> web.Response:
+    """Return a pre-encoded body with its ETag.
+
+    Answers 304 without a body if the client already holds this version.
+    """
+    headers = {"ETag": body.etag, "Vary": "Accept"}
+    if etag_matches(request.headers.get("If-None-Match"), body.etag):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type=media_type, headers=headers)
+
+
+def _negotiated_response(view: HomeAssistantView, request: web.Request, value: Any) -> web.Response:
+    """Return a value encoded in the media type the client accepts."""
+    media_type = negotiate(request.headers.get("Accept"))
+    if media_type == JSON:
+        return view.json(value)
+    return web.Response(
+        body=dumps(media_type, value), content_type=media_type, headers={"Vary": "Accept"}
+    )
+
+
+class LovelaceAPIView(HomeAssistantView):
+    """View to handle Lovelace API requests."""
+
+    url = LOVELACE_API_PATH
+    name = "api:ha_rest_api:lovelace"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for Lovelace configuration."""
+        try:
+            dashboard_id = request.query.get("dashboard_id", "lovelace")
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_config_json(dashboard_id, media_type)
+            if body is None:
+                # 保持与 get_lovelace_config 相同的错误响应
+                config = await self.lovelace_api.get_lovelace_config(dashboard_id)
+                return self.json(config)
+            return _encoded_response(request, body, media_type)
+        except Exception as e:
+            _LOGGER.error("Error getting Lovelace config: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to update Lovelace configuration."""
+        try:
+            data = await read_body(request)
+            dashboard_id = data.get("dashboard_id", "lovelace")
+            config = data.get("config")
+            
+            if not config:
+                return self.json(
+                    {"success": False, "error": "No config provided"}, 
+                    status_code=400
+                )
+            
+            base_etag, base = data.get("base_etag"), data.get("base")
+            if base_etag is not None or base is not None:
+                if not isinstance(base_etag or "", str) or not isinstance(base or {}, dict):
+                    return self.json(
+                        {"success": False, "error": "base_etag must be a string and base an object"},
+                        status_code=400
+                    )
+                result = await self.lovelace_api.merge_lovelace_config(
+                    dashboard_id, config, base_etag, base
+                )
+                if result["success"]:
+                    await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                    status = 200
+                else:
+                    status = {"conflict": 409, "unknown_base": 412}.get(result.get("reason"), 500)
+                return self.json(
+                    result,
+                    status_code=status,
+                    headers={"ETag": result["etag"]} if result.get("etag") else None,
+                )
+            
+            success = await self.lovelace_api.save_lovelace_config(dashboard_id, config)
+            
+            # 如果保存成功，重新加载Lovelace配置
+            if success:
+                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                
+            return self.json({"success": success})
+        except LovelaceValidationError as e:
+            return self.json(e.as_dict(), status_code=400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error updating Lovelace config: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelateSectionAPIView(HomeAssistantView):
+    """View to handle Lovelace section API requests."""
+
+    url = LOVELACE_SECTION_API_PATH
     name = "api:ha_rest_api:lovelace_section"
 
     def __init__(self, lovelace_api: LovelaceAPI) -> None:
-        """Initialize the Lovelace section API view."""
+        """Initialize the Lovelace section API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for a specific Lovelace view."""
+        try:
+            dashboard_id = request.query.get("dashboard_id", "lovelace")
+            path = request.query.get("path")
+            
+            if not path:
+                return self.json(
+                    {"success": False, "error": "Path is required"}, 
+                    status_code=400
+                )
+            
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_section_json(dashboard_id, path, media_type)
+            if body is None:
+                view = await self.lovelace_api.get_lovelace_section(dashboard_id, path)
+                return self.json(view)
+            return _encoded_response(request, body, media_type)
+        except Exception as e:
+            _LOGGER.error("Error getting Lovelace section: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to set a Lovelace view's content."""
+        try:
+            data = await read_body(request)
+            dashboard_id = data.get("dashboard_id", "lovelace")
+            path = data.get("path")
+            view_config = data.get("view_config")
+            
+            if not path or not view_config:
+                return self.json(
+                    {"success": False, "error": "Path and view_config are required"}, 
+                    status_code=400
+                )
+            
+            success = await self.lovelace_api.set_lovelace_section(dashboard_id, path, view_config)
+            
+            # 如果保存成功，重新加载Lovelace配置
+            if success:
+                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                
+            return self.json({"success": success})
+        except LovelaceValidationError as e:
+            return self.json(e.as_dict(), status_code=400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error setting Lovelace section: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelateSectionUpsertAPIView(HomeAssistantView):
+    """View to handle Lovelace section upsert API requests."""
+
+    url = LOVELACE_SECTION_API_PATH + "/upsert"
+    name = "api:ha_rest_api:lovelace_section_upsert"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace section upsert API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to add/update a Lovelace view."""
+        try:
+            data = await read_body(request)
+            dashboard_id = data.get("dashboard_id", "lovelace")
+            title = data.get("title")
+            path = data.get("path")
+            
+            if not title or not path:
+                return self.json(
+                    {"success": False, "error": "Title and path are required"}, 
+                    status_code=400
+                )
+            
+            success = await self.lovelace_api.upsert_lovelace_view(dashboard_id, title, path)
+            
+            # 如果保存成功，重新加载Lovelace配置
+            if success:
+                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                
+            return self.json({"success": success})
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error upserting Lovelace view: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceSectionDeleteAPIView(HomeAssistantView):
+    """View to handle Lovelace section delete API requests."""
+
+    url = LOVELACE_SECTION_DELETE_API_PATH
+    name = "api:ha_rest_api:lovelace_section_delete"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace section delete API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to delete a Lovelace view."""
+        try:
+            data = await read_body(request)
+            dashboard_id = data.get("dashboard_id", "lovelace")
+            path = data.get("path")
+            
+            if not path:
+                return self.json(
+                    {"success": False, "error": "Path is required"}, 
+                    status_code=400
+                )
+            
+            success = await self.lovelace_api.delete_lovelace_view(dashboard_id, path)
+            
+            # 如果保存成功，重新加载Lovelace配置
+            if success:
+                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                
+            return self.json({"success": success})
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error deleting Lovelace view: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class RestartHassAPIView(HomeAssistantView):
+    """View to handle Home Assistant restart requests."""
+
+    url = RESTART_HASS_API_PATH
+    name = "api:ha_rest_api:restart"
+    # 重启请求本身不是需要排空的修改
+    drain = False
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to restart Home Assistant once in-flight mutations finished."""
+        try:
+            try:
+                timeout = float(request.query.get("timeout", DEFAULT_DRAIN_TIMEOUT))
+            except ValueError:
+                timeout = -1
+            if not 0 <= timeout < float("inf"):
+                return self.json(
+                    {"success": False, "error": "timeout must be a non-negative number"},
+                    status_code=400,
+                )
+            result = await self.lovelace_api.async_restart(
+                timeout, force=request.query.get("force") in ("1", "true")
+            )
+            return self.json(result, status_code=200 if result["success"] else 503)
+        except Exception as e:
+            _LOGGER.error("Error restarting Home Assistant: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceListAPIView(HomeAssistantView):
+    """View to handle Lovelace list API requests."""
+
+    url = LOVELACE_LIST_API_PATH
+    name = "api:ha_rest_api:lovelace_list"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace list API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for Lovelace views list."""
+        try:
+            dashboard_id = request.query.get("dashboard_id", "lovelace")
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_list_json(dashboard_id, media_type)
+            if body is None:
+                view_list = await self.lovelace_api.get_lovelace_list(dashboard_id)
+                return self.json(view_list)
+            return _encoded_response(request, body, media_type)
+        except Exception as e:
+            _LOGGER.error("Error getting Lovelace views list: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceBundleAPIView(HomeAssistantView):
+    """View to get a Lovelace view together with the states it shows."""
+
+    url = LOVELACE_BUNDLE_API_PATH
+    name = "api:ha_rest_api:lovelace_bundle"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace bundle API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for a view bundle."""
+        try:
+            dashboard_id = request.query.get("dashboard_id", "lovelace")
+            path = request.query.get("path")
+            
+            if not path:
+                return self.json(
+                    {"success": False, "error": "Path is required"}, 
+                    status_code=400
+                )
+            
+            since = request.query.get("since")
+            if since is not None:
+                try:
+                    since = float(since)
+                except ValueError:
+                    return self.json(
+                        {"success": False, "error": "since must be a timestamp"},
+                        status_code=400
+                    )
+            
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_bundle(
+                dashboard_id, path, since, request.query.get("view_etag"), media_type
+            )
+            if body is None:
+                view = await self.lovelace_api.get_lovelace_section(dashboard_id, path)
+                return self.json(view)
+            return web.Response(body=body, content_type=media_type, headers={"Vary": "Accept"})
+        except Exception as e:
+            _LOGGER.error("Error getting Lovelace bundle: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceAnalysisAPIView(HomeAssistantView):
+    """View to report the render cost of the views of a dashboard."""
+
+    url = LOVELACE_ANALYSIS_API_PATH
+    name = "api:ha_rest_api:lovelace_analysis"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace analysis API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for a dashboard analysis."""
+        try:
+            dashboard_id = request.query.get("dashboard_id", "lovelace")
+            
+            # 查询参数中的阈值覆盖配置中的阈值
+            thresholds = {}
+            for name in DEFAULT_ANALYSIS_THRESHOLDS:
+                if name in request.query:
+                    try:
+                        # 与配置中的阈值使用同样的校验
+                        thresholds[name] = cv.positive_int(request.query[name])
+                    except vol.Invalid:
+                        return self.json(
+                            {"success": False, "error": f"{name} must be a non-negative integer"},
+                            status_code=400
+                        )
+            
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_analysis_json(
+                dashboard_id, thresholds, media_type
+            )
+            if body is None:
+                return self.json(
+                    {"success": False, "error": f"Dashboard '{dashboard_id}' not found"},
+                    status_code=404
+                )
+            return _encoded_response(request, body, media_type)
+        except Exception as e:
+            _LOGGER.error("Error analyzing Lovelace config: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceResourcesAPIView(HomeAssistantView):
+    """View to list and create Lovelace resources."""
+
+    url = LOVELACE_RESOURCES_API_PATH
+    name = "api:ha_rest_api:lovelace_resources"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace resources API view."""
         self.lovelace_api = lovelace_api
         self.hass = lovelace_api.hass
 
+    @instrument_view
     async def get(self, request: web.Request) -> web.Response:
-        """Handle GET request for a specific Lovelace view."""
+        """Handle GET request for the list of resources."""
         try:
-            dashboard_id = request.query.get("dashboard_id", "lovelace")
-            path = request.query.get("path")
+            media_type = negotiate(request.headers.get("Accept"))
+            body = await self.lovelace_api.get_lovelace_resources_json(media_type)
+            return _encoded_response(request, body, media_type)
+        except ResourceError as e:
+            return self.json(e.as_dict(), status_code=e.status)
+        except Exception as e:
+            _LOGGER.error("Error getting Lovelace resources: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+    @instrument_view
+    @require_admin
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to add a resource."""
+        try:
+            data = await read_body(request)
+            result = await self.lovelace_api.create_lovelace_resource(data)
+            return self.json(result)
+        except ResourceError as e:
+            return self.json(e.as_dict(), status_code=e.status)
+        except Exception as e:
+            _LOGGER.error("Error creating Lovelace resource: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceResourceUpdateAPIView(HomeAssistantView):
+    """View to change the URL or type of a Lovelace resource."""
+
+    url = LOVELACE_RESOURCES_UPDATE_API_PATH
+    name = "api:ha_rest_api:lovelace_resources_update"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace resource update API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    @require_admin
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to update a resource."""
+        try:
+            data = await read_body(request)
+            resource_id = data.get("resource_id")
             
-            if not path:
+            if not resource_id:
                 return self.json(
-                    {"success": False, "error": "Path is required"}, 
+                    {"success": False, "error": "Resource ID is required"},
                     status_code=400
                 )
             
-            view = await self.lovelace_api.get_lovelace_section(dashboard_id, path)
-            return self.json(view)
+            changes = {key: data[key] for key in ("url", "type") if key in data}
+            result = await self.lovelace_api.update_lovelace_resource(resource_id, changes)
+            return self.json(result)
+        except ResourceError as e:
+            return self.json(e.as_dict(), status_code=e.status)
         except Exception as e:
-            _LOGGER.error("Error getting Lovelace section: %s", str(e))
+            _LOGGER.error("Error updating Lovelace resource: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
+
+class LovelaceResourceDeleteAPIView(HomeAssistantView):
+    """View to delete a Lovelace resource."""
+
+    url = LOVELACE_RESOURCES_DELETE_API_PATH
+    name = "api:ha_rest_api:lovelace_resources_delete"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace resource delete API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    @require_admin
     async def post(self, request: web.Request) -> web.Response:
-        """Handle POST request to set a Lovelace view's content."""
+        """Handle POST request to delete a resource."""
         try:
-            data = await request.json()
-            dashboard_id = data.get("dashboard_id", "lovelace")
-            path = data.get("path")
-            view_config = data.get("view_config")
+            data = await read_body(request)
+            resource_id = data.get("resource_id")
             
-            if not path or not view_config:
+            if not resource_id:
                 return self.json(
-                    {"success": False, "error": "Path and view_config are required"}, 
+                    {"success": False, "error": "Resource ID is required"},
                     status_code=400
                 )
             
-            success = await self.lovelace_api.set_lovelace_section(dashboard_id, path, view_config)
+            result = await self.lovelace_api.delete_lovelace_resource(resource_id)
+            return self.json(result)
+        except ResourceError as e:
+            return self.json(e.as_dict(), status_code=e.status)
+        except Exception as e:
+            _LOGGER.error("Error deleting Lovelace resource: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceResourcesSyncAPIView(HomeAssistantView):
+    """View to bring the Lovelace resources in line with a desired list."""
+
+    url = LOVELACE_RESOURCES_SYNC_API_PATH
+    name = "api:ha_rest_api:lovelace_resources_sync"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace resources sync API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    @require_admin
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to sync the resources."""
+        try:
+            data = await read_body(request)
+            desired = data.get("resources")
             
-            # 如果保存成功，重新加载Lovelace配置
-            if success:
-                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
-                
-            return self.json({"success": success})
+            if not isinstance(desired, list):
+                return self.json(
+                    {"success": False, "error": "A list of resources is required"},
+                    status_code=400
+                )
+            
+            result = await self.lovelace_api.sync_lovelace_resources(
+                desired,
+                prune=bool(data.get("prune", False)),
+                dry_run=bool(data.get("dry_run", False)),
+            )
+            return self.json(result)
+        except ResourceError as e:
+            return self.json(e.as_dict(), status_code=e.status)
         except Exception as e:
-            _LOGGER.error("Error setting Lovelace section: %s", str(e))
+            _LOGGER.error("Error syncing Lovelace resources: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
 
-class LovelateSectionUpsertAPIView(HomeAssistantView):
-    """View to handle Lovelace section upsert API requests."""
+class LovelaceArchiveAPIView(HomeAssistantView):
+    """View to export and import all dashboards as one archive."""
 
-    url = LOVELACE_SECTION_API_PATH + "/upsert"
-    name = "api:ha_rest_api:lovelace_section_upsert"
+    url = LOVELACE_ARCHIVE_API_PATH
+    name = "api:ha_rest_api:lovelace_archive"
+    capture_body = False
 
     def __init__(self, lovelace_api: LovelaceAPI) -> None:
-        """Initialize the Lovelace section upsert API view."""
+        """Initialize the Lovelace archive API view."""
         self.lovelace_api = lovelace_api
         self.hass = lovelace_api.hass
 
+    @instrument_view
+    @require_admin
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        """Handle GET request to stream the archive."""
+        compress = request.query.get("compress") == "gzip"
+        filename = time.strftime("lovelace-%Y%m%d-%H%M%S.tar") + (".gz" if compress else "")
+        response = web.StreamResponse(headers={
+            "Content-Type": "application/gzip" if compress else "application/x-tar",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        })
+        try:
+            await response.prepare(request)
+            async for chunk in self.lovelace_api.iter_lovelace_archive(compress):
+                if chunk:
+                    await response.write(chunk)
+            await response.write_eof()
+            return response
+        except Exception as e:
+            _LOGGER.error("Error exporting Lovelace archive: %s", str(e))
+            if response.prepared:
+                # 已经开始发送，中断连接使客户端收到不完整的归档而不是错误的归档
+                raise
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+    @instrument_view
+    @require_admin
     async def post(self, request: web.Request) -> web.Response:
-        """Handle POST request to add/update a Lovelace view."""
+        """Handle POST request to import an archive."""
+        try:
+            result = await self.lovelace_api.import_lovelace_archive(
+                body_reader(request),
+                prune_resources=request.query.get("prune_resources") in ("1", "true"),
+                dry_run=request.query.get("dry_run") in ("1", "true"),
+            )
+            return self.json(result, status_code=200 if result["success"] else 400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error importing Lovelace archive: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceSectionCopyAPIView(HomeAssistantView):
+    """View to handle server-side Lovelace view and section copy requests."""
+
+    url = LOVELACE_SECTION_COPY_API_PATH
+    name = "api:ha_rest_api:lovelace_section_copy"
+    move = False
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace section copy API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to copy or move a view or section."""
         try:
-            data = await request.json()
+            data = await read_body(request)
             dashboard_id = data.get("dashboard_id", "lovelace")
-            title = data.get("title")
             path = data.get("path")
             
-            if not title or not path:
+            if not path:
                 return self.json(
-                    {"success": False, "error": "Title and path are required"}, 
+                    {"success": False, "error": "Path is required"}, 
                     status_code=400
                 )
             
-            success = await self.lovelace_api.upsert_lovelace_view(dashboard_id, title, path)
+            method = (
+                self.lovelace_api.move_lovelace_view
+                if self.move
+                else self.lovelace_api.copy_lovelace_view
+            )
+            result = await method(
+                dashboard_id,
+                path,
+                target_dashboard_id=data.get("target_dashboard_id"),
+                new_path=data.get("new_path"),
+                position=data.get("position"),
+                section_index=data.get("section_index"),
+                target_path=data.get("target_path"),
+            )
             
-            # 如果保存成功，重新加载Lovelace配置
-            if success:
-                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+            # 每个受影响的面板重新加载一次
+            for affected in result.get("dashboards", []):
+                await self.lovelace_api.reload_lovelace_resources(affected)
                 
-            return self.json({"success": success})
+            return self.json(result, status_code=200 if result.get("success") else 400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
         except Exception as e:
-            _LOGGER.error("Error upserting Lovelace view: %s", str(e))
+            _LOGGER.error("Error transferring Lovelace view: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
 
-class LovelaceSectionDeleteAPIView(HomeAssistantView):
-    """View to handle Lovelace section delete API requests."""
+class LovelaceSectionMoveAPIView(LovelaceSectionCopyAPIView):
+    """View to handle server-side Lovelace view and section move requests."""
 
-    url = LOVELACE_SECTION_DELETE_API_PATH
-    name = "api:ha_rest_api:lovelace_section_delete"
+    url = LOVELACE_SECTION_MOVE_API_PATH
+    name = "api:ha_rest_api:lovelace_section_move"
+    move = True
+
+
+class LovelaceSectionReorderAPIView(HomeAssistantView):
+    """View to handle Lovelace view and section reorder requests."""
+
+    url = LOVELACE_SECTION_REORDER_API_PATH
+    name = "api:ha_rest_api:lovelace_section_reorder"
 
     def __init__(self, lovelace_api: LovelaceAPI) -> None:
-        """Initialize the Lovelace section delete API view."""
+        """Initialize the Lovelace section reorder API view."""
         self.lovelace_api = lovelace_api
         self.hass = lovelace_api.hass
 
+    @instrument_view
     async def post(self, request: web.Request) -> web.Response:
-        """Handle POST request to delete a Lovelace view."""
+        """Handle POST request to reorder views or the sections of a view."""
         try:
-            data = await request.json()
+            data = await read_body(request)
             dashboard_id = data.get("dashboard_id", "lovelace")
+            paths = data.get("paths")
             path = data.get("path")
+            order = data.get("order")
             
-            if not path:
+            if not isinstance(paths, list) and not (path and isinstance(order, list)):
                 return self.json(
-                    {"success": False, "error": "Path is required"}, 
+                    {"success": False, "error": "paths or path and order are required"}, 
                     status_code=400
                 )
             
-            success = await self.lovelace_api.delete_lovelace_view(dashboard_id, path)
+            result = await self.lovelace_api.reorder_lovelace_views(
+                dashboard_id, paths=paths, path=path, order=order
+            )
             
-            # 如果保存成功，重新加载Lovelace配置
-            if success:
+            if result.get("success"):
                 await self.lovelace_api.reload_lovelace_resources(dashboard_id)
                 
+            return self.json(result, status_code=200 if result.get("success") else 400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
+        except Exception as e:
+            _LOGGER.error("Error reordering Lovelace views: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+
+class LovelaceTemplateAPIView(HomeAssistantView):
+    """View to handle Lovelace view template API requests."""
+
+    url = LOVELACE_TEMPLATE_API_PATH
+    name = "api:ha_rest_api:lovelace_template"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace template API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for one or all view templates."""
+        try:
+            templates = await self.lovelace_api.get_lovelace_templates()
+            name = request.query.get("name")
+            
+            if name is None:
+                return _negotiated_response(self, request, templates)
+            
+            if name not in templates:
+                return self.json(
+                    {"success": False, "error": f"View template '{name}' not found"},
+                    status_code=404
+                )
+            return _negotiated_response(self, request, templates[name])
+        except Exception as e:
+            _LOGGER.error("Error getting view templates: %s", str(e))
+            return self.json({"success": False, "error": str(e)}, status_code=500)
+
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to add or replace a view template."""
+        try:
+            data = await read_body(request)
+            name = data.get("name")
+            template = data.get("template")
+            
+            if not name or not isinstance(template, dict):
+                return self.json(
+                    {"success": False, "error": "Name and template are required"},
+                    status_code=400
+                )
+            
+            success = await self.lovelace_api.save_lovelace_template(name, template)
             return self.json({"success": success})
         except Exception as e:
-            _LOGGER.error("Error deleting Lovelace view: %s", str(e))
+            _LOGGER.error("Error saving view template: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
 
-class RestartHassAPIView(HomeAssistantView):
-    """View to handle Home Assistant restart requests."""
+class LovelaceTemplateDeleteAPIView(HomeAssistantView):
+    """View to handle Lovelace view template delete API requests."""
 
-    url = RESTART_HASS_API_PATH
-    name = "api:ha_rest_api:restart"
+    url = LOVELACE_TEMPLATE_DELETE_API_PATH
+    name = "api:ha_rest_api:lovelace_template_delete"
 
     def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the Lovelace template delete API view."""
         self.lovelace_api = lovelace_api
         self.hass = lovelace_api.hass
 
+    @instrument_view
     async def post(self, request: web.Request) -> web.Response:
-        """Handle POST request to restart Home Assistant."""
+        """Handle POST request to delete a view template."""
         try:
-            await self.hass.services.async_call("homeassistant", "restart")
-            return self.json({"success": True})
+            data = await read_body(request)
+            name = data.get("name")
+            
+            if not name:
+                return self.json(
+                    {"success": False, "error": "Name is required"},
+                    status_code=400
+                )
+            
+            success = await self.lovelace_api.delete_lovelace_template(name)
+            return self.json({"success": success})
         except Exception as e:
-            _LOGGER.error("Error restarting Home Assistant: %s", str(e))
+            _LOGGER.error("Error deleting view template: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
 
-class LovelaceListAPIView(HomeAssistantView):
-    """View to handle Lovelace list API requests."""
+class LovelaceTemplateInstantiateAPIView(HomeAssistantView):
+    """View to handle bulk view template instantiation requests."""
 
-    url = LOVELACE_LIST_API_PATH
-    name = "api:ha_rest_api:lovelace_list"
+    url = LOVELACE_TEMPLATE_INSTANTIATE_API_PATH
+    name = "api:ha_rest_api:lovelace_template_instantiate"
 
     def __init__(self, lovelace_api: LovelaceAPI) -> None:
-        """Initialize the Lovelace list API view."""
+        """Initialize the Lovelace template instantiate API view."""
         self.lovelace_api = lovelace_api
         self.hass = lovelace_api.hass
 
-    async def get(self, request: web.Request) -> web.Response:
-        """Handle GET request for Lovelace views list."""
+    @instrument_view
+    async def post(self, request: web.Request) -> web.Response:
+        """Handle POST request to render a template for many parameter sets."""
         try:
-            dashboard_id = request.query.get("dashboard_id", "lovelace")
-            view_list = await self.lovelace_api.get_lovelace_list(dashboard_id)
-            return self.json(view_list)
+            data = await read_body(request)
+            dashboard_id = data.get("dashboard_id", "lovelace")
+            name = data.get("name")
+            parameter_sets = data.get("parameters")
+            
+            if not name or not isinstance(parameter_sets, list) or not all(
+                isinstance(params, dict) for params in parameter_sets
+            ):
+                return self.json(
+                    {"success": False, "error": "Name and a list of parameters are required"},
+                    status_code=400
+                )
+            
+            result = await self.lovelace_api.instantiate_lovelace_template(
+                dashboard_id, name, parameter_sets
+            )
+            
+            # 所有视图写入后只重新加载一次
+            if result.get("success"):
+                await self.lovelace_api.reload_lovelace_resources(dashboard_id)
+                
+            return self.json(result, status_code=200 if result.get("success") else 400)
+        except Overloaded as e:
+            return self.json(e.as_dict(), status_code=429, headers=e.headers)
         except Exception as e:
-            _LOGGER.error("Error getting Lovelace views list: %s", str(e))
+            _LOGGER.error("Error instantiating view template: %s", str(e))
             return self.json({"success": False, "error": str(e)}, status_code=500)
 
 
+class StatsAPIView(HomeAssistantView):
+    """View to expose runtime statistics of the integration."""
+
+    url = STATS_API_PATH
+    name = "api:ha_rest_api:stats"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the stats API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for runtime statistics."""
+        return self.json(self.lovelace_api.stats())
+
+
+class MetricsAPIView(HomeAssistantView):
+    """View to expose metrics in the Prometheus text format."""
+
+    url = METRICS_API_PATH
+    name = "api:ha_rest_api:metrics"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the metrics API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @instrument_view
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for metrics."""
+        return web.Response(
+            body=self.lovelace_api.metrics.render().encode("utf-8"),
+            headers={"Content-Type": METRICS_CONTENT_TYPE},
+        )
+
+
+class ProfileListAPIView(HomeAssistantView):
+    """View to list the stored request profiles."""
+
+    url = PROFILES_API_PATH
+    name = "api:ha_rest_api:profiles"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the profile list API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @require_admin
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for the list of profiles."""
+        profile_store = self.lovelace_api.get_profile_store()
+        profiles = await self.hass.async_add_executor_job(profile_store.list_profiles)
+        return self.json({"success": True, "profiles": profiles})
+
+
+class ProfileAPIView(HomeAssistantView):
+    """View to download one stored request profile."""
+
+    url = PROFILE_API_PATH
+    name = "api:ha_rest_api:profile"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the profile API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @require_admin
+    async def get(self, request: web.Request, profile_id: str) -> web.Response:
+        """Handle GET request for a profile as pstats data or text (?format=txt)."""
+        fmt = request.query.get("format", "prof")
+        profile_store = self.lovelace_api.get_profile_store()
+        body = await self.hass.async_add_executor_job(
+            profile_store.read_profile, profile_id, fmt
+        )
+        if body is None:
+            return self.json(
+                {"success": False, "error": f"Profile '{profile_id}' not found"},
+                status_code=404
+            )
+        if fmt == "txt":
+            return web.Response(body=body, content_type="text/plain", charset="utf-8")
+        return web.Response(
+            body=body,
+            content_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+        )
+
+
+class LoopDiagnosticsAPIView(HomeAssistantView):
+    """View to expose the event loop stalls recorded by the watchdog."""
+
+    url = LOOP_DIAGNOSTICS_API_PATH
+    name = "api:ha_rest_api:loop_diagnostics"
+
+    def __init__(self, lovelace_api: LovelaceAPI) -> None:
+        """Initialize the loop diagnostics API view."""
+        self.lovelace_api = lovelace_api
+        self.hass = lovelace_api.hass
+
+    @require_admin
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle GET request for the recorded stalls."""
+        watchdog = self.lovelace_api.watchdog
+        if watchdog is None:
+            return self.json({"success": False, "error": "Loop watchdog is disabled"}, status_code=404)
+        return self.json({"success": True, **watchdog.diagnostics()})
+
+
 class MockWebSocketConnection:
     """Mock WebSocket connection to call internal APIs."""
 
@@ -656,6 +3137,8 @@ class MockWebSocketConnection:
 
     async def async_handle_message(self, msg: Dict) -> None:
         """Handle a message."""
+        from homeassistant.components.websocket_api.const import TYPE_RESULT
+        
         self.last_result = None
         
         # Find the right handler for this message type
@@ -670,6 +3153,8 @@ class MockWebSocketConnection:
                 
     async def send_message(self, msg: Dict) -> None:
         """Store the result message."""
+        from homeassistant.components.websocket_api.const import TYPE_RESULT
+        
         if msg.get("type") == TYPE_RESULT:
             self.last_result = msg.get("result")
 
@@ -678,9 +3163,28 @@ class MockWebSocketConnection:
         self.last_result = result
 
 
-async def async_setup_lovelace_api(hass: HomeAssistant) -> None:
+async def async_setup_lovelace_api(hass: HomeAssistant, conf: Optional[Dict] = None) -> None:
     """Set up the Lovelace API."""
-    lovelace_api = LovelaceAPI(hass)
+    conf = conf or {}
+    lovelace_api = LovelaceAPI(
+        hass,
+        conf.get(CONF_TRACING),
+        conf.get(CONF_STALL_THRESHOLD, DEFAULT_STALL_THRESHOLD),
+        conf.get(CONF_CAPTURE),
+        conf.get(CONF_ADMISSION),
+        conf.get(CONF_ANALYSIS),
+    )
+    
+    # Only views and services are registered on the setup critical path.
+    # Watching the storage files (so that edits made in the dashboard editor
+    # invalidate the cache) and loading all dashboards (so that clients
+    # reconnecting after a restart hit a warm cache) wait until Home
+    # Assistant has started.
+    if hass.state is CoreState.running:
+        lovelace_api.async_on_started()
+    else:
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, lovelace_api.async_on_started)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, lovelace_api.async_stop)
     
     # Register the API endpoints
     hass.http.register_view(LovelaceAPIView(lovelace_api))
@@ -689,6 +3193,24 @@ async def async_setup_lovelace_api(hass: HomeAssistant) -> None:
     hass.http.register_view(LovelaceSectionDeleteAPIView(lovelace_api))
     hass.http.register_view(RestartHassAPIView(lovelace_api))
     hass.http.register_view(LovelaceListAPIView(lovelace_api))
+    hass.http.register_view(LovelaceBundleAPIView(lovelace_api))
+    hass.http.register_view(LovelaceAnalysisAPIView(lovelace_api))
+    hass.http.register_view(LovelaceResourcesAPIView(lovelace_api))
+    hass.http.register_view(LovelaceResourceUpdateAPIView(lovelace_api))
+    hass.http.register_view(LovelaceResourceDeleteAPIView(lovelace_api))
+    hass.http.register_view(LovelaceResourcesSyncAPIView(lovelace_api))
+    hass.http.register_view(LovelaceArchiveAPIView(lovelace_api))
+    hass.http.register_view(LovelaceSectionCopyAPIView(lovelace_api))
+    hass.http.register_view(LovelaceSectionMoveAPIView(lovelace_api))
+    hass.http.register_view(LovelaceSectionReorderAPIView(lovelace_api))
+    hass.http.register_view(LovelaceTemplateAPIView(lovelace_api))
+    hass.http.register_view(LovelaceTemplateDeleteAPIView(lovelace_api))
+    hass.http.register_view(LovelaceTemplateInstantiateAPIView(lovelace_api))
+    hass.http.register_view(StatsAPIView(lovelace_api))
+    hass.http.register_view(MetricsAPIView(lovelace_api))
+    hass.http.register_view(ProfileListAPIView(lovelace_api))
+    hass.http.register_view(ProfileAPIView(lovelace_api))
+    hass.http.register_view(LoopDiagnosticsAPIView(lovelace_api))
     
     # Register services
     hass.services.async_register(
@@ -722,8 +3244,8 @@ async def async_setup_lovelace_api(hass: HomeAssistant) -> None:
     hass.services.async_register(
         DOMAIN,
         SERVICE_RESTART_HASS,
-        lambda call: hass.services.async_call("homeassistant", "restart"),
-        schema=vol.Schema({})
+        lovelace_api.handle_restart_service,
+        schema=SERVICE_RESTART_SCHEMA
     )
     
     # Register services for get/set section
@@ -753,4 +3275,89 @@ async def async_setup_lovelace_api(hass: HomeAssistant) -> None:
         schema=SERVICE_GET_CONFIG_SCHEMA
     )
     
+    # Register services for server-side copy/move/reorder
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_COPY_LOVELACE_VIEW,
+        lovelace_api.handle_copy_view_service,
+        schema=SERVICE_VIEW_TRANSFER_SCHEMA
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_MOVE_LOVELACE_VIEW,
+        lovelace_api.handle_move_view_service,
+        schema=SERVICE_VIEW_TRANSFER_SCHEMA
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REORDER_LOVELACE_VIEWS,
+        lovelace_api.handle_reorder_views_service,
+        schema=SERVICE_VIEW_REORDER_SCHEMA
+    )
+    
+    # Register services for view templates
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SAVE_LOVELACE_TEMPLATE,
+        lovelace_api.handle_save_template_service,
+        schema=SERVICE_TEMPLATE_SAVE_SCHEMA
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DELETE_LOVELACE_TEMPLATE,
+        lovelace_api.handle_delete_template_service,
+        schema=SERVICE_TEMPLATE_DELETE_SCHEMA
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_INSTANTIATE_LOVELACE_TEMPLATE,
+        lovelace_api.handle_instantiate_template_service,
+        schema=SERVICE_TEMPLATE_INSTANTIATE_SCHEMA
+    )
+    
+    # Register services for resources; changing them loads code into every
+    # browser, so only administrators may call them
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_LOVELACE_RESOURCES,
+        lovelace_api.handle_get_resources_service,
+        schema=vol.Schema({})
+    )
+    
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_CREATE_LOVELACE_RESOURCE,
+        lovelace_api.handle_create_resource_service,
+        schema=SERVICE_RESOURCE_CREATE_SCHEMA
+    )
+    
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_UPDATE_LOVELACE_RESOURCE,
+        lovelace_api.handle_update_resource_service,
+        schema=SERVICE_RESOURCE_UPDATE_SCHEMA
+    )
+    
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_DELETE_LOVELACE_RESOURCE,
+        lovelace_api.handle_delete_resource_service,
+        schema=SERVICE_RESOURCE_DELETE_SCHEMA
+    )
+    
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_SYNC_LOVELACE_RESOURCES,
+        lovelace_api.handle_sync_resources_service,
+        schema=SERVICE_RESOURCE_SYNC_SCHEMA
+    )
+    
     _LOGGER.info("Lovelace API endpoints registered")
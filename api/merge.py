@@ -0,0 +1,274 @@
+"""Three-way merge of Lovelace dashboard configs.
+
+A writer that submits the version it started from (the base) can have its
+changes merged with those made meanwhile by someone else (the current
+version), instead of overwriting them. Views are matched by path; views
+changed on only one side are taken from that side as they are, and only
+views changed on both sides are merged further, key by key, with lists
+such as cards and sections merged like lines of text in ``diff3``. Changes
+that overlap are reported as conflicts and nothing is merged.
+"""
+import copy
+import hashlib
+import json
+from difflib import SequenceMatcher
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+Path = List[Union[str, int]]
+
+
+class _Missing:
+    """Stands for a key or view that does not exist in one version."""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def _token(value: Any) -> bytes:
+    """Return a digest identifying a list item by its content."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+def _matches(base: Sequence[Hashable], other: Sequence[Hashable]) -> Dict[int, int]:
+    """Map indices of ``base`` to the indices of the equal items of ``other``."""
+    matcher = SequenceMatcher(None, base, other, autojunk=False)
+    return {
+        block.a + offset: block.b + offset
+        for block in matcher.get_matching_blocks()
+        for offset in range(block.size)
+    }
+
+
+def diff3(
+    base: Sequence[Hashable], ours: Sequence[Hashable], theirs: Sequence[Hashable]
+) -> List[Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]]:
+    """Split three sequences into aligned chunks.
+
+    Returns ``(base_range, ours_range, theirs_range)`` index ranges; a chunk
+    is stable when all three ranges hold the same items.
+    """
+    to_ours = _matches(base, ours)
+    to_theirs = _matches(base, theirs)
+    chunks = []
+    b = o = t = 0
+    while True:
+        stable = 0
+        while (
+            b + stable < len(base)
+            and to_ours.get(b + stable) == o + stable
+            and to_theirs.get(b + stable) == t + stable
+        ):
+            stable += 1
+        if stable:
+            chunks.append(((b, b + stable), (o, o + stable), (t, t + stable)))
+            b, o, t = b + stable, o + stable, t + stable
+        # 下一个在三个版本中都存在的元素
+        end = b
+        while end < len(base) and not (end in to_ours and end in to_theirs):
+            end += 1
+        if end == len(base):
+            if b < len(base) or o < len(ours) or t < len(theirs):
+                chunks.append(((b, len(base)), (o, len(ours)), (t, len(theirs))))
+            return chunks
+        if (b, o, t) != (end, to_ours[end], to_theirs[end]):
+            chunks.append(((b, end), (o, to_ours[end]), (t, to_theirs[end])))
+        b, o, t = end, to_ours[end], to_theirs[end]
+
+
+class ThreeWayMerge:
+    """Merge the changes from a base to ours into theirs, collecting conflicts.
+
+    ``theirs`` is the current version and ``ours`` the submitted one. The
+    inputs are never modified; unchanged parts of the result are shared
+    with them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the merge."""
+        self.conflicts: List[Dict[str, Any]] = []
+
+    def _conflict(
+        self, view: Optional[str], path: Path, reason: str, base: Any, ours: Any, theirs: Any
+    ) -> None:
+        conflict: Dict[str, Any] = {"view": view, "path": path, "reason": reason}
+        for name, value in (("base", base), ("current", theirs), ("submitted", ours)):
+            if value is not MISSING:
+                # 冲突会返回给调用方，不能与缓存中的配置共享对象
+                conflict[name] = copy.deepcopy(value)
+        self.conflicts.append(conflict)
+
+    def value(self, base: Any, ours: Any, theirs: Any, view: Optional[str], path: Path) -> Any:
+        """Merge one value; returns MISSING if it was deleted."""
+        if ours == theirs:
+            return ours
+        if base == ours:
+            return theirs
+        if base == theirs:
+            return ours
+        if isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict):
+            return self.mapping(base, ours, theirs, view, path)
+        if isinstance(base, list) and isinstance(ours, list) and isinstance(theirs, list):
+            return self.sequence(base, ours, theirs, view, path)
+        reason = "deleted" if MISSING in (ours, theirs) else "modified"
+        self._conflict(view, path, reason, base, ours, theirs)
+        return theirs
+
+    def mapping(self, base: Dict, ours: Dict, theirs: Dict, view: Optional[str], path: Path) -> Dict:
+        """Merge a mapping key by key, keeping the key order of ``theirs``."""
+        merged = {}
+        for key in list(theirs) + [key for key in ours if key not in theirs]:
+            value = self.value(
+                base.get(key, MISSING),
+                ours.get(key, MISSING),
+                theirs.get(key, MISSING),
+                view,
+                path + [key],
+            )
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+
+    def sequence(self, base: List, ours: List, theirs: List, view: Optional[str], path: Path) -> List:
+        """Merge a list of items without identity, such as cards or sections.
+
+        Runs of items changed on one side only are taken from that side.
+        Runs changed on both sides are merged item by item if they have the
+        same length on every side; other overlapping changes conflict.
+        """
+        tokens = [[_token(item) for item in items] for items in (base, ours, theirs)]
+        merged = []
+        for (b0, b1), (o0, o1), (t0, t1) in diff3(*tokens):
+            base_run, ours_run, theirs_run = base[b0:b1], ours[o0:o1], theirs[t0:t1]
+            if tokens[1][o0:o1] == tokens[0][b0:b1]:
+                merged.extend(theirs_run)
+            elif tokens[2][t0:t1] == tokens[0][b0:b1] or tokens[1][o0:o1] == tokens[2][t0:t1]:
+                merged.extend(ours_run)
+            elif len(base_run) == len(ours_run) == len(theirs_run):
+                for offset, items in enumerate(zip(base_run, ours_run, theirs_run)):
+                    item = self.value(*items, view, path + [b0 + offset])
+                    if item is not MISSING:
+                        merged.append(item)
+            else:
+                reason = "deleted" if not ours_run or not theirs_run else "modified"
+                self._conflict(view, path + [b0], reason, base_run, ours_run, theirs_run)
+                merged.extend(theirs_run)
+        return merged
+
+
+def _view_keys(views: List[Any]) -> List[Tuple[str, int]]:
+    """Identify views by path, numbering repeated paths; views without path by content."""
+    seen: Dict[str, int] = {}
+    keys = []
+    for view in views:
+        name = view.get("path") if isinstance(view, dict) else None
+        if not isinstance(name, str):
+            name = "#" + _token(view).hex()
+        keys.append((name, seen.get(name, 0)))
+        seen[name] = seen.get(name, 0) + 1
+    return keys
+
+
+def _view_name(key: Tuple[str, int]) -> str:
+    return key[0] if not key[1] else f"{key[0]}#{key[1]}"
+
+
+def _merge_order(
+    merge: ThreeWayMerge, base: List[Hashable], ours: List[Hashable], theirs: List[Hashable]
+) -> List[Hashable]:
+    """Merge the order of views, given by their keys.
+
+    The side that reordered the views present in all versions provides the
+    order; views added by the other side follow the view they followed
+    there. Both sides reordering differently is a conflict.
+    """
+    common = set(base) & set(ours) & set(theirs)
+    base_order, our_order, their_order = (
+        [key for key in keys if key in common] for keys in (base, ours, theirs)
+    )
+    primary, secondary = (ours, theirs) if our_order != base_order else (theirs, ours)
+    if our_order not in (base_order, their_order) and their_order != base_order:
+        merge._conflict(
+            None, ["views"], "order",
+            [_view_name(key) for key in base_order],
+            [_view_name(key) for key in our_order],
+            [_view_name(key) for key in their_order],
+        )
+        primary, secondary = theirs, ours
+
+    listed = set(primary)
+    # 另一方新增的视图，按其前一个已列出的视图分组
+    added: Dict[Optional[Hashable], List[Hashable]] = {}
+    anchor = None
+    for key in secondary:
+        if key in listed:
+            anchor = key
+        else:
+            added.setdefault(anchor, []).append(key)
+    order = list(added.get(None, []))
+    for key in primary:
+        order.append(key)
+        order.extend(added.get(key, []))
+    return order
+
+
+def merge_config(base: Dict, ours: Dict, theirs: Dict) -> Tuple[Dict, List[Dict], Dict[str, int]]:
+    """Merge the changes from ``base`` to ``ours`` into ``theirs``.
+
+    Returns the merged config, the conflicts and counts of the views
+    changed on each side. Only views changed on both sides are walked.
+    Runs in the executor.
+    """
+    merge = ThreeWayMerge()
+    shell = merge.mapping(
+        {k: v for k, v in base.items() if k != "views"},
+        {k: v for k, v in ours.items() if k != "views"},
+        {k: v for k, v in theirs.items() if k != "views"},
+        None,
+        [],
+    )
+
+    versions = []
+    for config in (base, ours, theirs):
+        views = config.get("views")
+        views = views if isinstance(views, list) else []
+        keys = _view_keys(views)
+        versions.append((keys, dict(zip(keys, views))))
+    (base_keys, base_views), (our_keys, our_views), (their_keys, their_views) = versions
+
+    counts = {"changed": 0, "current_changed": 0, "merged": 0}
+    views_by_key = {}
+    for key in their_keys + [key for key in our_keys if key not in their_views]:
+        old = base_views.get(key, MISSING)
+        mine = our_views.get(key, MISSING)
+        current = their_views.get(key, MISSING)
+        changed, current_changed = mine != old, current != old
+        counts["changed"] += changed
+        counts["current_changed"] += current_changed
+        if changed and current_changed and mine != current:
+            counts["merged"] += 1
+            views_by_key[key] = merge.value(old, mine, current, _view_name(key), [])
+        else:
+            views_by_key[key] = mine if changed else current
+    for key in base_keys:
+        if key not in views_by_key:
+            # 双方都删除了该视图
+            counts["changed"] += 1
+            counts["current_changed"] += 1
+
+    order = _merge_order(merge, base_keys, our_keys, their_keys)
+    listed = set(order)
+    order.extend(key for key in views_by_key if key not in listed)
+
+    merged_views = []
+    for key in order:
+        view = views_by_key.pop(key, MISSING)
+        if view is not MISSING:
+            merged_views.append(view)
+    merged = dict(shell)
+    if "views" in ours or "views" in theirs:
+        merged["views"] = merged_views
+    return merged, merge.conflicts, counts
@@ -0,0 +1,199 @@
+"""In-process metrics exposed in the Prometheus text format."""
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """A monotonically increasing counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        """Initialize the counter."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase the counter."""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        """Return the current value."""
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterator[str]:
+        """Yield the samples in text format."""
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """A latency histogram with cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation."""
+        series = self._values.get(label_values)
+        if series is None:
+            series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Return the number of observations."""
+        series = self._values.get(label_values)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        """Yield the samples in text format."""
+        for label_values, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(series[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Metrics:
+    """All metrics of the integration."""
+
+    def __init__(self) -> None:
+        """Create the metrics."""
+        self.http_requests = Counter(
+            "ha_rest_api_http_requests_total",
+            "HTTP requests handled, by view, method and status.",
+            ("view", "method", "status"),
+        )
+        self.http_latency = Histogram(
+            "ha_rest_api_http_request_duration_seconds",
+            "HTTP request latency, by view and method.",
+            ("view", "method"),
+        )
+        self.service_calls = Counter(
+            "ha_rest_api_service_calls_total",
+            "Service calls handled, by service and result.",
+            ("service", "result"),
+        )
+        self.service_latency = Histogram(
+            "ha_rest_api_service_duration_seconds",
+            "Service call latency, by service.",
+            ("service",),
+        )
+        self.stage_latency = Histogram(
+            "ha_rest_api_stage_duration_seconds",
+            "Time spent in internal stages (file_read, parse, copy, validate, mutate, serialize, write, encode, reload).",
+            ("stage",),
+        )
+        self.bytes_read = Counter(
+            "ha_rest_api_storage_read_bytes_total",
+            "Bytes read from storage files.",
+        )
+        self.bytes_written = Counter(
+            "ha_rest_api_storage_written_bytes_total",
+            "Bytes written to storage files.",
+        )
+        self.cache_lookups = Counter(
+            "ha_rest_api_cache_lookups_total",
+            "Cache lookups, by cache and result (hit or miss).",
+            ("cache", "result"),
+        )
+        self.reloads = Counter(
+            "ha_rest_api_reloads_total",
+            "Lovelace reloads requested, by dashboard.",
+            ("dashboard",),
+        )
+        self.external_changes = Counter(
+            "ha_rest_api_external_changes_total",
+            "Dashboard storage writes detected from outside the integration.",
+            ("dashboard",),
+        )
+        self.rejections = Counter(
+            "ha_rest_api_rejected_total",
+            "Requests and mutations rejected by admission control, by reason and kind.",
+            ("reason", "kind"),
+        )
+        self._metrics = [
+            value for value in vars(self).values() if isinstance(value, (Counter, Histogram))
+        ]
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, float]]]] = []
+
+    def add_collector(
+        self, collector: Callable[[], Iterable[Tuple[str, str, str, float]]]
+    ) -> None:
+        """Register a callback yielding (name, type, help, value) at render time."""
+        self._collectors.append(collector)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time an internal stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_latency.observe(time.perf_counter() - start, name)
+
+    def observe_stages(self, timings: Dict[str, float]) -> None:
+        """Record stage durations measured elsewhere (e.g. in the executor)."""
+        for name, duration in timings.items():
+            self.stage_latency.observe(duration, name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collector in self._collectors:
+            for name, kind, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,127 @@
+"""On-demand cProfile runs of single requests, kept in a bounded ring on disk."""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_ID = re.compile(r"^[0-9]+-[a-z_]+-[A-Z]+$")
+
+
+class ProfileStore:
+    """Profile requests and keep the newest results as files.
+
+    Every profile is stored twice: ``<id>.prof`` for ``pstats``/snakeviz and
+    ``<id>.txt`` with the top functions by cumulative time. cProfile follows
+    the event loop thread, so coroutines of other requests running at the
+    same time appear in the profile too; work done in the executor does not.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: str, max_profiles: int) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._active = False
+
+    async def async_profile(
+        self, view: str, method: str, run: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, Optional[str]]:
+        """Run ``run()`` under cProfile and store the result.
+
+        Returns the result and the profile ID, or None as ID if another
+        request is being profiled (only one profiler can be active).
+        """
+        if self._active:
+            return await run(), None
+
+        self._active = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                result = await run()
+            finally:
+                profiler.disable()
+        finally:
+            self._active = False
+        duration = time.perf_counter() - start
+
+        profile_id = f"{time.time_ns() // 1_000_000}-{view}-{method}"
+        try:
+            await self.hass.async_add_executor_job(
+                self._write, profile_id, profiler, duration
+            )
+        except OSError as e:
+            _LOGGER.error("Error writing profile %s: %s", profile_id, str(e))
+            return result, None
+        _LOGGER.info("Stored profile %s (%.1f ms)", profile_id, duration * 1000)
+        return result, profile_id
+
+    def _write(self, profile_id: str, profiler: cProfile.Profile, duration: float) -> None:
+        """Write both representations of a profile and drop the oldest ones."""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        profiler.dump_stats(f"{base}.prof")
+
+        text = io.StringIO()
+        text.write(f"{profile_id}: {duration * 1000:.1f} ms\n\n")
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(50)
+        with open(f"{base}.txt", "w", encoding="utf-8") as file:
+            file.write(text.getvalue())
+
+        for old in self._list_ids()[self.max_profiles:]:
+            for suffix in (".prof", ".txt"):
+                try:
+                    os.unlink(os.path.join(self.directory, old + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _list_ids(self) -> List[str]:
+        """Return the stored profile IDs, newest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = {name[:-5] for name in names if name.endswith(".prof")}
+        return sorted(
+            (profile_id for profile_id in ids if PROFILE_ID.match(profile_id)),
+            key=lambda profile_id: int(profile_id.split("-", 1)[0]),
+            reverse=True,
+        )
+
+    def list_profiles(self) -> List[Dict]:
+        """Describe the stored profiles, newest first. Runs in the executor."""
+        profiles = []
+        for profile_id in self._list_ids():
+            created, view, method = profile_id.split("-")
+            try:
+                size = os.path.getsize(os.path.join(self.directory, f"{profile_id}.prof"))
+            except FileNotFoundError:
+                continue
+            profiles.append({
+                "id": profile_id,
+                "view": view,
+                "method": method,
+                "created": int(created) / 1000,
+                "size": size,
+            })
+        return profiles
+
+    def read_profile(self, profile_id: str, fmt: str) -> Optional[bytes]:
+        """Return a stored profile as ``prof`` or ``txt``. Runs in the executor."""
+        if not PROFILE_ID.match(profile_id) or fmt not in ("prof", "txt"):
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.{fmt}"), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
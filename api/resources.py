@@ -0,0 +1,112 @@
+"""Validation and bulk synchronization of Lovelace resources.
+
+The resources (custom cards, themes, ...) live in the resource collection
+of the Lovelace integration. A sync compares the desired resources with
+the collection and plans only the changes: a resource whose URL differs
+only in its query string (usually a version parameter such as
+``?v=1.2.0``) is updated in place instead of being deleted and created
+again, so its ID stays the same.
+"""
+from typing import Any, Dict, List, Optional
+
+from homeassistant.exceptions import HomeAssistantError
+
+RESOURCE_TYPES = ("module", "js", "css", "html")
+
+
+class ResourceError(HomeAssistantError):
+    """Raised when a resource request cannot be carried out."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        """Initialize the error; ``status`` is the HTTP status to answer with."""
+        self.status = status
+        super().__init__(message)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the error as a response body."""
+        return {"success": False, "error": str(self)}
+
+
+def validate_resource(resource: Any) -> Dict[str, str]:
+    """Return a resource as ``{"url", "type"}``; ``type`` defaults to module."""
+    if not isinstance(resource, dict):
+        raise ResourceError("A resource must be an object with a url")
+    url = resource.get("url")
+    if not isinstance(url, str) or not url.strip():
+        raise ResourceError("A resource needs a non-empty url")
+    res_type = resource.get("type", resource.get("res_type", "module"))
+    if res_type not in RESOURCE_TYPES:
+        raise ResourceError(
+            f"Invalid resource type '{res_type}', expected one of {', '.join(RESOURCE_TYPES)}"
+        )
+    return {"url": url.strip(), "type": res_type}
+
+
+def base_url(url: str) -> str:
+    """Return a URL without its query string and fragment."""
+    return url.split("#", 1)[0].split("?", 1)[0]
+
+
+def plan_sync(
+    existing: List[Dict[str, Any]], desired: List[Any], prune: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the resources to create, update and delete, and those left unchanged.
+
+    Each desired resource is matched with an existing one by its exact URL,
+    else by its URL without query string. Existing resources that match
+    nothing are only deleted if ``prune`` is set.
+    """
+    wanted = [validate_resource(resource) for resource in desired]
+    urls = [resource["url"] for resource in wanted]
+    if len(set(urls)) != len(urls):
+        raise ResourceError("The desired resources contain duplicate URLs")
+
+    by_url: Dict[str, Dict[str, Any]] = {}
+    by_base: Dict[str, List[Dict[str, Any]]] = {}
+    for item in existing:
+        by_url.setdefault(item["url"], item)
+        by_base.setdefault(base_url(item["url"]), []).append(item)
+
+    matched = set()
+    plan: Dict[str, List[Dict[str, Any]]] = {
+        "create": [], "update": [], "delete": [], "unchanged": []
+    }
+    # 先处理完全匹配的 URL，避免它们被只按基础 URL 匹配的资源占用
+    pending = []
+    for resource in wanted:
+        item = by_url.get(resource["url"])
+        if item is not None and item["id"] not in matched:
+            matched.add(item["id"])
+            if item.get("type") == resource["type"]:
+                plan["unchanged"].append(item)
+            else:
+                plan["update"].append(_update(item, resource))
+        else:
+            pending.append(resource)
+
+    for resource in pending:
+        item: Optional[Dict[str, Any]] = next(
+            (
+                candidate for candidate in by_base.get(base_url(resource["url"]), [])
+                if candidate["id"] not in matched
+            ),
+            None,
+        )
+        if item is None:
+            plan["create"].append(resource)
+        else:
+            matched.add(item["id"])
+            plan["update"].append(_update(item, resource))
+
+    if prune:
+        plan["delete"] = [item for item in existing if item["id"] not in matched]
+    return plan
+
+
+def _update(item: Dict[str, Any], resource: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "id": item["id"],
+        "url": resource["url"],
+        "type": resource["type"],
+        "previous": {"url": item["url"], "type": item.get("type")},
+    }
@@ -0,0 +1,75 @@
+"""Append-only text files written in the executor and rotated by size."""
+import logging
+import os
+import threading
+from typing import List
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RotatingFileWriter:
+    """Batch lines on the event loop and append them to a file in the executor.
+
+    When the file reaches ``max_bytes`` it is renamed to ``<path>.1`` (older
+    files shift to ``.2`` ... ``.<backups>``) and a new file is started with
+    ``header``.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, max_bytes: int, backups: int, header: str = ""
+    ) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.header = header
+        self._pending: List[str] = []
+        self._flush_scheduled = False
+        self._file_lock = threading.Lock()
+
+    def append(self, line: str) -> None:
+        """Queue one line (without newline) and schedule a flush."""
+        self._pending.append(line)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write the queued lines in the executor."""
+        self._flush_scheduled = False
+        lines, self._pending = self._pending, []
+        if not lines:
+            return
+        try:
+            await self.hass.async_add_executor_job(self._write, lines)
+        except OSError as e:
+            _LOGGER.error("Error writing %s: %s", self.path, str(e))
+
+    def _write(self, lines: List[str]) -> None:
+        """Append lines to the file, rotating it when full."""
+        with self._file_lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size and size >= self.max_bytes:
+                self._rotate()
+                size = 0
+            with open(self.path, "a", encoding="utf-8") as file:
+                if size == 0:
+                    file.write(self.header)
+                file.write("".join(f"{line}\n" for line in lines))
+
+    def _rotate(self) -> None:
+        """Shift <path> -> <path>.1 -> ... dropping the oldest."""
+        if self.backups <= 0:
+            os.unlink(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
@@ -0,0 +1,115 @@
+"""Structural validation of Lovelace configurations.
+
+The schemas only check the structure the frontend relies on (views, sections
+and cards with a ``type``); any additional keys are allowed. They are compiled
+once at import time and reused for every request.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+
+
+class LovelaceValidationError(HomeAssistantError):
+    """Raised when a Lovelace configuration is structurally invalid."""
+
+    def __init__(self, message: str, path: List[Union[str, int]]) -> None:
+        """Initialize the error."""
+        self.message = message
+        self.path = path
+        super().__init__(f"{format_path(path)}: {message}" if path else message)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the error as a response body."""
+        return {"success": False, "error": str(self), "path": self.path}
+
+
+def format_path(path: List[Union[str, int]]) -> str:
+    """Format an error path like ``views[3].cards[0].type``."""
+    text = ""
+    for part in path:
+        if isinstance(part, int):
+            text += f"[{part}]"
+        else:
+            text += f".{part}" if text else str(part)
+    return text
+
+
+def _card(value: Any) -> Any:
+    """Validate a card, recursing into nested cards."""
+    return CARD_SCHEMA(value)
+
+
+CARD_SCHEMA = vol.Schema({
+    vol.Required("type"): str,
+    vol.Optional("cards"): [_card],
+    vol.Optional("card"): _card,
+    vol.Optional("entity"): str,
+    vol.Optional("entities"): list,
+    vol.Optional("visibility"): list,
+}, extra=vol.ALLOW_EXTRA)
+
+SECTION_SCHEMA = vol.Schema({
+    vol.Optional("type"): str,
+    vol.Optional("title"): str,
+    vol.Optional("cards"): [_card],
+    vol.Optional("visibility"): list,
+}, extra=vol.ALLOW_EXTRA)
+
+VIEW_SCHEMA = vol.Schema({
+    vol.Optional("title"): str,
+    vol.Optional("path"): str,
+    vol.Optional("type"): str,
+    vol.Optional("icon"): str,
+    vol.Optional("max_columns"): int,
+    vol.Optional("cards"): [_card],
+    vol.Optional("sections"): [SECTION_SCHEMA],
+    vol.Optional("badges"): [vol.Any(str, dict)],
+}, extra=vol.ALLOW_EXTRA)
+
+# 顶层配置不包含视图本身，视图逐个校验以便跳过未修改的视图
+CONFIG_SHELL_SCHEMA = vol.Schema({
+    vol.Optional("title"): str,
+    vol.Optional("views"): list,
+}, extra=vol.ALLOW_EXTRA)
+
+
+def _run(schema: vol.Schema, value: Any, prefix: List[Union[str, int]]) -> None:
+    try:
+        schema(value)
+    except vol.Invalid as e:
+        errors = e.errors if isinstance(e, vol.MultipleInvalid) else [e]
+        first = errors[0]
+        raise LovelaceValidationError(first.msg, prefix + list(first.path)) from None
+
+
+def validate_view(view: Any, prefix: Optional[List[Union[str, int]]] = None) -> None:
+    """Validate a single view."""
+    _run(VIEW_SCHEMA, view, prefix or [])
+
+
+def validate_card(card: Any, prefix: Optional[List[Union[str, int]]] = None) -> None:
+    """Validate a single card."""
+    _run(CARD_SCHEMA, card, prefix or [])
+
+
+def validate_config(
+    config: Any,
+    previous: Optional[Dict[str, Any]] = None,
+    prefix: Optional[List[Union[str, int]]] = None,
+) -> None:
+    """Validate a dashboard configuration.
+
+    ``previous`` maps view paths to the views of the last accepted config;
+    views equal to their previous version are not validated again.
+    """
+    prefix = prefix or []
+    _run(CONFIG_SHELL_SCHEMA, config, prefix)
+
+    for index, view in enumerate(config.get("views", [])):
+        if previous and isinstance(view, dict):
+            old = previous.get(view.get("path"))
+            if old is not None and old == view:
+                continue
+        validate_view(view, prefix + ["views", index])
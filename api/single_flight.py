@@ -0,0 +1,53 @@
+"""Coalesce concurrent identical computations into one in-flight task."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time.
+
+    Callers that ask for a key whose computation is still running await the
+    same task instead of starting their own. Keys should include everything
+    the result depends on (including the data version), so that a finished
+    or stale computation is never shared with later callers.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the single-flight group."""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.requests = 0
+        self.joined = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``factory()``, sharing it with concurrent callers."""
+        self.requests += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.joined += 1
+        # 某个调用者被取消时不影响共享同一任务的其他调用者
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """Return the share of requests that joined an in-flight computation."""
+        return self.joined / self.requests if self.requests else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters of the group."""
+        return {
+            "requests": self.requests,
+            "executions": self.requests - self.joined,
+            "joined": self.joined,
+            "in_flight": len(self._inflight),
+            "coalescing_ratio": round(self.coalescing_ratio, 4),
+        }
@@ -0,0 +1,333 @@
+"""Storage file access and in-memory cache for Lovelace dashboards."""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from .entities import referenced_entities
+
+# (inode, mtime_ns, size) identifies one version of a storage file on disk
+Signature = Tuple[int, int, int]
+
+# 每个面板保留的最近版本数，作为三方合并的基础版本
+HISTORY_SIZE = 8
+
+
+def is_dashboard_file(name: str) -> bool:
+    """Return True for the storage files of Lovelace dashboards."""
+    return name == "lovelace" or name.startswith("lovelace.")
+
+
+def _signature(stat: os.stat_result) -> Signature:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def file_signature(path: str) -> Optional[Signature]:
+    """Return the signature of a file, or None if it does not exist."""
+    try:
+        return _signature(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def dumps_json(value: Any) -> bytes:
+    """Serialize a value as compact UTF-8 JSON for a response body."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_of(body: bytes) -> str:
+    """Return the strong ETag of a response body.
+
+    Clients can compute the same value from a config they hold by hashing
+    its ``dumps_json`` serialization.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Return True if an ``If-None-Match`` header matches the ETag."""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        # 弱比较：忽略 W/ 前缀
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class EncodedBody(bytes):
+    """A serialized response body that knows its ETag."""
+
+    @property
+    def etag(self) -> str:
+        """Return the ETag of the body, computed once."""
+        etag = self.__dict__.get("etag")
+        if etag is None:
+            etag = self.__dict__["etag"] = etag_of(self)
+        return etag
+
+
+def read_json_file(
+    path: str, timings: Optional[Dict[str, float]] = None
+) -> Optional[Tuple[bytes, Any, Signature]]:
+    """Read and parse a JSON storage file.
+
+    Returns None if the file does not exist. Runs in the executor. The
+    durations of the ``file_read`` and ``parse`` stages are stored in
+    ``timings`` if given.
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as file:
+            signature = _signature(os.fstat(file.fileno()))
+            raw = file.read()
+    except FileNotFoundError:
+        return None
+    parsed = time.perf_counter()
+    data = json.loads(raw)
+    if timings is not None:
+        timings["file_read"] = parsed - start
+        timings["parse"] = time.perf_counter() - parsed
+    return raw, data, signature
+
+
+def write_json_file(
+    path: str, data: Any, timings: Optional[Dict[str, float]] = None
+) -> Tuple[bytes, Signature]:
+    """Serialize and atomically replace a JSON storage file.
+
+    Runs in the executor. The durations of the ``serialize`` and ``write``
+    stages are stored in ``timings`` if given.
+    """
+    start = time.perf_counter()
+    raw = json.dumps(data, indent=2).encode("utf-8")
+    serialized = time.perf_counter()
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ha_rest_api.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(raw)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    signature = _signature(os.stat(path))
+    if timings is not None:
+        timings["serialize"] = serialized - start
+        timings["write"] = time.perf_counter() - serialized
+    return raw, signature
+
+
+class CachedDashboard:
+    """Parsed storage of one dashboard plus lazily derived views of it.
+
+    The cached config is shared by all readers and must not be mutated;
+    writers work on ``copy_config()`` and store the result as a new entry.
+    """
+
+    def __init__(
+        self, stored_data: Dict, raw: bytes, signature: Optional[Signature], version: int
+    ) -> None:
+        """Initialize the cache entry."""
+        self.stored_data = stored_data
+        self.raw = raw
+        self.signature = signature
+        self.version = version
+        self._json: Optional[bytes] = None
+        self._encoded: Dict[Hashable, EncodedBody] = {}
+        self._index: Optional[Dict[str, int]] = None
+        self._view_list: Optional[List[Dict]] = None
+        self._view_entities: Dict[str, List[str]] = {}
+
+    @property
+    def config(self) -> Dict:
+        """Return the dashboard config."""
+        return self.stored_data.get("data", {}).get("config", {})
+
+    @property
+    def views(self) -> List[Dict]:
+        """Return the views of the dashboard."""
+        views = self.config.get("views", [])
+        return views if isinstance(views, list) else []
+
+    @property
+    def has_json(self) -> bool:
+        """Return True if the serialized config is already available."""
+        return self._json is not None
+
+    @property
+    def json(self) -> bytes:
+        """Return the config serialized as compact JSON."""
+        if self._json is None:
+            self._json = dumps_json(self.config)
+        return self._json
+
+    def get_encoded(self, key: Hashable) -> Optional[EncodedBody]:
+        """Return a previously encoded response body derived from this entry."""
+        return self._encoded.get(key)
+
+    def encode(
+        self,
+        key: Hashable,
+        build: Callable[["CachedDashboard"], Any],
+        dumps: Callable[[Any], bytes] = dumps_json,
+    ) -> EncodedBody:
+        """Encode a value derived from this entry, memoized by key."""
+        body = self._encoded.get(key)
+        if body is None:
+            body = EncodedBody(dumps(build(self)))
+            # 预先计算 ETag，避免在事件循环中对大响应体做哈希
+            body.etag
+            self._encoded[key] = body
+        return body
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """Return a mapping of view path to view index."""
+        if self._index is None:
+            index = {}
+            for i, view in enumerate(self.views):
+                if isinstance(view, dict):
+                    index.setdefault(view.get("path"), i)
+            self._index = index
+        return self._index
+
+    @property
+    def view_list(self) -> List[Dict]:
+        """Return the title and path of every view that has both."""
+        if self._view_list is None:
+            self._view_list = [
+                {"title": view["title"], "path": view["path"]}
+                for view in self.views
+                if isinstance(view, dict) and "path" in view and "title" in view
+            ]
+        return self._view_list
+
+    def get_view(self, path: str) -> Optional[Dict]:
+        """Return the view with the given path."""
+        index = self.index.get(path)
+        return None if index is None else self.views[index]
+
+    def view_entities(self, path: str) -> Optional[List[str]]:
+        """Return the entity IDs referenced by a view, memoized per view."""
+        entities = self._view_entities.get(path)
+        if entities is None:
+            view = self.get_view(path)
+            if view is None:
+                return None
+            entities = self._view_entities[path] = referenced_entities(view)
+        return entities
+
+    def views_by_path(self) -> Dict[str, Dict]:
+        """Return a mapping of view path to view."""
+        views = self.views
+        return {path: views[i] for path, i in self.index.items()}
+
+    def copy_config(self) -> Dict:
+        """Return a private, mutable copy of the config."""
+        return json.loads(self.raw).get("data", {}).get("config", {})
+
+    def prepare(self) -> "CachedDashboard":
+        """Compute every derived representation up front."""
+        _ = self.index, self.view_list, self.json
+        return self
+
+
+class Revision:
+    """A recent version of a dashboard, kept as a possible merge base.
+
+    Only the raw storage file is kept, which is much smaller than the parsed
+    config; the config and the ETags it had in each media type are derived
+    when the revision is looked up.
+    """
+
+    __slots__ = ("version", "raw", "etags")
+
+    def __init__(self, version: int, raw: bytes) -> None:
+        """Initialize the revision."""
+        self.version = version
+        self.raw = raw
+        self.etags: Dict[str, str] = {}
+
+    def config(self) -> Dict:
+        """Return a private copy of the config; runs in the executor."""
+        return json.loads(self.raw).get("data", {}).get("config", {})
+
+    def matches(self, etag: str, encoders: Dict[str, Callable[[Any], bytes]]) -> bool:
+        """Return True if the config had the ETag as a body of one of the media types.
+
+        ``encoders`` maps media types to their serializers. Runs in the
+        executor; computed ETags are kept.
+        """
+        if etag in self.etags.values():
+            return True
+        missing = [media_type for media_type in encoders if media_type not in self.etags]
+        if not missing:
+            return False
+        config = self.config()
+        for media_type in missing:
+            self.etags[media_type] = etag_of(encoders[media_type](config))
+        return etag in self.etags.values()
+
+
+class DashboardCache:
+    """Cache of parsed dashboards keyed by storage key.
+
+    Every key has a version that is bumped whenever its content changes,
+    whether the change came from this integration or from outside. The
+    last ``HISTORY_SIZE`` versions are kept as revisions, also after the
+    dashboard is invalidated.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._entries: Dict[str, CachedDashboard] = {}
+        self._versions: Dict[str, int] = {}
+        self._history: Dict[str, Deque[Revision]] = {}
+
+    def get(self, key: str) -> Optional[CachedDashboard]:
+        """Return the cached dashboard, if any."""
+        return self._entries.get(key)
+
+    def version(self, key: str) -> int:
+        """Return the current version of a dashboard."""
+        return self._versions.get(key, 0)
+
+    def store(
+        self,
+        key: str,
+        stored_data: Dict,
+        raw: bytes,
+        signature: Optional[Signature],
+        changed: bool,
+    ) -> CachedDashboard:
+        """Store a dashboard, bumping its version if the content changed."""
+        if changed:
+            self._versions[key] = self.version(key) + 1
+        entry = CachedDashboard(stored_data, raw, signature, self.version(key))
+        self._entries[key] = entry
+        history = self._history.setdefault(key, deque(maxlen=HISTORY_SIZE))
+        if not history or history[-1].version != entry.version:
+            history.append(Revision(entry.version, raw))
+        return entry
+
+    def revisions(self, key: str) -> List[Revision]:
+        """Return the kept versions of a dashboard, newest first."""
+        return list(reversed(self._history.get(key, ())))
+
+    def invalidate(self, key: str) -> int:
+        """Drop a dashboard from the cache and bump its version."""
+        self._entries.pop(key, None)
+        self._versions[key] = self.version(key) + 1
+        return self._versions[key]
+
+    def keys(self) -> List[str]:
+        """Return the keys of the cached dashboards."""
+        return list(self._entries)
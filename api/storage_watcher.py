@@ -0,0 +1,159 @@
+"""Watch the Lovelace storage files for writes made outside this integration."""
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from datetime import timedelta
+from typing import Callable, Dict, Optional, Set
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .storage import Signature, file_signature, is_dashboard_file
+
+_LOGGER = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = timedelta(seconds=5)
+
+
+class LovelaceStorageWatcher:
+    """Report changes of the dashboard storage files.
+
+    Uses inotify where available and falls back to polling the directory.
+    ``on_change`` is called on the event loop with the file name (which is
+    also the storage key) of every file that changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        directory: str,
+        on_change: Callable[[str], None],
+        poll_interval: timedelta = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """Initialize the watcher."""
+        self.hass = hass
+        self.directory = directory
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None
+        self._fd: Optional[int] = None
+        self._unsub_poll: Optional[Callable[[], None]] = None
+        self._signatures: Dict[str, Signature] = {}
+
+    async def async_start(self) -> None:
+        """Start watching."""
+        if self.mode is not None:
+            return
+
+        if self._start_inotify():
+            self.mode = "inotify"
+        else:
+            self._signatures = await self.hass.async_add_executor_job(self._scan)
+            self._unsub_poll = async_track_time_interval(
+                self.hass, self._async_poll, self.poll_interval
+            )
+            self.mode = "poll"
+
+        _LOGGER.debug("Watching %s for Lovelace changes using %s", self.directory, self.mode)
+
+    @callback
+    def async_stop(self, *_) -> None:
+        """Stop watching."""
+        if self._fd is not None:
+            self.hass.loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        self.mode = None
+
+    def _start_inotify(self) -> bool:
+        """Set up an inotify watch on the storage directory."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+                errno = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(errno, "inotify_add_watch failed")
+        except (OSError, AttributeError) as e:
+            _LOGGER.info("inotify unavailable (%s), polling Lovelace storage instead", e)
+            return False
+
+        self._fd = fd
+        self.hass.loop.add_reader(fd, self._read_events)
+        return True
+
+    def _read_events(self) -> None:
+        """Read pending inotify events."""
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        changed = set()
+        overflow = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif is_dashboard_file(name):
+                changed.add(name)
+
+        for name in changed:
+            self.on_change(name)
+        if overflow:
+            # 事件队列溢出时无法知道具体文件，扫描目录后视为全部变化
+            self.hass.async_create_task(self._async_report_all(changed))
+
+    async def _async_report_all(self, reported: Set[str]) -> None:
+        """Report every dashboard file not reported yet, scanning in the executor."""
+        for name in await self.hass.async_add_executor_job(self._scan):
+            if name not in reported:
+                self.on_change(name)
+
+    def _scan(self) -> Dict[str, Signature]:
+        """Return the signatures of all dashboard files."""
+        signatures = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if is_dashboard_file(entry.name):
+                        signature = file_signature(entry.path)
+                        if signature is not None:
+                            signatures[entry.name] = signature
+        except FileNotFoundError:
+            pass
+        return signatures
+
+    async def _async_poll(self, *_) -> None:
+        """Compare the dashboard files with the previous scan."""
+        signatures = await self.hass.async_add_executor_job(self._scan)
+        previous = self._signatures
+        self._signatures = signatures
+
+        for name in signatures.keys() | previous.keys():
+            if signatures.get(name) != previous.get(name):
+                self.on_change(name)
@@ -0,0 +1,150 @@
+"""Opt-in request tracing written as a Chrome trace file.
+
+Every HTTP request or service call becomes one trace; the stages it passes
+through (lock wait, reading the config, scanning views, saving, reloading)
+are recorded as nested spans. Events are appended to a file in the JSON
+array format of the Chrome trace viewer with one event per line, so the
+file can be opened in ``chrome://tracing`` or https://ui.perfetto.dev and
+processed line by line with ordinary tools.
+"""
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from homeassistant.core import HomeAssistant
+
+from ..const import DEFAULT_BACKUPS, DEFAULT_MAX_BYTES
+from .rotating_file import RotatingFileWriter
+
+
+class Span:
+    """One timed stage of a trace."""
+
+    __slots__ = ("name", "trace_id", "events", "args")
+
+    def __init__(self, name: str, trace_id: int, events: List[Dict], args: Dict) -> None:
+        """Initialize the span."""
+        self.name = name
+        self.trace_id = trace_id
+        self.events = events
+        self.args = args
+
+    def set(self, **args: Any) -> None:
+        """Attach arguments (for example payload sizes) to the span."""
+        self.args.update(args)
+
+    def set_timings(self, timings: Dict[str, float]) -> None:
+        """Attach stage durations measured in the executor, in milliseconds."""
+        for name, duration in timings.items():
+            self.args[f"{name}_ms"] = round(duration * 1000, 3)
+
+
+class _NullSpan:
+    """Span used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        """Ignore the arguments."""
+
+    def set_timings(self, timings: Dict[str, float]) -> None:
+        """Ignore the timings."""
+
+
+_NULL_SPAN = _NullSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("ha_rest_api_span", default=None)
+
+
+class Tracer:
+    """Record nested spans and append finished traces to a rotating file."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+    ) -> None:
+        """Initialize the tracer; tracing is enabled when a path is given."""
+        self.hass = hass
+        self.path = path
+        self.enabled = path is not None
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+        self._writer: Optional[RotatingFileWriter] = None
+        if path is not None:
+            # Chrome 轨迹格式允许省略数组结尾的 "]"，每个事件后带逗号
+            self._writer = RotatingFileWriter(hass, path, max_bytes, backups, header="[\n")
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Any]:
+        """Time a stage; spans opened outside any other span start a new trace."""
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        parent = _current_span.get()
+        if parent is None:
+            span = Span(name, next(self._ids), [], args)
+        else:
+            span = Span(name, parent.trace_id, parent.events, args)
+
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            end = time.perf_counter()
+            _current_span.reset(token)
+            span.events.append(self._event(name, start, end, span.trace_id, span.args))
+            if parent is None:
+                self._submit(span)
+
+    def _event(self, name: str, start: float, end: float, trace_id: int, args: Dict) -> Dict:
+        """Return a complete event in the Chrome trace format."""
+        return {
+            "name": name,
+            "ph": "X",
+            "ts": round(start * 1_000_000, 1),
+            "dur": round((end - start) * 1_000_000, 1),
+            "pid": self._pid,
+            "tid": trace_id,
+            "args": args,
+        }
+
+    def record(self, name: str, start: float, end: float, **args: Any) -> None:
+        """Add a span measured elsewhere (``perf_counter`` times) to the current trace."""
+        if self.enabled:
+            parent = _current_span.get()
+            if parent is not None:
+                parent.events.append(self._event(name, start, end, parent.trace_id, args))
+
+    def annotate(self, **args: Any) -> None:
+        """Attach arguments to the innermost open span."""
+        if self.enabled:
+            span = _current_span.get()
+            if span is not None:
+                span.set(**args)
+
+    async def async_flush(self) -> None:
+        """Write the finished traces that are still queued."""
+        if self._writer is not None:
+            await self._writer.async_flush()
+
+    def _submit(self, root: Span) -> None:
+        """Queue the events of a finished trace for writing."""
+        # 以请求名称命名轨迹所在的行，便于在查看器中区分请求
+        self._writer.append(json.dumps({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": self._pid,
+            "tid": root.trace_id,
+            "args": {"name": f"{root.name} #{root.trace_id}"},
+        }) + ",")
+        # 子 span 先结束，按开始时间排序后更易阅读
+        for event in sorted(root.events, key=lambda event: event["ts"]):
+            self._writer.append(json.dumps(event, default=str) + ",")
@@ -0,0 +1,118 @@
+"""Placeholder templates for Lovelace views.
+
+A template is an ordinary view config whose string values may contain
+``${name}`` placeholders. Templates are compiled once into a tree of render
+nodes so that instantiating the same template for many parameter sets only
+walks the parts that actually contain placeholders.
+"""
+import copy
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+PLACEHOLDER_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# A compiled node is either (True, constant) or (False, render_function)
+_Node = Tuple[bool, Any]
+
+
+class TemplateRenderError(Exception):
+    """Raised when a template cannot be rendered with the given parameters."""
+
+
+def _lookup(params: Dict, name: str) -> Any:
+    try:
+        return params[name]
+    except KeyError:
+        raise TemplateRenderError(f"Missing template parameter '{name}'") from None
+
+
+def _compile_string(value: str, names: Set[str]) -> _Node:
+    matches = list(PLACEHOLDER_RE.finditer(value))
+    if not matches:
+        return True, value
+
+    names.update(match.group(1) for match in matches)
+
+    # 整个字符串就是一个占位符时保留参数的原始类型（例如实体列表）
+    if len(matches) == 1 and matches[0].span() == (0, len(value)):
+        name = matches[0].group(1)
+        return False, lambda params: _lookup(params, name)
+
+    parts: List[Tuple[bool, str]] = []
+    position = 0
+    for match in matches:
+        if match.start() > position:
+            parts.append((True, value[position:match.start()]))
+        parts.append((False, match.group(1)))
+        position = match.end()
+    if position < len(value):
+        parts.append((True, value[position:]))
+
+    def render(params: Dict) -> str:
+        return "".join(
+            text if literal else str(_lookup(params, text))
+            for literal, text in parts
+        )
+
+    return False, render
+
+
+def _compile_node(value: Any, names: Set[str]) -> _Node:
+    if isinstance(value, str):
+        return _compile_string(value, names)
+
+    if isinstance(value, dict):
+        items = [
+            (key, _compile_node(item, names)) for key, item in value.items()
+        ]
+        if all(const for _, (const, _) in items):
+            return True, value
+
+        def render_dict(params: Dict) -> Dict:
+            return {
+                key: _materialize(node, params) for key, node in items
+            }
+
+        return False, render_dict
+
+    if isinstance(value, list):
+        nodes = [_compile_node(item, names) for item in value]
+        if all(const for const, _ in nodes):
+            return True, value
+
+        def render_list(params: Dict) -> List:
+            return [_materialize(node, params) for node in nodes]
+
+        return False, render_list
+
+    return True, value
+
+
+def _materialize(node: _Node, params: Dict) -> Any:
+    const, value = node
+    if not const:
+        return value(params)
+    if isinstance(value, (dict, list)):
+        # 常量子树需要复制，避免生成的多个视图共享同一个对象
+        return copy.deepcopy(value)
+    return value
+
+
+class CompiledViewTemplate:
+    """A view template compiled into render nodes."""
+
+    def __init__(self, template: Dict) -> None:
+        """Compile the template."""
+        names: Set[str] = set()
+        self._root = _compile_node(template, names)
+        self.parameters = frozenset(names)
+
+    def render(self, params: Dict) -> Dict:
+        """Render the template with one parameter set."""
+        return _materialize(self._root, params)
+
+
+def compile_view_template(template: Dict) -> CompiledViewTemplate:
+    """Compile a view template."""
+    return CompiledViewTemplate(template)
+
@@ -11,11 +11,91 @@ SERVICE_GET_LOVELACE_SECTION = "get_lovelace_section"
 SERVICE_SET_LOVELACE_SECTION = "set_lovelace_section"
 SERVICE_RESTART_HASS = "restart_hass"
 SERVICE_GET_LOVELACE_LIST = "get_lovelace_list"
+SERVICE_COPY_LOVELACE_VIEW = "copy_lovelace_view"
+SERVICE_MOVE_LOVELACE_VIEW = "move_lovelace_view"
+SERVICE_REORDER_LOVELACE_VIEWS = "reorder_lovelace_views"
+SERVICE_SAVE_LOVELACE_TEMPLATE = "save_lovelace_template"
+SERVICE_DELETE_LOVELACE_TEMPLATE = "delete_lovelace_template"
+SERVICE_INSTANTIATE_LOVELACE_TEMPLATE = "instantiate_lovelace_template"
+SERVICE_GET_LOVELACE_RESOURCES = "get_lovelace_resources"
+SERVICE_CREATE_LOVELACE_RESOURCE = "create_lovelace_resource"
+SERVICE_UPDATE_LOVELACE_RESOURCE = "update_lovelace_resource"
+SERVICE_DELETE_LOVELACE_RESOURCE = "delete_lovelace_resource"
+SERVICE_SYNC_LOVELACE_RESOURCES = "sync_lovelace_resources"
 
 # API base paths
 API_BASE_PATH = "/api/ha_rest_api"
 LOVELACE_API_PATH = f"{API_BASE_PATH}/lovelace"
 LOVELACE_SECTION_API_PATH = f"{API_BASE_PATH}/lovelace_section"
 LOVELACE_SECTION_DELETE_API_PATH = f"{API_BASE_PATH}/lovelace_section/delete"
+LOVELACE_SECTION_COPY_API_PATH = f"{API_BASE_PATH}/lovelace_section/copy"
+LOVELACE_SECTION_MOVE_API_PATH = f"{API_BASE_PATH}/lovelace_section/move"
+LOVELACE_SECTION_REORDER_API_PATH = f"{API_BASE_PATH}/lovelace_section/reorder"
 LOVELACE_LIST_API_PATH = f"{API_BASE_PATH}/lovelace_list"
+LOVELACE_BUNDLE_API_PATH = f"{API_BASE_PATH}/lovelace_bundle"
+LOVELACE_ANALYSIS_API_PATH = f"{API_BASE_PATH}/lovelace_analysis"
+LOVELACE_RESOURCES_API_PATH = f"{API_BASE_PATH}/lovelace_resources"
+LOVELACE_RESOURCES_UPDATE_API_PATH = f"{API_BASE_PATH}/lovelace_resources/update"
+LOVELACE_RESOURCES_DELETE_API_PATH = f"{API_BASE_PATH}/lovelace_resources/delete"
+LOVELACE_RESOURCES_SYNC_API_PATH = f"{API_BASE_PATH}/lovelace_resources/sync"
+LOVELACE_ARCHIVE_API_PATH = f"{API_BASE_PATH}/lovelace_archive"
 RESTART_HASS_API_PATH = f"{API_BASE_PATH}/restart"
+LOVELACE_TEMPLATE_API_PATH = f"{API_BASE_PATH}/lovelace_template"
+LOVELACE_TEMPLATE_DELETE_API_PATH = f"{API_BASE_PATH}/lovelace_template/delete"
+LOVELACE_TEMPLATE_INSTANTIATE_API_PATH = f"{API_BASE_PATH}/lovelace_template/instantiate"
+STATS_API_PATH = f"{API_BASE_PATH}/stats"
+METRICS_API_PATH = f"{API_BASE_PATH}/metrics"
+PROFILES_API_PATH = f"{API_BASE_PATH}/profiles"
+PROFILE_API_PATH = f"{API_BASE_PATH}/profiles/{{profile_id}}"
+LOOP_DIAGNOSTICS_API_PATH = f"{API_BASE_PATH}/diagnostics/loop"
+
+# Profiling of single requests
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_HEADER = "X-HA-REST-API-Profile"
+PROFILE_DIRECTORY = f"{DOMAIN}_profiles"
+MAX_PROFILES = 20
+
+# Storage files owned by this integration
+TEMPLATE_STORAGE_KEY = f"{DOMAIN}.lovelace_templates"
+
+# Configuration
+CONF_TRACING = "tracing"
+CONF_CAPTURE = "capture"
+CONF_FILE = "path"
+CONF_MAX_BYTES = "max_bytes"
+CONF_BACKUPS = "backups"
+CONF_PAYLOADS = "payloads"
+CONF_STALL_THRESHOLD = "stall_threshold_ms"
+CONF_ADMISSION = "admission"
+CONF_READ_RATE = "reads_per_second"
+CONF_READ_BURST = "read_burst"
+CONF_WRITE_RATE = "writes_per_second"
+CONF_WRITE_BURST = "write_burst"
+CONF_MAX_QUEUED_MUTATIONS = "max_queued_mutations"
+CONF_ANALYSIS = "analysis"
+CONF_MAX_CARDS = "max_cards"
+CONF_MAX_DEPTH = "max_depth"
+CONF_MAX_VIEW_BYTES = "max_view_bytes"
+CONF_MAX_ENTITIES = "max_entities"
+CONF_MAX_DUPLICATES = "max_duplicates"
+
+DEFAULT_TRACE_FILE = f"{DOMAIN}_trace.json"
+DEFAULT_CAPTURE_FILE = f"{DOMAIN}_requests.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+DEFAULT_STALL_THRESHOLD = 100
+DEFAULT_READ_RATE = 50
+DEFAULT_READ_BURST = 100
+DEFAULT_WRITE_RATE = 2
+DEFAULT_WRITE_BURST = 10
+DEFAULT_MAX_QUEUED_MUTATIONS = 8
+# 重启前等待进行中的修改完成的默认秒数
+DEFAULT_DRAIN_TIMEOUT = 30
+# 面板分析的默认阈值，超过时视图被标记
+DEFAULT_ANALYSIS_THRESHOLDS = {
+    CONF_MAX_CARDS: 100,
+    CONF_MAX_DEPTH: 4,
+    CONF_MAX_VIEW_BYTES: 64 * 1024,
+    CONF_MAX_ENTITIES: 100,
+    CONF_MAX_DUPLICATES: 10,
+}
@@ -0,0 +1,433 @@
+"""Offline benchmark of the Lovelace API against a local Home Assistant stand-in.
+
+Every LovelaceAPI method and every HTTP view is driven over synthetic
+dashboards of different sizes. Results are written as JSON so they can be
+compared across versions::
+
+    python test/benchmark.py --sizes 10 100 1000 10000 --output bench.json
+
+Home Assistant must be installed (``pip install homeassistant``); no running
+instance is needed.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fake_hass import REPO_DIR, FakeHass, FakeRequest, import_integration, write_dashboard
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+TEMPLATE = {
+    "title": "Room ${room}",
+    "path": "room-${room}",
+    "cards": [
+        {"type": "entities", "entities": ["light.${room}_ceiling", "sensor.${room}_temperature"]},
+        {"type": "thermostat", "entity": "climate.${room}"},
+    ],
+}
+
+
+def make_view(index: int) -> Dict:
+    """Return a synthetic view; every tenth view uses sections."""
+    cards = [
+        {"type": "entities", "entities": [f"light.room_{index}_{j}" for j in range(5)]},
+        {
+            "type": "vertical-stack",
+            "cards": [
+                {"type": "button", "entity": f"switch.room_{index}_{j}", "name": f"Switch {j}"}
+                for j in range(3)
+            ],
+        },
+        {"type": "markdown", "content": f"Room {index} " + "lorem ipsum " * 10},
+    ]
+    view = {"title": f"View {index}", "path": f"view-{index}", "icon": "mdi:home"}
+    if index % 10 == 0:
+        view["type"] = "sections"
+        view["sections"] = [{"type": "grid", "cards": cards}, {"type": "grid", "cards": cards[:1]}]
+    else:
+        view["cards"] = cards
+    return view
+
+
+def make_dashboard(size: int) -> Dict:
+    """Return a synthetic dashboard config with ``size`` views."""
+    return {"title": f"Benchmark {size}", "views": [make_view(i) for i in range(size)]}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def peak_rss_kb() -> int:
+    """Return the peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KiB 为单位
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def failed(result: Any) -> bool:
+    """Return True if a method or view reported an error."""
+    if result is False:
+        return True
+    if isinstance(result, dict):
+        return result.get("success") is False
+    status = getattr(result, "status", None)
+    return status is not None and status >= 400
+
+
+class Operation:
+    """One benchmarked call; ``setup`` runs untimed before every iteration."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        run: Callable[[int], Awaitable[Any]],
+        setup: Optional[Callable[[int], Awaitable[Any]]] = None,
+    ) -> None:
+        """Initialize the operation."""
+        self.name = name
+        self.kind = kind
+        self.run = run
+        self.setup = setup
+
+
+def build_operations(api: Any, views: Dict[str, Any], size: int) -> List[Operation]:
+    """Return the operations to benchmark for one dashboard."""
+    dashboard = "lovelace"
+    middle = f"view-{size // 2}"
+    last = f"view-{size - 1}"
+    config = make_dashboard(size)
+    view_config = make_view(size // 2)
+    configs: List[Dict] = []
+    # 中间视图引用的实体都有状态
+    for j in range(5):
+        api.hass.states.async_set(f"light.room_{size // 2}_{j}", "on", {"brightness": 255})
+    for j in range(3):
+        api.hass.states.async_set(f"switch.room_{size // 2}_{j}", "off")
+
+    async def fresh_config(_: int) -> None:
+        # 保存后配置归缓存所有，每次保存使用新的副本
+        configs.append(copy.deepcopy(config))
+
+    async def add_view(path: str) -> None:
+        await api.upsert_lovelace_view(dashboard, "Benchmark", path)
+
+    async def drop_view(path: str) -> None:
+        await api.delete_lovelace_view(dashboard, path)
+
+    async def invalidate(_: int) -> None:
+        api._cache.invalidate(dashboard)
+
+    def request(method: str, query: Optional[Dict] = None, body: Any = None) -> FakeRequest:
+        return FakeRequest(method, query=query, body=body)
+
+    params = [{"room": f"r{i}"} for i in range(5)]
+
+    methods = [
+        Operation("get_lovelace_config", "method", lambda i: api.get_lovelace_config(dashboard)),
+        Operation(
+            "get_lovelace_config (cold)", "method",
+            lambda i: api.get_lovelace_config(dashboard), invalidate,
+        ),
+        Operation("get_lovelace_config_json", "method", lambda i: api.get_lovelace_config_json(dashboard)),
+        Operation("get_lovelace_list", "method", lambda i: api.get_lovelace_list(dashboard)),
+        Operation("get_lovelace_list_json", "method", lambda i: api.get_lovelace_list_json(dashboard)),
+        Operation("get_lovelace_section", "method", lambda i: api.get_lovelace_section(dashboard, middle)),
+        Operation(
+            "get_lovelace_section_json", "method",
+            lambda i: api.get_lovelace_section_json(dashboard, middle),
+        ),
+        Operation("get_lovelace_bundle", "method", lambda i: api.get_lovelace_bundle(dashboard, middle)),
+        Operation("get_lovelace_analysis_json", "method", lambda i: api.get_lovelace_analysis_json(dashboard)),
+        Operation(
+            "save_lovelace_config", "method",
+            lambda i: api.save_lovelace_config(dashboard, configs.pop()), fresh_config,
+        ),
+        Operation(
+            "upsert_lovelace_view", "method",
+            lambda i: api.upsert_lovelace_view(dashboard, f"Title {i}", middle),
+        ),
+        Operation(
+            "set_lovelace_section", "method",
+            lambda i: api.set_lovelace_section(dashboard, middle, copy.deepcopy(view_config)),
+        ),
+        Operation(
+            "delete_lovelace_view", "method",
+            lambda i: api.delete_lovelace_view(dashboard, "bench-delete"),
+            lambda i: add_view("bench-delete"),
+        ),
+        Operation(
+            "copy_lovelace_view", "method",
+            lambda i: api.copy_lovelace_view(dashboard, middle, new_path="bench-copy"),
+            lambda i: drop_view("bench-copy"),
+        ),
+        Operation(
+            "move_lovelace_view", "method",
+            lambda i: api.move_lovelace_view(dashboard, middle, position=0 if i % 2 else None),
+        ),
+        Operation(
+            "reorder_lovelace_views", "method",
+            lambda i: api.reorder_lovelace_views(dashboard, paths=[last]),
+        ),
+        Operation("get_lovelace_templates", "method", lambda i: api.get_lovelace_templates()),
+        Operation("save_lovelace_template", "method", lambda i: api.save_lovelace_template("room", TEMPLATE)),
+        Operation(
+            "instantiate_lovelace_template", "method",
+            lambda i: api.instantiate_lovelace_template(dashboard, "room", params),
+        ),
+        Operation(
+            "delete_lovelace_template", "method",
+            lambda i: api.delete_lovelace_template("room"),
+            lambda i: api.save_lovelace_template("room", TEMPLATE),
+        ),
+        Operation("reload_lovelace_resources", "method", lambda i: api.reload_lovelace_resources(dashboard)),
+    ]
+
+    http = [
+        Operation("GET lovelace", "view", lambda i: views["lovelace"].get(request("GET", {"dashboard_id": dashboard}))),
+        Operation(
+            "POST lovelace", "view",
+            lambda i: views["lovelace"].post(request("POST", body={"config": configs.pop()})),
+            fresh_config,
+        ),
+        Operation(
+            "GET lovelace_section", "view",
+            lambda i: views["lovelace_section"].get(request("GET", {"path": middle})),
+        ),
+        Operation(
+            "GET lovelace_bundle", "view",
+            lambda i: views["lovelace_bundle"].get(request("GET", {"path": middle})),
+        ),
+        Operation("GET lovelace_analysis", "view", lambda i: views["lovelace_analysis"].get(request("GET"))),
+        Operation(
+            "POST lovelace_section", "view",
+            lambda i: views["lovelace_section"].post(
+                request("POST", body={"path": middle, "view_config": view_config})
+            ),
+        ),
+        Operation(
+            "POST lovelace_section_upsert", "view",
+            lambda i: views["lovelace_section_upsert"].post(
+                request("POST", body={"title": f"Title {i}", "path": middle})
+            ),
+        ),
+        Operation(
+            "POST lovelace_section_delete", "view",
+            lambda i: views["lovelace_section_delete"].post(request("POST", body={"path": "bench-delete"})),
+            lambda i: add_view("bench-delete"),
+        ),
+        Operation("GET lovelace_list", "view", lambda i: views["lovelace_list"].get(request("GET"))),
+        Operation(
+            "POST lovelace_section_copy", "view",
+            lambda i: views["lovelace_section_copy"].post(
+                request("POST", body={"path": middle, "new_path": "bench-copy"})
+            ),
+            lambda i: drop_view("bench-copy"),
+        ),
+        Operation(
+            "POST lovelace_section_move", "view",
+            lambda i: views["lovelace_section_move"].post(
+                request("POST", body={"path": middle, "position": 0 if i % 2 else None})
+            ),
+        ),
+        Operation(
+            "POST lovelace_section_reorder", "view",
+            lambda i: views["lovelace_section_reorder"].post(request("POST", body={"paths": [last]})),
+        ),
+        Operation(
+            "POST lovelace_template", "view",
+            lambda i: views["lovelace_template"].post(
+                request("POST", body={"name": "room", "template": TEMPLATE})
+            ),
+        ),
+        Operation(
+            "GET lovelace_template", "view",
+            lambda i: views["lovelace_template"].get(request("GET", {"name": "room"})),
+        ),
+        Operation(
+            "POST lovelace_template_instantiate", "view",
+            lambda i: views["lovelace_template_instantiate"].post(
+                request("POST", body={"name": "room", "parameters": params})
+            ),
+        ),
+        Operation(
+            "POST lovelace_template_delete", "view",
+            lambda i: views["lovelace_template_delete"].post(request("POST", body={"name": "room"})),
+            lambda i: api.save_lovelace_template("room", TEMPLATE),
+        ),
+        Operation("POST restart", "view", lambda i: views["restart"].post(request("POST"))),
+        Operation("GET stats", "view", lambda i: views["stats"].get(request("GET"))),
+        Operation("GET metrics", "view", lambda i: views["metrics"].get(request("GET"))),
+        Operation("GET profiles", "view", lambda i: views["profiles"].get(request("GET"))),
+        Operation("GET loop_diagnostics", "view", lambda i: views["loop_diagnostics"].get(request("GET"))),
+    ]
+    return methods + http
+
+
+async def run_operation(api: Any, operation: Operation, iterations: int, max_seconds: float) -> Dict:
+    """Run one operation and summarize its latencies."""
+    latencies = []
+    written = 0
+    errors = 0
+    budget_end = time.perf_counter() + max_seconds
+    for i in range(iterations):
+        if operation.setup is not None:
+            await operation.setup(i)
+        before = api.metrics.bytes_written.get()
+        start = time.perf_counter()
+        result = await operation.run(i)
+        latencies.append(time.perf_counter() - start)
+        written += api.metrics.bytes_written.get() - before
+        errors += failed(result)
+        if len(latencies) >= 3 and time.perf_counter() > budget_end:
+            break
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "operation": operation.name,
+        "kind": operation.kind,
+        "iterations": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "ops_per_sec": round(len(latencies) / total, 1) if total else None,
+        "bytes_written": written,
+        "bytes_written_per_op": written // len(latencies),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+async def run_size(size: int, iterations: int, max_seconds: float, only: Optional[str]) -> List[Dict]:
+    """Benchmark all operations against a dashboard with ``size`` views."""
+    from ha_rest_api.api.lovelace import async_setup_lovelace_api
+
+    hass = FakeHass()
+    dashboard_bytes = write_dashboard(hass, make_dashboard(size))
+    await async_setup_lovelace_api(hass)
+    views = hass.http.views
+    api = views["lovelace"].lovelace_api
+
+    results = []
+    for operation in build_operations(api, views, size):
+        if only and only not in operation.name:
+            continue
+        result = await run_operation(api, operation, iterations, max_seconds)
+        result.update(size=size, dashboard_bytes=dashboard_bytes)
+        results.append(result)
+        print(
+            f"{size:>6} {operation.name:<36} p50 {result['p50_ms']:>9.3f} ms  "
+            f"p99 {result['p99_ms']:>9.3f} ms  {result['ops_per_sec'] or 0:>9.1f} ops/s  "
+            f"{result['bytes_written_per_op']:>9} B/op",
+            file=sys.stderr,
+        )
+    api.async_stop()
+    return results
+
+
+def run_codecs(size: int, iterations: int) -> List[Dict]:
+    """Compare size and encode/decode time of a dashboard config as JSON, MessagePack and CBOR."""
+    from ha_rest_api.api import codecs
+
+    config = make_dashboard(size)
+    results = []
+    for media_type in (codecs.JSON, codecs.MSGPACK, codecs.CBOR):
+        if not codecs.available(media_type):
+            print(f"{size:>6} {media_type:<24} not installed", file=sys.stderr)
+            continue
+        encode, decode = [], []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            body = codecs.dumps(media_type, config)
+            encode.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            codecs.loads(media_type, body)
+            decode.append(time.perf_counter() - start)
+        result = {
+            "media_type": media_type,
+            "size": size,
+            "bytes": len(body),
+            "encode_p50_ms": round(statistics.median(encode) * 1000, 3),
+            "decode_p50_ms": round(statistics.median(decode) * 1000, 3),
+        }
+        results.append(result)
+        print(
+            f"{size:>6} {media_type:<24} {result['bytes']:>10} B  "
+            f"encode {result['encode_p50_ms']:>9.3f} ms  decode {result['decode_p50_ms']:>9.3f} ms",
+            file=sys.stderr,
+        )
+    return results
+
+
+def environment() -> Dict:
+    """Describe the code and machine the benchmark ran on."""
+    manifest = json.loads((REPO_DIR / "manifest.json").read_text())
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        from homeassistant.const import __version__ as ha_version
+    except ImportError:
+        ha_version = None
+    return {
+        "integration_version": manifest.get("version"),
+        "commit": commit,
+        "homeassistant": ha_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="number of views per dashboard")
+    parser.add_argument("--iterations", type=int, default=50, help="iterations per operation")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="time budget per operation")
+    parser.add_argument("--only", help="only run operations whose name contains this text")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--codecs", action="store_true", help="also compare JSON, MessagePack and CBOR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    import_integration()
+
+    results = []
+    for size in args.sizes:
+        results.extend(asyncio.run(run_size(size, args.iterations, args.max_seconds, args.only)))
+
+    output = {"environment": environment(), "results": results}
+    if args.codecs:
+        output["codecs"] = [
+            result for size in args.sizes for result in run_codecs(size, args.iterations)
+        ]
+    report = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Minimal local stand-in for Home Assistant used by the offline tools.
+
+It provides just what ha_rest_api touches on ``hass`` (config.path,
+services, bus, http, states, data, loop, the executor and task helpers) and a
+request object for calling the HTTP views directly. The ``homeassistant``
+package itself must still be installed, since the integration imports it.
+"""
+import asyncio
+import datetime
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+
+def import_integration():
+    """Import the repository as the ``ha_rest_api`` package."""
+    if "ha_rest_api" not in sys.modules:
+        path = tempfile.mkdtemp(prefix="ha_rest_api_custom_components.")
+        os.symlink(REPO_DIR, os.path.join(path, "ha_rest_api"))
+        sys.path.insert(0, path)
+    import ha_rest_api
+    return ha_rest_api
+
+
+class FakeConfig:
+    """Configuration directory of the fake instance."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the config."""
+        self.config_dir = config_dir
+
+    def path(self, *path: str) -> str:
+        """Return a path inside the configuration directory."""
+        return os.path.join(self.config_dir, *path)
+
+
+class FakeServices:
+    """Service registry that records calls instead of running them."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.registered: Dict[Tuple[str, str], Tuple[Callable, Any]] = {}
+        self.calls: List[Tuple[str, str, Optional[Dict]]] = []
+
+    def async_register(self, domain: str, service: str, handler: Callable, schema: Any = None) -> None:
+        """Register a service handler."""
+        self.registered[(domain, service)] = (handler, schema)
+
+    async def async_call(self, domain: str, service: str, data: Optional[Dict] = None, **kwargs: Any) -> None:
+        """Record a service call; calls to own services are dispatched."""
+        self.calls.append((domain, service, data))
+        handler = self.registered.get((domain, service))
+        if handler is not None:
+            await handler[0](FakeServiceCall(domain, service, data or {}))
+
+
+class FakeServiceCall:
+    """Service call passed to registered handlers."""
+
+    def __init__(self, domain: str, service: str, data: Dict) -> None:
+        """Initialize the call."""
+        self.domain = domain
+        self.service = service
+        self.data = data
+
+
+class FakeBus:
+    """Event bus that records fired events."""
+
+    def __init__(self) -> None:
+        """Initialize the bus."""
+        self.fired: List[Tuple[str, Dict]] = []
+        self.listeners: List[Tuple[str, Callable]] = []
+
+    def async_fire(self, event_type: str, event_data: Optional[Dict] = None) -> None:
+        """Record an event."""
+        self.fired.append((event_type, event_data or {}))
+
+    def async_listen_once(self, event_type: str, listener: Callable) -> Callable[[], None]:
+        """Record a listener; it is never called."""
+        self.listeners.append((event_type, listener))
+        return lambda: None
+
+    async_listen = async_listen_once
+
+
+class FakeHttp:
+    """HTTP component that collects registered views."""
+
+    def __init__(self) -> None:
+        """Initialize the component."""
+        self.views: Dict[str, Any] = {}
+
+    def register_view(self, view: Any) -> None:
+        """Register a view by name."""
+        self.views[view.name.rsplit(":", 1)[-1]] = view
+
+
+class FakeState:
+    """State of one entity."""
+
+    def __init__(self, entity_id: str, state: str, attributes: Optional[Dict] = None) -> None:
+        """Initialize the state."""
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+        self.last_changed = self.last_updated = datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeStates:
+    """State machine holding the states set by the caller."""
+
+    def __init__(self) -> None:
+        """Initialize the state machine."""
+        self._states: Dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> Optional[FakeState]:
+        """Return the state of an entity."""
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state: str, attributes: Optional[Dict] = None) -> None:
+        """Set the state of an entity."""
+        self._states[entity_id] = FakeState(entity_id, state, attributes)
+
+
+class FakeHass:
+    """Home Assistant stand-in with a temporary configuration directory."""
+
+    def __init__(self, config_dir: Optional[str] = None) -> None:
+        """Initialize the instance; must be created inside a running loop."""
+        config_dir = config_dir or tempfile.mkdtemp(prefix="ha_rest_api_config.")
+        os.makedirs(os.path.join(config_dir, ".storage"), exist_ok=True)
+        self.config = FakeConfig(config_dir)
+        self.services = FakeServices()
+        self.bus = FakeBus()
+        self.http = FakeHttp()
+        self.states = FakeStates()
+        self.data: Dict[str, Any] = {}
+        self.loop = asyncio.get_running_loop()
+        # 不处于 running 状态，避免启动存储监听和预热
+        self.state = None
+
+    async def async_add_executor_job(self, target: Callable, *args: Any) -> Any:
+        """Run a function in the default executor."""
+        return await self.loop.run_in_executor(None, target, *args)
+
+    def async_create_task(self, target: Any, name: Optional[str] = None, **kwargs: Any) -> asyncio.Task:
+        """Create a task on the loop."""
+        return self.loop.create_task(target)
+
+    async_create_background_task = async_create_task
+
+
+class FakeUser:
+    """Authenticated user of a request."""
+
+    def __init__(self, is_admin: bool = True) -> None:
+        """Initialize the user."""
+        self.is_admin = is_admin
+
+
+class FakeContent:
+    """Body stream of a request, like ``aiohttp.StreamReader``."""
+
+    def __init__(self, body: bytes) -> None:
+        """Initialize the stream."""
+        self._body = body
+        self.position = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, or the rest of the body."""
+        end = len(self._body) if size < 0 else self.position + size
+        chunk = self._body[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+
+class FakeRequest:
+    """Just enough of ``aiohttp.web.Request`` for the views of this integration."""
+
+    def __init__(
+        self,
+        method: str = "GET",
+        query: Optional[Dict[str, str]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        admin: bool = True,
+    ) -> None:
+        """Initialize the request."""
+        self.method = method
+        self.query = query or {}
+        self.query_string = urlencode(self.query)
+        self.headers = headers or {}
+        self.remote = "127.0.0.1"
+        self.path = "/"
+        if body is None or isinstance(body, bytes):
+            self._body = body
+        else:
+            self._body = json.dumps(body).encode("utf-8")
+        self.content_length = None if self._body is None else len(self._body)
+        self.content = FakeContent(self._body or b"")
+        self._data = {"hass_user": FakeUser(admin)}
+
+    async def json(self) -> Any:
+        """Return the parsed body."""
+        return json.loads(self._body)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return request data, such as the authenticated user."""
+        return self._data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        """Return request data, such as the authenticated user."""
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Store request data."""
+        self._data[key] = value
+
+
+def write_dashboard(hass: FakeHass, config: Dict, dashboard_id: str = "lovelace") -> int:
+    """Write a dashboard storage file and return its size in bytes."""
+    key = "lovelace" if dashboard_id == "lovelace" else f"lovelace.{dashboard_id}"
+    raw = json.dumps({
+        "version": 1,
+        "minor_version": 1,
+        "key": key,
+        "data": {"config": config},
+    }, indent=2).encode("utf-8")
+    with open(hass.config.path(".storage", key), "wb") as file:
+        file.write(raw)
+    return len(raw)
@@ -0,0 +1,388 @@
+"""Push one dashboard change to many Home Assistant instances concurrently.
+
+The instances are listed in a JSON inventory file::
+
+    [
+      {"name": "home", "host": "192.168.1.10:8123", "token_env": "HOME_TOKEN"},
+      {"name": "cabin", "host": "cabin.example.com", "ssl": true, "token": "..."}
+    ]
+
+``token`` falls back to ``token_env`` and then to ``HA_TOKEN``; ``dashboard_id``
+sets the default dashboard of an instance. The change is a full dashboard
+config, one view (matched by its ``path``) or a batch of operations::
+
+    python test/fleet.py sites.json config dashboard.json --dashboard lovelace
+    python test/fleet.py sites.json view energy-view.json
+    python test/fleet.py sites.json batch rollout.json --parallel 16 --canary 2
+
+A batch is a list of ``{"op": "config", "config": {...}}``,
+``{"op": "view", "view": {...}}`` and ``{"op": "delete_view", "path": "..."}``
+items, each with an optional ``dashboard_id``, applied in order per host.
+
+Before each write the current state is fetched with ``If-None-Match`` set to
+the ETag of the desired content, so hosts that already have it answer 304
+and are skipped. Transient failures (connection errors, timeouts, 429 and
+5xx) are retried per host with exponential backoff and jitter.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+API = "/api/ha_rest_api"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def etag_of(value: Any) -> str:
+    """Return the ETag the integration sends for a JSON value.
+
+    Must match ``dumps_json`` and ``etag_of`` in ``api/storage.py``.
+    """
+    body = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class FleetError(Exception):
+    """A request to one instance failed."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class Instance:
+    """One Home Assistant instance of the fleet."""
+
+    def __init__(self, item: Dict[str, Any]) -> None:
+        """Initialize the instance from an inventory item."""
+        self.host = item["host"]
+        self.name = item.get("name", self.host)
+        self.dashboard_id = item.get("dashboard_id", "lovelace")
+        self.base_url = f"{'https' if item.get('ssl') else 'http'}://{self.host}{API}"
+        # 关闭证书校验仅用于自签名证书的站点
+        self.ssl = None if item.get("verify_ssl", True) else False
+        token = item.get("token") or os.environ.get(item.get("token_env", ""), "") or os.environ.get("HA_TOKEN")
+        if not token:
+            raise ValueError(f"No access token for instance {self.name}")
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+def load_inventory(path: str) -> List[Instance]:
+    """Read the inventory file."""
+    with open(path, encoding="utf-8") as file:
+        items = json.load(file)
+    instances = [Instance(item) for item in items]
+    names = Counter(instance.name for instance in instances)
+    duplicates = [name for name, count in names.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Duplicate instance names: {', '.join(duplicates)}")
+    return instances
+
+
+def validate_operations(operations: List[Dict[str, Any]]) -> None:
+    """Reject malformed batch items before anything is sent."""
+    for index, operation in enumerate(operations):
+        kind = operation.get("op")
+        if kind == "config" and isinstance(operation.get("config"), dict):
+            continue
+        if kind == "view" and isinstance(operation.get("view"), dict) and operation["view"].get("path"):
+            continue
+        if kind == "delete_view" and operation.get("path"):
+            continue
+        raise ValueError(f"Invalid operation #{index}: {json.dumps(operation)[:200]}")
+
+
+class InstanceClient:
+    """Conditional reads and writes against one instance over a shared session."""
+
+    def __init__(self, session: aiohttp.ClientSession, instance: Instance, timeout: float) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.instance = instance
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, str]] = None,
+        body: Optional[Dict] = None,
+        etag: Optional[str] = None,
+    ) -> Optional[Any]:
+        """Send one request; returns None for 304 and the JSON body otherwise."""
+        headers = dict(self.instance.headers)
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        try:
+            async with self.session.request(
+                method,
+                self.instance.base_url + endpoint,
+                params=params,
+                json=body,
+                headers=headers,
+                ssl=self.instance.ssl,
+                timeout=self.timeout,
+            ) as response:
+                if response.status == 304:
+                    return None
+                text = await response.text()
+                if response.status >= 400:
+                    retry_after = response.headers.get("Retry-After")
+                    raise FleetError(
+                        f"{method} {endpoint}: HTTP {response.status} {text[:200]}",
+                        retryable=response.status in RETRY_STATUSES,
+                        retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+                    )
+                return json.loads(text) if text else None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise FleetError(f"{method} {endpoint}: {type(err).__name__} {err}", retryable=True) from err
+
+    async def write(self, endpoint: str, body: Dict) -> None:
+        """POST a change and check the integration reported success."""
+        result = await self.request("POST", endpoint, body=body)
+        if not isinstance(result, dict) or not result.get("success"):
+            raise FleetError(f"POST {endpoint}: {json.dumps(result)[:200]}")
+
+    async def apply(self, operation: Dict[str, Any], dry_run: bool) -> str:
+        """Apply one operation; returns ``unchanged``, ``updated`` or ``pending``."""
+        dashboard_id = operation.get("dashboard_id", self.instance.dashboard_id)
+        kind = operation["op"]
+
+        if kind == "config":
+            config = operation["config"]
+            current = await self.request(
+                "GET", "/lovelace", {"dashboard_id": dashboard_id}, etag=etag_of(config)
+            )
+            if current is None:
+                return "unchanged"
+            if not dry_run:
+                await self.write("/lovelace", {"dashboard_id": dashboard_id, "config": config})
+
+        elif kind == "view":
+            view = operation["view"]
+            path = view["path"]
+            current = await self.request(
+                "GET", "/lovelace_section", {"dashboard_id": dashboard_id, "path": path}, etag=etag_of(view)
+            )
+            if current is None:
+                return "unchanged"
+            if not dry_run:
+                await self.write(
+                    "/lovelace_section", {"dashboard_id": dashboard_id, "path": path, "view_config": view}
+                )
+
+        else:
+            path = operation["path"]
+            current = await self.request("GET", "/lovelace_section", {"dashboard_id": dashboard_id, "path": path})
+            # 视图不存在时接口返回 {"success": false, ...}
+            if isinstance(current, dict) and current.get("success") is False:
+                return "unchanged"
+            if not dry_run:
+                await self.write("/lovelace_section/delete", {"dashboard_id": dashboard_id, "path": path})
+
+        return "pending" if dry_run else "updated"
+
+
+class Fleet:
+    """Apply a list of operations to every instance with bounded parallelism."""
+
+    def __init__(
+        self,
+        instances: List[Instance],
+        parallel: int = 8,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        timeout: float = 60.0,
+        dry_run: bool = False,
+    ) -> None:
+        """Initialize the fleet."""
+        self.instances = instances
+        self.parallel = parallel
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.dry_run = dry_run
+        self._slots = asyncio.Semaphore(parallel)
+
+    def _delay(self, attempt: int, error: FleetError) -> float:
+        """Return the backoff before the next attempt (full jitter)."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
+
+    async def _apply_with_retries(
+        self, client: InstanceClient, operation: Dict[str, Any], result: Dict[str, Any]
+    ) -> str:
+        """Apply one operation, retrying transient failures.
+
+        The conditional read is repeated on every attempt, so a write that
+        succeeded before its response was lost is not sent again.
+        """
+        attempt = 0
+        while True:
+            result["attempts"] += 1
+            try:
+                return await client.apply(operation, self.dry_run)
+            except FleetError as err:
+                if not err.retryable or attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt, err)
+                attempt += 1
+                print(
+                    f"{client.instance.name}: {err}; retry {attempt}/{self.retries} in {delay:.1f} s",
+                    file=sys.stderr,
+                )
+                await asyncio.sleep(delay)
+
+    async def _run_instance(
+        self, session: aiohttp.ClientSession, instance: Instance, operations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Apply all operations to one instance, stopping at the first failure."""
+        client = InstanceClient(session, instance, self.timeout)
+        result: Dict[str, Any] = {"host": instance.host, "attempts": 0, "operations": []}
+        async with self._slots:
+            start = time.perf_counter()
+            for operation in operations:
+                outcome: Dict[str, Any] = {"op": operation["op"]}
+                if "path" in operation or "view" in operation:
+                    outcome["path"] = operation.get("path") or operation["view"]["path"]
+                if result.get("error"):
+                    outcome["result"] = "skipped"
+                else:
+                    try:
+                        outcome["result"] = await self._apply_with_retries(client, operation, result)
+                    except FleetError as err:
+                        outcome["result"] = "failed"
+                        result["error"] = outcome["error"] = str(err)
+                result["operations"].append(outcome)
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        results = {outcome["result"] for outcome in result["operations"]}
+        for status in ("failed", "pending", "updated"):
+            if status in results:
+                result["status"] = status
+                break
+        else:
+            result["status"] = "unchanged"
+        return result
+
+    async def apply(self, operations: List[Dict[str, Any]], canary: int = 0) -> Dict[str, Any]:
+        """Apply the operations to the fleet and return the report.
+
+        With ``canary`` the first N instances are updated first and the rest
+        is only touched if none of them failed.
+        """
+        validate_operations(operations)
+        start = time.perf_counter()
+        # 所有实例共享一个会话，每个主机的连接保持复用
+        connector = aiohttp.TCPConnector(limit=self.parallel * 2, limit_per_host=2)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = list(await asyncio.gather(
+                *(self._run_instance(session, instance, operations) for instance in self.instances[:canary])
+            ))
+            aborted = any(result["status"] == "failed" for result in results)
+            rest = self.instances[len(results):]
+            if aborted:
+                results.extend(
+                    {"host": instance.host, "status": "skipped", "attempts": 0, "operations": []}
+                    for instance in rest
+                )
+            else:
+                results.extend(await asyncio.gather(
+                    *(self._run_instance(session, instance, operations) for instance in rest)
+                ))
+
+        return {
+            "operations": len(operations),
+            "dry_run": self.dry_run,
+            "canary": canary,
+            "aborted": aborted,
+            "duration_s": round(time.perf_counter() - start, 2),
+            "summary": dict(Counter(result["status"] for result in results)),
+            "instances": {
+                instance.name: result for instance, result in zip(self.instances, results)
+            },
+        }
+
+
+def build_operations(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Turn the command line change into a list of operations."""
+    with open(args.file, encoding="utf-8") as file:
+        data = json.load(file)
+    if args.action == "config":
+        operations = [{"op": "config", "config": data}]
+    elif args.action == "view":
+        operations = [{"op": "view", "view": data}]
+    else:
+        operations = data
+    if args.dashboard:
+        for operation in operations:
+            operation.setdefault("dashboard_id", args.dashboard)
+    return operations
+
+
+def main() -> None:
+    """Run a rollout from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("inventory", help="JSON list of instances")
+    parser.add_argument("action", choices=["config", "view", "batch"], help="kind of change")
+    parser.add_argument("file", help="JSON file with the config, the view or the batch")
+    parser.add_argument("--dashboard", help="dashboard id, overrides the inventory default")
+    parser.add_argument("--parallel", type=int, default=8, help="instances updated at the same time")
+    parser.add_argument("--retries", type=int, default=3, help="retries per operation for transient errors")
+    parser.add_argument("--backoff", type=float, default=1.0, help="initial backoff in seconds")
+    parser.add_argument("--timeout", type=float, default=60.0, help="timeout per request in seconds")
+    parser.add_argument("--canary", type=int, default=0, help="update this many instances first, stop on failure")
+    parser.add_argument("--dry-run", action="store_true", help="only report which instances would change")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    try:
+        instances = load_inventory(args.inventory)
+        operations = build_operations(args)
+        validate_operations(operations)
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+
+    fleet = Fleet(
+        instances,
+        parallel=args.parallel,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout,
+        dry_run=args.dry_run,
+    )
+    report = asyncio.run(fleet.apply(operations, canary=args.canary))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(report["summary"].items()))
+    print(
+        f"{len(instances)} instances in {report['duration_s']} s: {summary}"
+        + (" (aborted after canary failure)" if report["aborted"] else ""),
+        file=sys.stderr,
+    )
+    sys.exit(1 if report["summary"].get("failed") else 0)
+
+
+if __name__ == "__main__":
+    main()
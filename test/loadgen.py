@@ -0,0 +1,327 @@
+"""Concurrent load generator for the ha_rest_api endpoints of a running instance.
+
+HTTP requests go through one pooled ``aiohttp.ClientSession``; WebSocket
+commands are pipelined over a few connections with responses matched to
+requests by message id. A weighted mix of reads and writes runs at the
+given concurrency for a fixed duration, and throughput plus tail latency
+per operation are reported (as JSON with ``--output``)::
+
+    HA_TOKEN=... python test/loadgen.py --host 127.0.0.1:8123 \\
+        --concurrency 32 --duration 30 --mix get_config=50,get_list=30,set_section=20
+
+Writes only touch views whose path starts with ``loadgen-``; they are
+deleted again at the end unless ``--keep`` is given.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from benchmark import percentile
+
+API = "/api/ha_rest_api"
+
+DEFAULT_MIX = "get_config=40,get_list=25,get_section=20,set_section=10,upsert=5"
+
+
+class WebSocketClient:
+    """One authenticated WebSocket connection with pipelined requests."""
+
+    def __init__(self, session: aiohttp.ClientSession, url: str, token: str) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.url = url
+        self.token = token
+        self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """Open the connection and authenticate."""
+        self.websocket = await self.session.ws_connect(self.url, max_msg_size=0)
+        message = await self.websocket.receive_json()
+        if message.get("type") != "auth_required":
+            raise RuntimeError(f"Unexpected message: {message}")
+        await self.websocket.send_json({"type": "auth", "access_token": self.token})
+        message = await self.websocket.receive_json()
+        if message.get("type") != "auth_ok":
+            raise RuntimeError("Authentication failed")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        """Resolve pending requests as their responses arrive, in any order."""
+        assert self.websocket is not None
+        async for message in self.websocket:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            data = json.loads(message.data)
+            # 服务端可能把多个消息合并为一个 JSON 数组发送
+            for item in data if isinstance(data, list) else [data]:
+                future = self._pending.pop(item.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(item)
+        error = ConnectionError("WebSocket closed")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def request(self, message: Dict) -> Dict:
+        """Send a command and wait for its result; other commands may be in flight."""
+        assert self.websocket is not None
+        msg_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = future
+        await self.websocket.send_json({"id": msg_id, **message})
+        return await future
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self._reader is not None:
+            await self._reader
+
+
+class LoadGenerator:
+    """Run a weighted mix of operations at a fixed concurrency."""
+
+    def __init__(self, args: argparse.Namespace, session: aiohttp.ClientSession) -> None:
+        """Initialize the generator."""
+        self.args = args
+        self.session = session
+        scheme = "https" if args.ssl else "http"
+        self.base_url = f"{scheme}://{args.host}"
+        self.ws_url = f"{'wss' if args.ssl else 'ws'}://{args.host}/api/websocket"
+        self.dashboard = args.dashboard
+        self.paths: List[str] = []
+        self.websockets: List[WebSocketClient] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.operations: Dict[str, Callable[[int, int], Awaitable[bool]]] = {
+            "get_config": self.get_config,
+            "get_list": self.get_list,
+            "get_section": self.get_section,
+            "set_section": self.set_section,
+            "upsert": self.upsert,
+            "ws_get_config": self.ws_get_config,
+            "ws_get_list": self.ws_get_list,
+        }
+
+    async def _get(self, path: str, params: Dict) -> bool:
+        async with self.session.get(f"{self.base_url}{API}{path}", params=params) as response:
+            await response.read()
+            return response.status < 400
+
+    async def _post(self, path: str, data: Dict) -> bool:
+        async with self.session.post(f"{self.base_url}{API}{path}", json=data) as response:
+            body = await response.read()
+            if response.status >= 400:
+                return False
+            result = json.loads(body)
+            return not (isinstance(result, dict) and result.get("success") is False)
+
+    async def get_config(self, worker: int, i: int) -> bool:
+        """GET /lovelace."""
+        return await self._get("/lovelace", {"dashboard_id": self.dashboard})
+
+    async def get_list(self, worker: int, i: int) -> bool:
+        """GET /lovelace_list."""
+        return await self._get("/lovelace_list", {"dashboard_id": self.dashboard})
+
+    async def get_section(self, worker: int, i: int) -> bool:
+        """GET /lovelace_section for a random existing view."""
+        path = random.choice(self.paths) if self.paths else f"loadgen-{worker}"
+        return await self._get("/lovelace_section", {"dashboard_id": self.dashboard, "path": path})
+
+    async def set_section(self, worker: int, i: int) -> bool:
+        """POST /lovelace_section on the worker's own view."""
+        path = f"loadgen-{worker}"
+        return await self._post("/lovelace_section", {
+            "dashboard_id": self.dashboard,
+            "path": path,
+            "view_config": {
+                "title": f"Loadgen {worker}",
+                "path": path,
+                "cards": [{"type": "markdown", "content": f"iteration {i}"}],
+            },
+        })
+
+    async def upsert(self, worker: int, i: int) -> bool:
+        """POST /lovelace_section/upsert on the worker's own view."""
+        return await self._post("/lovelace_section/upsert", {
+            "dashboard_id": self.dashboard,
+            "title": f"Loadgen {worker} #{i}",
+            "path": f"loadgen-{worker}",
+        })
+
+    def _websocket(self, worker: int) -> WebSocketClient:
+        return self.websockets[worker % len(self.websockets)]
+
+    async def ws_get_config(self, worker: int, i: int) -> bool:
+        """lovelace/config over a shared, pipelined WebSocket."""
+        url_path = None if self.dashboard == "lovelace" else self.dashboard
+        result = await self._websocket(worker).request({"type": "lovelace/config", "url_path": url_path})
+        return bool(result.get("success"))
+
+    async def ws_get_list(self, worker: int, i: int) -> bool:
+        """ha_rest_api.get_lovelace_list service call over WebSocket."""
+        result = await self._websocket(worker).request({
+            "type": "call_service",
+            "domain": "ha_rest_api",
+            "service": "get_lovelace_list",
+            "service_data": {"dashboard_id": self.dashboard},
+        })
+        return bool(result.get("success"))
+
+    async def prepare(self, mix: List[Tuple[str, int]]) -> None:
+        """Open WebSocket connections and collect view paths to read."""
+        if any(name.startswith("ws_") for name, _ in mix):
+            for _ in range(self.args.ws_connections):
+                client = WebSocketClient(self.session, self.ws_url, self.args.token)
+                await client.connect()
+                self.websockets.append(client)
+
+        async with self.session.get(
+            f"{self.base_url}{API}/lovelace_list", params={"dashboard_id": self.dashboard}
+        ) as response:
+            views = await response.json() if response.status < 400 else []
+        self.paths = [view["path"] for view in views if isinstance(view, dict) and "path" in view]
+
+    async def worker(self, worker: int, mix: List[Tuple[str, int]], deadline: float) -> None:
+        """Issue operations back to back until the deadline."""
+        names = [name for name, _ in mix]
+        weights = [weight for _, weight in mix]
+        for i in itertools.count():
+            if time.perf_counter() >= deadline:
+                return
+            name = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = await self.operations[name](worker, i)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError, ValueError):
+                ok = False
+            self.latencies[name].append(time.perf_counter() - start)
+            if not ok:
+                self.errors[name] += 1
+
+    async def cleanup(self) -> None:
+        """Delete the views created by write operations and close connections."""
+        for client in self.websockets:
+            await client.close()
+        if self.args.keep:
+            return
+        for worker in range(self.args.concurrency):
+            await self._post("/lovelace_section/delete", {
+                "dashboard_id": self.dashboard,
+                "path": f"loadgen-{worker}",
+            })
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize throughput and latency per operation and overall."""
+        def summarize(latencies: List[float], errors: int) -> Dict[str, Any]:
+            latencies = sorted(latencies)
+            return {
+                "requests": len(latencies),
+                "errors": errors,
+                "throughput": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "p999_ms": round(percentile(latencies, 99.9) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2),
+            }
+
+        everything = [value for values in self.latencies.values() for value in values]
+        return {
+            "host": self.args.host,
+            "dashboard": self.dashboard,
+            "concurrency": self.args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "total": summarize(everything, sum(self.errors.values())) if everything else None,
+            "operations": {
+                name: summarize(values, self.errors[name])
+                for name, values in sorted(self.latencies.items())
+            },
+        }
+
+
+def parse_mix(text: str) -> List[Tuple[str, int]]:
+    """Parse ``name=weight,...``."""
+    mix = []
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix.append((name.strip(), int(weight or 1)))
+    return mix
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the load test."""
+    mix = parse_mix(args.mix)
+    connector = aiohttp.TCPConnector(limit=args.concurrency, ssl=None if args.ssl else False)
+    headers = {"Authorization": f"Bearer {args.token}"}
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+        generator = LoadGenerator(args, session)
+        unknown = [name for name, _ in mix if name not in generator.operations]
+        if unknown:
+            raise SystemExit(f"Unknown operations: {', '.join(unknown)}; "
+                             f"available: {', '.join(generator.operations)}")
+        await generator.prepare(mix)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        try:
+            await asyncio.gather(*(
+                generator.worker(worker, mix, deadline) for worker in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - start
+        finally:
+            await generator.cleanup()
+        return generator.report(elapsed)
+
+
+def main() -> None:
+    """Run the load generator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=os.environ.get("HA_HOST", "127.0.0.1:8123"), help="host:port (HA_HOST)")
+    parser.add_argument("--token", default=os.environ.get("HA_TOKEN"), help="long-lived access token (HA_TOKEN)")
+    parser.add_argument("--ssl", action="store_true", help="use https/wss")
+    parser.add_argument("--dashboard", default="lovelace", help="dashboard ID")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--ws-connections", type=int, default=2, help="WebSocket connections shared by all workers")
+    parser.add_argument("--timeout", type=float, default=30.0, help="request timeout in seconds")
+    parser.add_argument("--keep", action="store_true", help="keep the loadgen-* views afterwards")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an access token is required (--token or HA_TOKEN)")
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    total = report["total"] or {}
+    print(
+        f"{total.get('requests', 0)} requests in {report['duration_s']} s: "
+        f"{total.get('throughput', 0)} req/s, p50 {total.get('p50_ms')} ms, "
+        f"p99 {total.get('p99_ms')} ms, {total.get('errors', 0)} errors",
+        file=sys.stderr,
+    )
+    if not args.output:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
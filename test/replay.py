@@ -0,0 +1,193 @@
+"""Replay requests captured by the integration against a running instance.
+
+Enable capture in ``configuration.yaml`` (``ha_rest_api: capture:``), copy
+the resulting ``ha_rest_api_requests.jsonl*`` files and replay them with the
+original timing, or N times faster::
+
+    HA_TOKEN=... python test/replay.py ha_rest_api_requests.jsonl.1 \\
+        ha_rest_api_requests.jsonl --host 127.0.0.1:8123 --speed 4
+
+Only GET requests are replayed by default. POST requests are replayed with
+``--writes`` if they were captured with ``payloads: true``; never replay
+writes against an instance whose dashboards you care about.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from benchmark import percentile
+
+
+def load_records(paths: List[str]) -> List[Dict[str, Any]]:
+    """Read capture files and return the records in arrival order."""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    """Return p50/p90/p99/max of millisecond values."""
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        "p50_ms": round(percentile(values, 50), 2),
+        "p90_ms": round(percentile(values, 90), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2),
+    }
+
+
+class Replayer:
+    """Issue captured requests on their original schedule, scaled by speed."""
+
+    def __init__(self, args: argparse.Namespace, session: aiohttp.ClientSession) -> None:
+        """Initialize the replayer."""
+        self.args = args
+        self.session = session
+        self.base_url = f"{'https' if args.ssl else 'http'}://{args.host}"
+        self.in_flight = asyncio.Semaphore(args.max_in_flight)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.captured: Dict[str, List[float]] = defaultdict(list)
+        self.lateness: List[float] = []
+        self.errors = 0
+        self.status_mismatches = 0
+        self.skipped: Dict[str, int] = defaultdict(int)
+
+    def select(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop the records that cannot or should not be replayed."""
+        selected = []
+        for record in records:
+            if self.args.views and record["view"] not in self.args.views:
+                self.skipped["filtered"] += 1
+            elif record["method"] != "GET" and not self.args.writes:
+                self.skipped["write"] += 1
+            elif record["method"] != "GET" and record.get("size") and "body" not in record:
+                self.skipped["no_payload"] += 1
+            else:
+                selected.append(record)
+        return selected[:self.args.limit] if self.args.limit else selected
+
+    async def send(self, record: Dict[str, Any]) -> None:
+        """Replay one request and compare it with the captured one."""
+        key = f"{record['method']} {record['view']}"
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                record["method"],
+                self.base_url + record["path"],
+                params=record.get("query") or None,
+                json=record.get("body"),
+            ) as response:
+                await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = None
+        finally:
+            self.in_flight.release()
+        self.latencies[key].append((time.perf_counter() - start) * 1000)
+        self.captured[key].append(record["duration_ms"])
+        if status is None or status >= 400:
+            self.errors += 1
+        if status != record.get("status"):
+            self.status_mismatches += 1
+
+    async def run(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Replay the records and return the report."""
+        tasks = []
+        first = records[0]["ts"] if records else 0
+        start = time.perf_counter()
+        for record in records:
+            due = start + (record["ts"] - first) / self.args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.in_flight.acquire()
+            # 实际发出时间相对计划时间的延迟，过大说明客户端或服务端跟不上
+            self.lateness.append(max(0.0, time.perf_counter() - due) * 1000)
+            tasks.append(asyncio.create_task(self.send(record)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        captured_span = records[-1]["ts"] - first if records else 0
+        return {
+            "host": self.args.host,
+            "speed": self.args.speed,
+            "replayed": len(records),
+            "skipped": dict(self.skipped),
+            "errors": self.errors,
+            "status_mismatches": self.status_mismatches,
+            "duration_s": round(elapsed, 2),
+            "captured_duration_s": round(captured_span, 2),
+            "throughput": round(len(records) / elapsed, 1) if elapsed else None,
+            "lateness": summarize(self.lateness),
+            "views": {
+                key: {
+                    "requests": len(values),
+                    "replayed": summarize(values),
+                    "captured": summarize(self.captured[key]),
+                }
+                for key, values in sorted(self.latencies.items())
+            },
+        }
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    """Load the capture files and replay them."""
+    records = load_records(args.files)
+    connector = aiohttp.TCPConnector(limit=args.max_in_flight, ssl=None if args.ssl else False)
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        replayer = Replayer(args, session)
+        return await replayer.run(replayer.select(records))
+
+
+def main() -> None:
+    """Run the replay from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", help="capture files, oldest first")
+    parser.add_argument("--host", default=os.environ.get("HA_HOST", "127.0.0.1:8123"), help="host:port (HA_HOST)")
+    parser.add_argument("--token", default=os.environ.get("HA_TOKEN"), help="long-lived access token (HA_TOKEN)")
+    parser.add_argument("--ssl", action="store_true", help="use https")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor (2 = twice as fast)")
+    parser.add_argument("--views", nargs="+", help="only replay these views (e.g. lovelace lovelace_list)")
+    parser.add_argument("--writes", action="store_true", help="also replay POST requests with captured payloads")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="maximum concurrent requests")
+    parser.add_argument("--limit", type=int, help="replay at most this many requests")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an access token is required (--token or HA_TOKEN)")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    report = asyncio.run(replay(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    print(
+        f"Replayed {report['replayed']} requests in {report['duration_s']} s "
+        f"(captured over {report['captured_duration_s']} s), {report['errors']} errors, "
+        f"{report['status_mismatches']} status mismatches",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Dashboard render cost analysis.
+
+Run with ``python -m pytest test/test_analysis.py``.
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import FakeHass, FakeRequest, import_integration, write_dashboard  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api.lovelace import LovelaceAPI, LovelaceAnalysisAPIView  # noqa: E402
+
+CONFIG = {"views": [{"path": "a", "cards": [{"type": "tile", "entity": "light.a"}] * 3}]}
+
+
+def _get(query):
+    async def run():
+        hass = FakeHass()
+        write_dashboard(hass, CONFIG)
+        view = LovelaceAnalysisAPIView(LovelaceAPI(hass, stall_threshold=0))
+        return await view.get(FakeRequest(query=query))
+
+    return asyncio.run(run())
+
+
+def test_threshold_override():
+    """Query parameters override the configured thresholds."""
+    response = _get({"max_cards": "2"})
+    assert response.status == 200
+    assert json.loads(response.body)["flagged"] == ["a"]
+    assert json.loads(_get({"max_cards": "0"}).body)["flagged"] == []
+
+
+@pytest.mark.parametrize("value", ["-1", "x", "1.5"])
+def test_invalid_threshold(value):
+    """Negative and non-integer thresholds are rejected like in the configuration."""
+    response = _get({"max_depth": value})
+    assert response.status == 400
+    assert json.loads(response.body)["error"] == "max_depth must be a non-negative integer"
@@ -0,0 +1,188 @@
+"""Streaming dashboard archives.
+
+Run with ``python -m pytest test/test_archive.py``.
+"""
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import FakeHass, FakeRequest, import_integration  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api.archive import (  # noqa: E402
+    ArchiveError,
+    TarReader,
+    TarWriter,
+    bytes_reader,
+    parse_dashboard,
+    storage_key,
+)
+from ha_rest_api.api.lovelace import LovelaceAPI, LovelaceArchiveAPIView  # noqa: E402
+from ha_rest_api.api.schema import LovelaceValidationError  # noqa: E402
+
+MEMBERS = [
+    ("manifest.json", b'{"format": 1}'),
+    (".storage/lovelace", b"x" * 1000),
+    (".storage/lovelace." + "long" * 40, b"y" * 513),
+    ("empty", b""),
+]
+
+
+def _write(members, compress=False) -> bytes:
+    writer = TarWriter(compress)
+    data = b"".join(writer.member(name, body, 0) for name, body in members)
+    return data + writer.close()
+
+
+def _trickle(data: bytes, size: int = 7):
+    """Return a reader that never returns more than ``size`` bytes."""
+    read = bytes_reader(data)
+    return lambda n: read(min(n, size))
+
+
+def _read_all(read, limit=None, skip=()):
+    async def run():
+        reader = TarReader(read)
+        members = []
+        while True:
+            info = await reader.next()
+            if info is None:
+                return members
+            if info.name in skip:
+                members.append((info.name, None))
+            elif limit is None:
+                members.append((info.name, await reader.read(info)))
+            else:
+                members.append((info.name, await reader.read(info, limit)))
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(compress):
+    """Members written by TarWriter are read back unchanged, also in small pieces."""
+    data = _write(MEMBERS, compress)
+    assert _read_all(bytes_reader(data)) == MEMBERS
+    assert _read_all(_trickle(data)) == MEMBERS
+
+
+def test_compatible_with_tarfile():
+    """TarWriter output is a valid tar file, and TarReader reads tarfile output."""
+    data = _write(MEMBERS, compress=True)
+    with tarfile.open(fileobj=io.BytesIO(gzip.decompress(data))) as archive:
+        assert [(m.name, archive.extractfile(m).read()) for m in archive] == MEMBERS
+
+    for fmt in (tarfile.GNU_FORMAT, tarfile.PAX_FORMAT, tarfile.USTAR_FORMAT):
+        members = MEMBERS if fmt != tarfile.USTAR_FORMAT else MEMBERS[:2]
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w", format=fmt) as archive:
+            directory = tarfile.TarInfo(".storage")
+            directory.type = tarfile.DIRTYPE
+            archive.addfile(directory)
+            for name, body in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(body)
+                archive.addfile(info, io.BytesIO(body))
+        assert _read_all(bytes_reader(buffer.getvalue()), skip={".storage"}) == [
+            (".storage", None), *members
+        ]
+
+
+def test_unread_members_skipped():
+    """Members that are not read are skipped."""
+    data = _write(MEMBERS)
+    assert _read_all(_trickle(data), skip={".storage/lovelace"})[:3] == [
+        MEMBERS[0], (".storage/lovelace", None), MEMBERS[2],
+    ]
+
+
+def test_member_limit():
+    """Members larger than the limit are rejected before they are buffered."""
+    data = _write(MEMBERS)
+    with pytest.raises(ArchiveError, match="exceeds the limit of 999 bytes"):
+        _read_all(bytes_reader(data), limit=999)
+
+
+def test_pax_header_limit():
+    """Extended headers larger than 64 blocks are rejected."""
+    writer = TarWriter()
+    info = tarfile.TarInfo("././@PaxHeader")
+    info.type = tarfile.XHDTYPE
+    info.size = 64 * tarfile.BLOCKSIZE + 1
+    data = info.tobuf(tarfile.USTAR_FORMAT) + b"\0" * (65 * tarfile.BLOCKSIZE) + writer.close()
+    with pytest.raises(ArchiveError, match="exceeds the limit"):
+        _read_all(bytes_reader(data))
+
+
+def test_truncated():
+    """A stream that ends inside a member is an error, one without end blocks is not."""
+    data = _write(MEMBERS)
+    with pytest.raises(ArchiveError, match="truncated"):
+        _read_all(bytes_reader(data[:1500]))
+    assert _read_all(bytes_reader(data[:5 * tarfile.BLOCKSIZE])) == MEMBERS[:2]
+
+
+def test_invalid_data():
+    """Corrupt gzip data and headers are reported as ArchiveError."""
+    data = _write(MEMBERS, compress=True)
+    with pytest.raises(ArchiveError, match="Invalid gzip data"):
+        _read_all(bytes_reader(data[:20] + b"\xff" * 100 + data[120:]))
+    with pytest.raises(ArchiveError, match="Invalid tar header"):
+        _read_all(bytes_reader(b"not a tar header".ljust(tarfile.BLOCKSIZE, b"!")))
+
+
+def test_storage_key():
+    """Only dashboard storage files map to a storage key."""
+    assert storage_key(".storage/lovelace") == "lovelace"
+    assert storage_key(".storage/lovelace.my-dash_1") == "lovelace.my-dash_1"
+    assert storage_key(".storage/lovelace_resources") is None
+    assert storage_key(".storage/lovelace.a/b") is None
+    assert storage_key(".storage/lovelace.../x") is None
+    assert storage_key("lovelace") is None
+
+
+def test_parse_dashboard():
+    """Storage files are parsed and their config validated."""
+    config = {"views": [{"path": "a"}]}
+    assert parse_dashboard(json.dumps({"data": {"config": config}}).encode()) == config
+    with pytest.raises(ValueError, match="data.config is missing"):
+        parse_dashboard(b"[]")
+    with pytest.raises(ValueError):
+        parse_dashboard(b"{")
+    with pytest.raises(LovelaceValidationError):
+        parse_dashboard(json.dumps({"data": {"config": {"views": [{"cards": [{}]}]}}}).encode())
+
+
+def test_import_not_captured():
+    """Archive imports are streamed; the capture records only their size and SHA-256."""
+    config = {"views": [{"path": "imported"}]}
+    data = _write([
+        ("manifest.json", b'{"format": 1}'),
+        (".storage/lovelace.tablet", json.dumps({"data": {"config": config}}).encode()),
+    ])
+
+    async def run():
+        hass = FakeHass()
+        capture = {"path": "requests.jsonl", "max_bytes": 1 << 20, "backups": 1, "payloads": True}
+        api = LovelaceAPI(hass, stall_threshold=0, capture=capture)
+        request = FakeRequest("POST", body=data, headers={"Content-Type": "application/x-tar"})
+        response = await LovelaceArchiveAPIView(api).post(request)
+        await api.capture.async_flush()
+        with open(hass.config.path("requests.jsonl")) as file:
+            return response, request, json.loads(file.read()), await api.get_lovelace_config("tablet")
+
+    response, request, record, imported = asyncio.run(run())
+    assert response.status == 200
+    assert imported == config
+    assert request.content.position == len(data)
+    assert record["size"] == len(data)
+    assert record["sha256"] == hashlib.sha256(data).hexdigest()
+    assert "body" not in record and "body_text" not in record
@@ -0,0 +1,291 @@
+"""Three-way merge of dashboard configs.
+
+Run with ``python -m pytest test/test_merge.py``.
+"""
+import asyncio
+import copy
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import FakeHass, import_integration, write_dashboard  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api import merge  # noqa: E402
+from ha_rest_api.api.lovelace import LovelaceAPI  # noqa: E402
+
+
+def card(entity, **extra):
+    return {"type": "tile", "entity": f"light.{entity}", **extra}
+
+
+def view(path, *cards, **extra):
+    return {"path": path, "cards": list(cards), **extra}
+
+
+BASE = {
+    "title": "Home",
+    "views": [
+        view("a", card("1"), card("2"), card("3")),
+        view("b", card("4")),
+        view("c"),
+    ],
+}
+
+
+def edit(config, function):
+    config = copy.deepcopy(config)
+    function(config)
+    return config
+
+
+def run(ours, theirs, base=BASE):
+    """Merge and check that none of the inputs were modified."""
+    inputs = copy.deepcopy((base, ours, theirs))
+    result = merge.merge_config(base, ours, theirs)
+    assert (base, ours, theirs) == inputs
+    return result
+
+
+def paths(config):
+    return [v["path"] for v in config["views"]]
+
+
+def test_diff3():
+    """Sequences are split into stable and changed chunks."""
+    assert merge.diff3("abcde", "abXde", "abcdeY") == [
+        ((0, 2), (0, 2), (0, 2)),
+        ((2, 3), (2, 3), (2, 3)),
+        ((3, 5), (3, 5), (3, 5)),
+        ((5, 5), (5, 5), (5, 6)),
+    ]
+    assert merge.diff3("", "", "") == []
+    assert merge.diff3("ab", "", "ab") == [((0, 2), (0, 0), (0, 2))]
+
+
+def test_unchanged_sides():
+    """If one side did not change anything, the other side is taken as it is."""
+    ours = edit(BASE, lambda c: c["views"][1]["cards"].append(card("5")))
+    assert run(ours, BASE) == (ours, [], {"changed": 1, "current_changed": 0, "merged": 0})
+    assert run(BASE, ours)[0] == ours
+    assert run(ours, ours) == (ours, [], {"changed": 1, "current_changed": 1, "merged": 0})
+
+
+def test_different_views():
+    """Changes to different views are combined without looking into the views."""
+    ours = edit(BASE, lambda c: c["views"][0]["cards"].pop())
+    theirs = edit(BASE, lambda c: c["views"][2].update(title="C"))
+    merged, conflicts, counts = run(ours, theirs)
+    assert conflicts == []
+    assert counts == {"changed": 1, "current_changed": 1, "merged": 0}
+    assert merged["views"] == [ours["views"][0], BASE["views"][1], theirs["views"][2]]
+
+
+def test_same_view():
+    """Changes to different keys and cards of one view are merged."""
+    def ours_edit(c):
+        c["title"] = "Mine"
+        c["views"][0]["icon"] = "mdi:home"
+        c["views"][0]["cards"][0]["name"] = "One"
+
+    def theirs_edit(c):
+        c["views"][0]["cards"][1]["name"] = "Two"
+        c["views"][0]["cards"].append(card("9"))
+
+    merged, conflicts, counts = run(edit(BASE, ours_edit), edit(BASE, theirs_edit))
+    assert conflicts == []
+    assert counts["merged"] == 1
+    assert merged["title"] == "Mine"
+    assert merged["views"][0] == view(
+        "a", card("1", name="One"), card("2", name="Two"), card("3"), card("9"), icon="mdi:home"
+    )
+
+
+def test_overlapping_edit_conflicts():
+    """Different values for the same key conflict; the current value is kept."""
+    ours = edit(BASE, lambda c: c["views"][0]["cards"][1].update(name="Mine"))
+    theirs = edit(BASE, lambda c: c["views"][0]["cards"][1].update(name="Theirs"))
+    merged, conflicts, _ = run(ours, theirs)
+    assert conflicts == [{
+        "view": "a",
+        "path": ["cards", 1, "name"],
+        "reason": "modified",
+        "current": "Theirs",
+        "submitted": "Mine",
+    }]
+    assert merged == theirs
+
+
+def test_deleted_against_edited():
+    """Deleting what the other side edited conflicts, for cards, keys and views."""
+    ours = edit(BASE, lambda c: c["views"][0]["cards"].pop(1))
+    theirs = edit(BASE, lambda c: c["views"][0]["cards"][1].update(name="Two"))
+    _, conflicts, _ = run(ours, theirs)
+    assert [(c["view"], c["path"], c["reason"]) for c in conflicts] == [("a", ["cards", 1], "deleted")]
+    assert conflicts[0]["submitted"] == []
+
+    ours = edit(BASE, lambda c: c.update(views=[v for v in c["views"] if v["path"] != "b"]))
+    theirs = edit(BASE, lambda c: c["views"][1].update(title="B"))
+    _, conflicts, _ = run(ours, theirs)
+    assert conflicts == [{
+        "view": "b", "path": [], "reason": "deleted",
+        "base": BASE["views"][1], "current": theirs["views"][1],
+    }]
+
+    ours = edit(BASE, lambda c: c.pop("title"))
+    theirs = edit(BASE, lambda c: c.update(title="Other"))
+    assert [c["reason"] for c in run(ours, theirs)[1]] == ["deleted"]
+
+
+def test_deleted_on_both_sides():
+    """A view deleted on both sides stays deleted."""
+    def delete_c(c):
+        c["views"].pop()
+
+    merged, conflicts, counts = run(edit(BASE, delete_c), edit(BASE, delete_c))
+    assert paths(merged) == ["a", "b"]
+    assert conflicts == []
+    assert counts == {"changed": 1, "current_changed": 1, "merged": 0}
+
+
+def test_duplicate_items():
+    """Repeated identical cards are aligned by position, not confused."""
+    base = {"views": [view("a", card("x"), card("x"), card("x"))]}
+    ours = {"views": [view("a", card("x"), card("x"), card("x"), card("y"))]}
+    theirs = {"views": [view("a", card("w"), card("x"), card("x"), card("x"))]}
+    merged, conflicts, _ = run(ours, theirs, base)
+    assert conflicts == []
+    assert merged["views"][0]["cards"] == [card("w"), card("x"), card("x"), card("x"), card("y")]
+
+    base = {"views": [view("a", card("x"), card("x"), card("x"), card("z"))]}
+    ours = {"views": [view("a", card("x"), card("x"), card("x"), card("z"), card("y"))]}
+    theirs = {"views": [view("a", card("x"), card("x"), card("z"))]}
+    merged, conflicts, _ = run(ours, theirs, base)
+    assert conflicts == []
+    assert merged["views"][0]["cards"] == [card("x"), card("x"), card("z"), card("y")]
+
+    # 相邻的修改与 diff3 一样视为冲突
+    theirs = {"views": [view("a", card("x"), card("x"), card("x"))]}
+    _, conflicts, _ = run(ours, theirs, base)
+    assert [(c["path"], c["reason"]) for c in conflicts] == [(["cards", 3], "deleted")]
+
+
+def test_duplicate_view_paths():
+    """Views with the same path are matched by occurrence."""
+    base = {"views": [{"path": "a", "n": 1}, {"path": "a", "n": 2}]}
+    ours = {"views": [{"path": "a", "n": 1}, {"path": "a", "n": 3}]}
+    theirs = {"views": [{"path": "a", "n": 0}, {"path": "a", "n": 2}]}
+    merged, conflicts, counts = run(ours, theirs, base)
+    assert merged["views"] == [{"path": "a", "n": 0}, {"path": "a", "n": 3}]
+    assert conflicts == []
+    assert counts == {"changed": 1, "current_changed": 1, "merged": 0}
+
+
+def test_views_without_path():
+    """Views without a path are matched by content."""
+    base = {"views": [{"title": "x"}, {"path": "a"}]}
+    ours = {"views": [{"title": "x"}, {"path": "a", "icon": "i"}]}
+    theirs = {"views": [{"title": "y"}, {"title": "x"}, {"path": "a"}]}
+    merged, conflicts, _ = run(ours, theirs, base)
+    assert conflicts == []
+    assert merged["views"] == [{"title": "y"}, {"title": "x"}, {"path": "a", "icon": "i"}]
+
+
+def test_reorder_and_insert():
+    """One side reorders the views while the other adds one after a view."""
+    ours = edit(BASE, lambda c: c["views"].reverse())
+    theirs = edit(BASE, lambda c: c["views"].insert(1, view("new")))
+    merged, conflicts, _ = run(ours, theirs)
+    assert conflicts == []
+    assert paths(merged) == ["c", "b", "a", "new"]
+
+    merged, conflicts, _ = run(theirs, ours)
+    assert conflicts == []
+    assert paths(merged) == ["c", "b", "a", "new"]
+
+
+def test_added_views():
+    """Views added on both sides are all kept; the same view added twice conflicts."""
+    ours = edit(BASE, lambda c: c["views"].insert(0, view("x")))
+    theirs = edit(BASE, lambda c: c["views"].append(view("y")))
+    merged, conflicts, _ = run(ours, theirs)
+    assert conflicts == []
+    assert paths(merged) == ["x", "a", "b", "c", "y"]
+
+    ours = edit(BASE, lambda c: c["views"].append(view("x", icon="1")))
+    theirs = edit(BASE, lambda c: c["views"].append(view("x", icon="2")))
+    _, conflicts, _ = run(ours, theirs)
+    assert [(c["view"], c["path"], c["reason"]) for c in conflicts] == [("x", [], "modified")]
+    assert "base" not in conflicts[0]
+
+
+def test_conflicting_order():
+    """Both sides reordering the views differently conflicts; the current order is kept."""
+    ours = edit(BASE, lambda c: c["views"].reverse())
+    theirs = edit(BASE, lambda c: c["views"].append(c["views"].pop(0)))
+    merged, conflicts, _ = run(ours, theirs)
+    assert conflicts == [{
+        "view": None, "path": ["views"], "reason": "order",
+        "base": ["a", "b", "c"], "current": ["b", "c", "a"], "submitted": ["c", "b", "a"],
+    }]
+    assert paths(merged) == ["b", "c", "a"]
+
+
+def test_conflicts_are_copies():
+    """Values reported in conflicts are not shared with the inputs."""
+    ours = edit(BASE, lambda c: c["views"][1].update(cards=[card("a")]))
+    theirs = edit(BASE, lambda c: c["views"][1].update(cards=[card("b"), card("c")]))
+    _, conflicts, _ = run(ours, theirs)
+    conflicts[0]["current"].clear()
+    assert theirs["views"][1]["cards"] == [card("b"), card("c")]
+
+
+def _merge_api(*steps):
+    """Run merge_lovelace_config calls against a dashboard holding BASE."""
+    async def main():
+        hass = FakeHass()
+        write_dashboard(hass, BASE)
+        api = LovelaceAPI(hass, stall_threshold=0)
+        base_etag = (await api.get_lovelace_config_json("lovelace")).etag
+        results = []
+        for config, kwargs in steps:
+            if kwargs.get("base_etag") == "BASE":
+                kwargs = {**kwargs, "base_etag": base_etag}
+            results.append(await api.merge_lovelace_config("lovelace", config, **kwargs))
+        return results, await api.get_lovelace_config("lovelace")
+
+    return asyncio.run(main())
+
+
+def test_api_merge():
+    """A save based on an older version keeps the changes made since."""
+    theirs = edit(BASE, lambda c: c["views"][2].update(title="C"))
+    ours = edit(BASE, lambda c: c["views"][0].update(title="A"))
+    (first, second), config = _merge_api((theirs, {"base_etag": "BASE"}), (ours, {"base_etag": "BASE"}))
+    assert first["success"] and first["merged"] is False
+    assert second["success"] and second["merged"] is True
+    assert second["views"] == {"changed": 1, "current_changed": 1, "merged": 0}
+    assert [v.get("title") for v in config["views"]] == ["A", None, "C"]
+
+
+def test_api_conflict():
+    """Overlapping changes fail with reason conflict and write nothing."""
+    theirs = edit(BASE, lambda c: c["views"][2].update(title="C"))
+    ours = edit(BASE, lambda c: c["views"][2].update(title="D"))
+    (_, result), config = _merge_api((theirs, {"base_etag": "BASE"}), (ours, {"base": BASE}))
+    assert result["success"] is False
+    assert result["reason"] == "conflict"
+    assert [c["path"] for c in result["conflicts"]] == [["title"]]
+    assert config == theirs
+
+
+def test_api_unknown_base():
+    """A base ETag that is not in the history fails with reason unknown_base."""
+    ours = edit(BASE, lambda c: c["views"][2].update(title="C"))
+    (result,), config = _merge_api((ours, {"base_etag": 'W/"0123456789abcdef"'}))
+    assert result["success"] is False
+    assert result["reason"] == "unknown_base"
+    assert result["etag"]
+    assert config == BASE
@@ -0,0 +1,93 @@
+"""Structural validation of dashboard configs.
+
+Run with ``python -m pytest test/test_schema.py``.
+"""
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import import_integration  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api.schema import (  # noqa: E402
+    LovelaceValidationError,
+    format_path,
+    validate_card,
+    validate_config,
+    validate_view,
+)
+
+
+def _error(config, **kwargs) -> LovelaceValidationError:
+    with pytest.raises(LovelaceValidationError) as info:
+        validate_config(config, **kwargs)
+    return info.value
+
+
+def test_valid_config():
+    """Views, sections, nested cards and unknown keys are accepted."""
+    validate_config({
+        "title": "Home",
+        "custom_key": {"anything": 1},
+        "views": [
+            {
+                "path": "a",
+                "badges": ["sensor.a", {"entity": "sensor.b"}],
+                "cards": [{"type": "vertical-stack", "cards": [{"type": "entity", "entity": "light.a"}]}],
+            },
+            {"path": "b", "type": "sections", "sections": [{"cards": [{"type": "tile", "x": 1}]}]},
+        ],
+    })
+    validate_config({})
+
+
+def test_error_paths():
+    """Errors point at the offending key, including inside nested cards and sections."""
+    error = _error({"views": [{"cards": [{"type": "a"}, {"type": "b", "cards": [{"entity": "e"}]}]}]})
+    assert error.path == ["views", 0, "cards", 1, "cards", 0, "type"]
+    assert str(error) == "views[0].cards[1].cards[0].type: required key not provided"
+
+    error = _error({"views": [{"sections": [{"cards": [{"type": 1}]}]}]})
+    assert error.path == ["views", 0, "sections", 0, "cards", 0, "type"]
+
+    assert _error({"views": [{"max_columns": "3"}]}).path == ["views", 0, "max_columns"]
+    assert _error({"views": [{"badges": [1]}]}).path == ["views", 0, "badges", 0]
+    assert _error({"views": "a"}).path == ["views"]
+    assert _error({"views": ["a"]}).path == ["views", 0]
+
+
+def test_not_a_mapping():
+    """A config that is not a mapping fails without a path."""
+    error = _error([])
+    assert error.path == []
+    assert error.as_dict() == {"success": False, "error": "expected a dictionary", "path": []}
+
+
+def test_prefix():
+    """The prefix is prepended to error paths."""
+    assert _error({"views": [{"icon": 1}]}, prefix=["dashboards", 2]).path == [
+        "dashboards", 2, "views", 0, "icon",
+    ]
+    with pytest.raises(LovelaceValidationError) as info:
+        validate_view({"cards": [{}]}, ["parameters", 1])
+    assert info.value.path == ["parameters", 1, "cards", 0, "type"]
+    with pytest.raises(LovelaceValidationError) as info:
+        validate_card({"type": "entities", "card": {"type": None}})
+    assert info.value.path == ["card", "type"]
+
+
+def test_unchanged_views_skipped():
+    """Views equal to their previous version are not validated again."""
+    invalid = {"path": "a", "cards": [{}]}
+    validate_config({"views": [invalid]}, previous={"a": {"path": "a", "cards": [{}]}})
+
+    error = _error({"views": [invalid]}, previous={"a": {"path": "a", "cards": []}})
+    assert error.path == ["views", 0, "cards", 0, "type"]
+
+
+def test_format_path():
+    """Paths are formatted like attribute and index access."""
+    assert format_path([]) == ""
+    assert format_path(["views", 3, "cards", 0, "type"]) == "views[3].cards[0].type"
+    assert format_path([0, "type"]) == "[0].type"
@@ -0,0 +1,100 @@
+"""Import and setup time budget for the integration.
+
+Run with ``python -m pytest test/test_setup_timing.py``. The budgets can be
+relaxed on slow machines with HA_REST_API_IMPORT_BUDGET and
+HA_REST_API_SETUP_BUDGET (seconds).
+"""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import CoreState  # noqa: E402
+
+IMPORT_BUDGET = float(os.environ.get("HA_REST_API_IMPORT_BUDGET", "0.25"))
+SETUP_BUDGET = float(os.environ.get("HA_REST_API_SETUP_BUDGET", "0.02"))
+
+# 这些模块必须在首次使用时才导入
+LAZY_MODULES = (
+    "ha_rest_api.api.analysis",
+    "ha_rest_api.api.archive",
+    "ha_rest_api.api.merge",
+    "ha_rest_api.api.profiling",
+    "ha_rest_api.api.storage_watcher",
+    "ha_rest_api.api.view_template",
+)
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {path!r})
+# Home Assistant has loaded these before any integration is set up
+import aiohttp, voluptuous
+import homeassistant.components.http
+import homeassistant.helpers.config_validation
+start = time.perf_counter()
+import ha_rest_api
+print(time.perf_counter() - start)
+print(",".join(sorted(name for name in sys.modules if name.startswith("ha_rest_api"))))
+"""
+
+
+@pytest.fixture(scope="module")
+def package_path(tmp_path_factory) -> str:
+    """Expose the repository as the ``ha_rest_api`` package."""
+    path = tmp_path_factory.mktemp("custom_components")
+    (path / "ha_rest_api").symlink_to(Path(__file__).resolve().parents[1])
+    return str(path)
+
+
+def test_import_time(package_path):
+    """Importing the integration stays within budget and stays lazy."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(path=package_path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    duration, modules = result.stdout.strip().splitlines()
+
+    assert float(duration) < IMPORT_BUDGET
+    for module in LAZY_MODULES:
+        assert module not in modules.split(",")
+
+
+def _fake_hass() -> MagicMock:
+    hass = MagicMock()
+    hass.state = CoreState.not_running
+    hass.data = {}
+    return hass
+
+
+def test_setup_time(package_path):
+    """async_setup only registers views and services, within budget."""
+    sys.path.insert(0, package_path)
+    try:
+        from ha_rest_api import async_setup
+    finally:
+        sys.path.remove(package_path)
+
+    durations = []
+    for _ in range(20):
+        hass = _fake_hass()
+        start = time.perf_counter()
+        assert asyncio.run(async_setup(hass, {}))
+        durations.append(time.perf_counter() - start)
+
+        # 启动前不做任何 I/O，监听器和预热推迟到 homeassistant_started
+        hass.async_add_executor_job.assert_not_called()
+        hass.async_create_background_task.assert_not_called()
+        assert hass.http.register_view.called
+        assert hass.services.async_register.called
+
+    assert statistics.median(durations) < SETUP_BUDGET
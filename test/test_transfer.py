@@ -0,0 +1,239 @@
+"""Server-side copy, move and reorder of views and sections.
+
+Run with ``python -m pytest test/test_transfer.py``.
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import FakeHass, FakeRequest, import_integration, write_dashboard  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api import lovelace  # noqa: E402
+from ha_rest_api.api.lovelace import LovelaceAPI, LovelaceSectionCopyAPIView  # noqa: E402
+
+HOME = {
+    "views": [
+        {"path": "a", "sections": [{"title": "s0"}, {"title": "s1"}]},
+        {"path": "b"},
+        {"path": "c", "sections": [{"title": "t0"}]},
+    ],
+}
+TABLET = {"views": [{"path": "x"}]}
+
+
+def register(hass, *dashboard_ids, mode="storage"):
+    """Register storage mode dashboards like the Lovelace dashboards collection."""
+    items = [
+        {"id": dashboard_id, "url_path": dashboard_id.replace("_", "-"), "mode": mode}
+        for dashboard_id in dashboard_ids
+    ]
+    with open(hass.config.path(".storage", "lovelace_dashboards"), "w") as file:
+        json.dump({"version": 1, "key": "lovelace_dashboards", "data": {"items": items}}, file)
+
+
+def stored(hass, dashboard_id="lovelace"):
+    key = "lovelace" if dashboard_id == "lovelace" else f"lovelace.{dashboard_id}"
+    try:
+        with open(hass.config.path(".storage", key)) as file:
+            return json.load(file)["data"]["config"]
+    except FileNotFoundError:
+        return None
+
+
+def paths(config):
+    return [view["path"] for view in config["views"]]
+
+
+def run(test):
+    """Run a test coroutine with an API over the HOME and TABLET dashboards."""
+    async def main():
+        hass = FakeHass()
+        write_dashboard(hass, HOME)
+        write_dashboard(hass, TABLET, "tablet")
+        register(hass, "tablet", "fresh")
+        await test(hass, LovelaceAPI(hass, stall_threshold=0))
+
+    asyncio.run(main())
+
+
+def test_copy_within_dashboard():
+    """Copies within a dashboard need a new path and insert at the position."""
+    async def test(hass, api):
+        result = await api.copy_lovelace_view("lovelace", "b")
+        assert result["success"] is False
+        assert "new_path is required" in result["error"]
+
+        result = await api.copy_lovelace_view("lovelace", "b", new_path="b2", position=0)
+        assert result == {"success": True, "dashboards": ["lovelace"]}
+        assert paths(stored(hass)) == ["b2", "a", "b", "c"]
+
+        result = await api.copy_lovelace_view("lovelace", "b", new_path="a")
+        assert result["error"] == "View with path 'a' already exists"
+
+    run(test)
+
+
+def test_move_within_dashboard():
+    """Moving a view within a dashboard positions it among the remaining views."""
+    async def test(hass, api):
+        result = await api.move_lovelace_view("lovelace", "a", position=2)
+        assert result == {"success": True, "dashboards": ["lovelace"]}
+        assert paths(stored(hass)) == ["b", "c", "a"]
+
+        result = await api.move_lovelace_view("lovelace", "a", new_path="z", position=0)
+        assert result["success"]
+        assert paths(stored(hass)) == ["z", "b", "c"]
+
+    run(test)
+
+
+def test_across_dashboards():
+    """Copies and moves write both dashboards once."""
+    async def test(hass, api):
+        result = await api.copy_lovelace_view("lovelace", "b", target_dashboard_id="tablet")
+        assert result == {"success": True, "dashboards": ["tablet"]}
+        assert paths(stored(hass, "tablet")) == ["x", "b"]
+
+        result = await api.move_lovelace_view("lovelace", "a", target_dashboard_id="tablet", position=0)
+        assert result == {"success": True, "dashboards": ["tablet", "lovelace"]}
+        assert paths(stored(hass, "tablet")) == ["a", "x", "b"]
+        assert paths(stored(hass)) == ["b", "c"]
+
+        result = await api.move_lovelace_view("lovelace", "c", target_dashboard_id="tablet", new_path="x")
+        assert result["error"] == "View with path 'x' already exists"
+        assert paths(stored(hass)) == ["b", "c"]
+
+    run(test)
+
+
+def test_unknown_target():
+    """Views are only moved to registered storage dashboards."""
+    async def test(hass, api):
+        result = await api.move_lovelace_view("lovelace", "a", target_dashboard_id="typo")
+        assert result == {"success": False, "error": "Dashboard 'typo' not found"}
+        assert stored(hass, "typo") is None
+        assert paths(stored(hass)) == ["a", "b", "c"]
+
+        register(hass, "yaml_dash", mode="yaml")
+        result = await api.copy_lovelace_view("lovelace", "a", target_dashboard_id="yaml_dash")
+        assert result["success"] is False
+
+        # 已注册但从未保存过的面板
+        register(hass, "fresh")
+        result = await api.move_lovelace_view("lovelace", "a", target_dashboard_id="fresh")
+        assert result == {"success": True, "dashboards": ["fresh", "lovelace"]}
+        assert stored(hass, "fresh") == {"views": [HOME["views"][0]]}
+
+    run(test)
+
+
+def test_source_write_failure(monkeypatch):
+    """If the source cannot be saved after a move, the target is restored and reloaded."""
+    write_json_file = lovelace.write_json_file
+
+    def fail_for_source(path, *args):
+        if path.endswith("lovelace"):
+            raise OSError("disk full")
+        return write_json_file(path, *args)
+
+    async def test(hass, api):
+        monkeypatch.setattr(lovelace, "write_json_file", fail_for_source)
+        result = await api.move_lovelace_view("lovelace", "a", target_dashboard_id="tablet")
+        assert result == {
+            "success": False,
+            "error": "Could not save source dashboard",
+            "dashboards": ["tablet"],
+        }
+        assert stored(hass, "tablet") == TABLET
+        assert await api.get_lovelace_config("tablet") == TABLET
+        assert paths(stored(hass)) == ["a", "b", "c"]
+
+        # 目标面板没有可恢复的版本时保留副本
+        result = await api.move_lovelace_view("lovelace", "a", target_dashboard_id="fresh")
+        assert result["dashboards"] == ["fresh"]
+        assert "the copy in 'fresh' was kept" in result["error"]
+        assert paths(stored(hass)) == ["a", "b", "c"]
+
+    run(test)
+
+
+def test_sections():
+    """Sections are copied and moved between views and dashboards."""
+    async def test(hass, api):
+        result = await api.move_lovelace_view("lovelace", "a", section_index=0, position=1)
+        assert result["success"]
+        assert stored(hass)["views"][0]["sections"] == [{"title": "s1"}, {"title": "s0"}]
+
+        result = await api.copy_lovelace_view("lovelace", "a", section_index=0, target_path="c", position=0)
+        assert result["success"]
+        assert stored(hass)["views"][2]["sections"] == [{"title": "s1"}, {"title": "t0"}]
+
+        result = await api.move_lovelace_view(
+            "lovelace", "c", section_index=1, target_dashboard_id="tablet", target_path="x"
+        )
+        assert result == {"success": True, "dashboards": ["tablet", "lovelace"]}
+        assert stored(hass, "tablet")["views"][0]["sections"] == [{"title": "t0"}]
+        assert stored(hass)["views"][2]["sections"] == [{"title": "s1"}]
+
+        result = await api.copy_lovelace_view("lovelace", "a", section_index=5)
+        assert result["error"] == "Section 5 not found in view 'a'"
+        result = await api.copy_lovelace_view(
+            "lovelace", "a", section_index=0, target_dashboard_id="typo", target_path="x"
+        )
+        assert result["error"] == "Dashboard 'typo' not found"
+
+    run(test)
+
+
+def test_position_bounds():
+    """Positions outside the target list are rejected without writing."""
+    async def test(hass, api):
+        for position in (-1, -50, 4, "1", True):
+            result = await api.copy_lovelace_view("lovelace", "b", new_path="b2", position=position)
+            assert result == {"success": False, "error": "position must be an integer from 0 to 3"}
+        assert await api.move_lovelace_view("lovelace", "a", position=3) == {
+            "success": False, "error": "position must be an integer from 0 to 2",
+        }
+        result = await api.move_lovelace_view("lovelace", "a", section_index=0, position=2)
+        assert result["error"] == "position must be an integer from 0 to 1"
+        assert stored(hass) == HOME
+
+        response = await LovelaceSectionCopyAPIView(api).post(
+            FakeRequest("POST", body={"path": "b", "new_path": "b2", "position": -1})
+        )
+        assert response.status == 400
+        assert stored(hass) == HOME
+
+    run(test)
+
+
+def test_transfer_service_schema():
+    """The copy and move services reject negative positions."""
+    with pytest.raises(Exception):
+        lovelace.SERVICE_VIEW_TRANSFER_SCHEMA({"path": "a", "position": -1})
+    assert lovelace.SERVICE_VIEW_TRANSFER_SCHEMA({"path": "a", "position": "2"})["position"] == 2
+
+
+def test_reorder():
+    """Views are reordered by path and sections by index."""
+    async def test(hass, api):
+        result = await api.reorder_lovelace_views("lovelace", paths=["c", "a"])
+        assert result == {"success": True, "dashboards": ["lovelace"]}
+        assert paths(stored(hass)) == ["c", "a", "b"]
+
+        result = await api.reorder_lovelace_views("lovelace", path="a", order=[1, 0])
+        assert result["success"]
+        assert stored(hass)["views"][1]["sections"] == [{"title": "s1"}, {"title": "s0"}]
+
+        result = await api.reorder_lovelace_views("lovelace", path="a", order=[0, 0])
+        assert result["error"] == "order must be a permutation of the section indexes"
+        result = await api.reorder_lovelace_views("lovelace", paths=["missing"])
+        assert result["error"] == "Views not found: missing"
+        assert paths(stored(hass)) == ["c", "a", "b"]
+
+    run(test)
@@ -0,0 +1,73 @@
+"""View templates: rendering and bulk instantiation.
+
+Run with ``python -m pytest test/test_view_template.py``.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from fake_hass import FakeHass, import_integration, write_dashboard  # noqa: E402
+
+import_integration()
+
+from ha_rest_api.api.lovelace import LovelaceAPI  # noqa: E402
+from ha_rest_api.api.view_template import (  # noqa: E402
+    TemplateRenderError,
+    compile_view_template,
+)
+
+TEMPLATE = {
+    "path": "room-${room}",
+    "title": "${name}",
+    "cards": [{"type": "entities", "entities": "${entities}"}],
+}
+
+
+def test_render():
+    """Placeholders are substituted; a whole-value placeholder keeps its type."""
+    compiled = compile_view_template(TEMPLATE)
+    view = compiled.render({"room": 1, "name": "Kitchen", "entities": ["light.a"]})
+    assert view == {
+        "path": "room-1",
+        "title": "Kitchen",
+        "cards": [{"type": "entities", "entities": ["light.a"]}],
+    }
+    with pytest.raises(TemplateRenderError, match="'entities'"):
+        compiled.render({"room": 1, "name": "Kitchen"})
+
+
+def _instantiate(parameter_sets):
+    async def run():
+        hass = FakeHass()
+        write_dashboard(hass, {"views": [{"path": "home"}]})
+        api = LovelaceAPI(hass, stall_threshold=0)
+        assert await api.save_lovelace_template("room", TEMPLATE)
+        result = await api.instantiate_lovelace_template("lovelace", "room", parameter_sets)
+        return result, await api.get_lovelace_config("lovelace")
+
+    return asyncio.run(run())
+
+
+def test_instantiate():
+    """Every parameter set creates or updates one view."""
+    result, config = _instantiate([
+        {"room": "a", "name": "A", "entities": []},
+        {"room": "b", "name": "B", "entities": []},
+    ])
+    assert result == {"success": True, "created": ["room-a", "room-b"], "updated": []}
+    assert [view["path"] for view in config["views"]] == ["home", "room-a", "room-b"]
+
+
+def test_instantiate_missing_parameter():
+    """A missing parameter reports the render error and writes nothing."""
+    result, config = _instantiate([
+        {"room": "a", "name": "A", "entities": []},
+        {"room": "b", "name": "B"},
+    ])
+    assert result == {
+        "success": False,
+        "error": "Parameter set 1: Missing template parameter 'entities'",
+    }
+    assert config == {"views": [{"path": "home"}]}